@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import CustomUser, Publisher, Article, Newsletter
+from .models import (
+    CustomUser, Publisher, Article, Newsletter, OutboxEvent, DeliveryShard,
+    SocialPost
+)
 from django.contrib.auth.admin import UserAdmin
 
 
@@ -18,3 +21,29 @@ admin.site.register(CustomUser, CustomUserAdmin)
 admin.site.register(Publisher)
 admin.site.register(Article)
 admin.site.register(Newsletter)
+
+
+class DeliveryShardInline(admin.TabularInline):
+    model = DeliveryShard
+    extra = 0
+    readonly_fields = (
+        'first_reader_id', 'last_reader_id', 'progress_reader_id',
+        'status', 'sent_count', 'attempts', 'last_error', 'locked_at'
+    )
+
+
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'object_id', 'status', 'attempts', 'created_at')
+    list_filter = ('status', 'kind')
+    inlines = [DeliveryShardInline]
+
+
+admin.site.register(OutboxEvent, OutboxEventAdmin)
+
+
+class SocialPostAdmin(admin.ModelAdmin):
+    list_display = ('__str__', 'status', 'attempts', 'available_at', 'sent_at')
+    list_filter = ('status',)
+
+
+admin.site.register(SocialPost, SocialPostAdmin)
@@ -1,8 +1,16 @@
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from .serializers import ArticleSerializer
-from .models import Article
+from rest_framework.utils.urls import replace_query_param
+from .models import Article, Newsletter
+from .serializers import (
+    ChangeSerializer, FastArticleSerializer, FeedItemSerializer
+)
+from .functions import changes, feed_cache
+from .functions.feed import articles_validators
+from .pagination import InvalidCursor, get_page_size, next_page_url
 
 
 @api_view(['GET'])
@@ -13,15 +21,39 @@ def subscribed_articles(request):
     and journalists.
 
     This API endpoint is accessible only to authenticated users
-    with the Reader role. It returns a list of distinct, approved
-    articles authored by:
+    with the Reader role. It returns approved articles authored by:
     - Journalists the reader is subscribed to
     - Publishers the reader is subscribed to
 
+    Articles are returned newest first, one page at a time. Pages are
+    keyset-paginated on ``(created_at, id)``: follow the ``next`` URL
+    (or pass its ``cursor`` parameter) to get the next page, which
+    costs the same however deep the client scrolls. ``page_size``
+    defaults to ``API_PAGE_SIZE`` and is capped at
+    ``API_MAX_PAGE_SIZE``.
+
+    ``fields`` selects the returned fields as a comma separated list,
+    e.g. ``?fields=id,title,journalist,created_at`` for list screens.
+    Besides the article's own fields, ``excerpt`` returns the start of
+    the content, cut by the database. Columns that are not selected are
+    never loaded, and items are serialized with
+    :class:`FastArticleSerializer`.
+
+    Responses carry ``ETag`` and ``Last-Modified`` validators for the
+    reader's whole feed. Polling clients that send them back with
+    ``If-None-Match`` / ``If-Modified-Since`` get ``304 Not Modified``
+    without the page being fetched or serialized.
+
+    The reader's feed comes from the per-reader feed cache, so repeated
+    polls neither run the subscription query nor aggregate validators,
+    and a ``304`` never writes to the cache or the database.
+
     :param request: HTTP request from the user.
     :type request: HttpRequest
-    :return: JSON serialized list of articles or 403 error if user is
-        not a reader.
+    :return: JSON object with the page's articles under ``results`` and
+        the next page's URL under ``next`` (null on the last page), 400
+        for an invalid cursor or unknown fields, 403 if the user is not
+        a reader or 304 if the feed has not changed.
     :rtype: Response
     """
     user = request.user
@@ -31,21 +63,158 @@ def subscribed_articles(request):
         return Response({'detail': 'Only readers can access this endpoint.'},
                         status=403)
 
-    # Get subscribed sources
-    publishers = user.subscribed_publishers.all()
-    journalists = user.subscribed_journalists.all()
-
-    # Filter approved articles
-    articles = Article.objects.filter(
-        approved=True
-    ).filter(
-        publisher__in=publishers
-    ) | Article.objects.filter(
-        approved=True,
-        journalist__in=journalists
+    serializer = FastArticleSerializer(
+        FastArticleSerializer.parse_fields(request.query_params.get('fields'))
+    )
+    # Read-only: on a miss the validators are aggregated instead, and
+    # the entry is only built if the page has to be sent
+    entry = feed_cache.cached_feed(user, 'article')
+    etag, last_modified = articles_validators(
+        user, request.META.get('QUERY_STRING', ''), stats=entry
+    )
+    last_modified = last_modified and int(last_modified.timestamp())
+    not_modified = get_conditional_response(
+        request, etag=quote_etag(etag), last_modified=last_modified
     )
+    if not_modified is not None:
+        return not_modified
+
+    try:
+        articles, next_cursor = feed_cache.page(
+            user, 'article',
+            cursor=request.query_params.get('cursor'),
+            page_size=get_page_size(request),
+            entry=entry,
+            queryset=serializer.select(Article.objects.all())
+        )
+    except InvalidCursor as e:
+        return Response({'detail': str(e)}, status=400)
+
+    response = Response({
+        'results': serializer.serialize(articles),
+        'next': next_page_url(request, next_cursor),
+    })
+    response['ETag'] = quote_etag(etag)
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def subscribed_feed(request):
+    """
+    Retrieve a reader's approved articles and newsletters in one feed.
+
+    Uses the same subscriptions as :func:`subscribed_articles`. Both
+    types are interleaved newest first: each type is read with its own
+    indexed keyset query (or from the feed cache) and the two sorted
+    lists are merged, so no more than a page is ever sorted.
+
+    Pages are cursor based: follow the ``next`` URL. ``page_size``
+    defaults to ``API_PAGE_SIZE`` and is capped at
+    ``API_MAX_PAGE_SIZE``.
+
+    :param request: HTTP request from the user.
+    :type request: HttpRequest
+    :return: JSON object with the page's items under ``results`` and the
+        next page's URL under ``next`` (null on the last page), 400 for
+        an invalid cursor or 403 if the user is not a reader.
+    :rtype: Response
+    """
+    user = request.user
+
+    # Readers only
+    if not user.is_reader():
+        return Response({'detail': 'Only readers can access this endpoint.'},
+                        status=403)
+
+    serializer = FeedItemSerializer()
+    try:
+        items, next_cursor = feed_cache.merged_page(
+            user,
+            cursor=request.query_params.get('cursor'),
+            page_size=get_page_size(request),
+            querysets={
+                'article': serializer.select(
+                    'article', Article.objects.all()
+                ),
+                'newsletter': serializer.select(
+                    'newsletter', Newsletter.objects.all()
+                ),
+            }
+        )
+    except InvalidCursor as e:
+        return Response({'detail': str(e)}, status=400)
+
+    return Response({
+        'results': serializer.serialize(items),
+        'next': next_page_url(request, next_cursor),
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def subscribed_changes(request):
+    """
+    Retrieve what changed in a reader's feed since the last sync.
+
+    Lets clients that keep articles and newsletters offline sync in
+    O(changes) instead of downloading the whole feed again:
+
+    1. Without ``since`` every item currently in the feed is returned as
+       a change, oldest change first.
+    2. While ``more`` is true, follow ``next`` to get the rest.
+    3. Store the final ``since`` cursor and send it as ``?since=`` on the
+       next sync to get only items created, updated or deleted since.
+
+    Items that were deleted, unapproved or moved out of the reader's
+    subscriptions are returned as ``{"type", "id", "deleted": true}``.
+    ``page_size`` defaults to ``API_PAGE_SIZE`` and is capped at
+    ``API_MAX_PAGE_SIZE``.
+
+    :param request: HTTP request from the user.
+    :type request: HttpRequest
+    :return: JSON object with the changes under ``results``, the cursor
+        to sync from under ``since``, ``more`` and the ``next`` URL while
+        more changes are waiting. 400 for an invalid cursor, 403 if the
+        user is not a reader and 410 if the cursor is older than
+        ``TOMBSTONE_RETENTION_DAYS`` or the reader's subscriptions
+        changed, in which case the client syncs again without ``since``.
+    :rtype: Response
+    """
+    user = request.user
+
+    # Readers only
+    if not user.is_reader():
+        return Response({'detail': 'Only readers can access this endpoint.'},
+                        status=403)
+
+    serializer = ChangeSerializer()
+    try:
+        results, since, more = changes.changes(
+            user,
+            cursor=request.query_params.get('since'),
+            page_size=get_page_size(request),
+            querysets={
+                kind: serializer.select(kind, model.objects.all())
+                for kind, model in (('article', Article),
+                                    ('newsletter', Newsletter))
+            }
+        )
+    except InvalidCursor as e:
+        return Response({'detail': str(e)}, status=400)
+    except changes.ExpiredCursor as e:
+        return Response({'detail': str(e)}, status=410)
 
-    # Remove duplicates and serialize
-    articles = articles.distinct()
-    serializer = ArticleSerializer(articles, many=True)
-    return Response(serializer.data)
+    next_url = None
+    if more:
+        next_url = replace_query_param(
+            request.build_absolute_uri(), 'since', since
+        )
+    return Response({
+        'results': serializer.serialize(results),
+        'since': since,
+        'more': more,
+        'next': next_url,
+    })
@@ -6,4 +6,5 @@ class CoreConfig(AppConfig):
     name = 'core'
 
     def ready(self):
+        import core.checks    # noqa: F401 registers system checks
         import core.signals   # ensures signal runs
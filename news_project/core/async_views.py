@@ -0,0 +1,291 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_GET
+from rest_framework import serializers
+from .models import Article, Newsletter
+from .serializers import FastArticleSerializer, FeedItemSerializer
+from .functions import feed_cache, live
+from .functions.feed import articles_validators
+from .pagination import InvalidCursor, get_page_size, next_page_url
+
+
+async def _get_reader(request):
+    """
+    Return the requesting reader, or the error response for anyone else.
+
+    Mirrors the permission checks of the DRF views, which cannot run
+    natively under ASGI.
+
+    :return: ``(user, None)`` for readers, ``(None, response)`` otherwise.
+    :rtype: tuple[CustomUser | None, JsonResponse | None]
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return None, JsonResponse(
+            {'detail': 'Authentication credentials were not provided.'},
+            status=403
+        )
+    if not user.is_reader():
+        return None, JsonResponse(
+            {'detail': 'Only readers can access this endpoint.'},
+            status=403
+        )
+    return user, None
+
+
+def _feed_validators(user, variant):
+    """
+    Load the reader's cached article feed, if any, and its validators.
+
+    Read-only: on a miss the validators are aggregated instead, and the
+    entry is only built if the page has to be sent.
+    """
+    entry = feed_cache.cached_feed(user, 'article')
+    etag, last_modified = articles_validators(user, variant, stats=entry)
+    return entry, etag, last_modified
+
+
+@require_GET
+async def subscribed_articles(request):
+    """
+    Async version of :func:`core.api_views.subscribed_articles`.
+
+    Takes the same parameters (``cursor``, ``page_size``, ``fields``)
+    and returns the same JSON, validators and status codes. Under an
+    ASGI server a slow client only holds a coroutine, not a worker
+    thread: the feed cache lookup runs in one hop to a worker thread and
+    the page's articles are loaded with the async ORM.
+
+    :param request: HTTP request from the user.
+    :type request: HttpRequest
+    :return: JSON object with ``results`` and ``next``, 304 if the feed
+        has not changed, 400 for an invalid cursor or unknown fields, or
+        403 if the user is not a reader.
+    :rtype: JsonResponse
+    """
+    user, error = await _get_reader(request)
+    if error is not None:
+        return error
+
+    try:
+        serializer = FastArticleSerializer(
+            FastArticleSerializer.parse_fields(request.GET.get('fields'))
+        )
+    except serializers.ValidationError as e:
+        return JsonResponse(e.detail, status=400)
+
+    entry, etag, last_modified = await sync_to_async(_feed_validators)(
+        user, request.META.get('QUERY_STRING', '')
+    )
+    last_modified = last_modified and int(last_modified.timestamp())
+    not_modified = get_conditional_response(
+        request, etag=quote_etag(etag), last_modified=last_modified
+    )
+    if not_modified is not None:
+        return not_modified
+
+    try:
+        articles, next_cursor = await feed_cache.apage(
+            user, 'article',
+            cursor=request.GET.get('cursor'),
+            page_size=get_page_size(request),
+            entry=entry,
+            queryset=serializer.select(Article.objects.all())
+        )
+    except InvalidCursor as e:
+        return JsonResponse({'detail': str(e)}, status=400)
+
+    response = JsonResponse({
+        'results': serializer.serialize(articles),
+        'next': next_page_url(request, next_cursor),
+    })
+    response['ETag'] = quote_etag(etag)
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+@require_GET
+async def subscribed_feed(request):
+    """
+    Async version of :func:`core.api_views.subscribed_feed`.
+
+    :param request: HTTP request from the user.
+    :type request: HttpRequest
+    :return: JSON object with ``results`` and ``next``, 400 for an
+        invalid cursor or 403 if the user is not a reader.
+    :rtype: JsonResponse
+    """
+    user, error = await _get_reader(request)
+    if error is not None:
+        return error
+
+    serializer = FeedItemSerializer()
+    try:
+        items, next_cursor = await feed_cache.amerged_page(
+            user,
+            cursor=request.GET.get('cursor'),
+            page_size=get_page_size(request),
+            querysets={
+                'article': serializer.select(
+                    'article', Article.objects.all()
+                ),
+                'newsletter': serializer.select(
+                    'newsletter', Newsletter.objects.all()
+                ),
+            }
+        )
+    except InvalidCursor as e:
+        return JsonResponse({'detail': str(e)}, status=400)
+
+    return JsonResponse({
+        'results': serializer.serialize(items),
+        'next': next_page_url(request, next_cursor),
+    })
+
+
+async def _detail(request, model, pk, fields):
+    """
+    Return one item as JSON, loaded with the async ORM.
+
+    Like the HTML detail pages any signed-in user may read an item,
+    except that readers only see approved content.
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse(
+            {'detail': 'Authentication credentials were not provided.'},
+            status=403
+        )
+    items = model.objects.all()
+    if user.is_reader():
+        items = items.filter(approved=True)
+    try:
+        item = await items.aget(pk=pk)
+    except model.DoesNotExist:
+        return JsonResponse({'detail': 'Not found.'}, status=404)
+
+    data = {name: getattr(item, name) for name in fields}
+    data['journalist'] = item.journalist_id
+    data['publisher'] = item.publisher_id
+    return JsonResponse(data)
+
+
+@require_GET
+async def article_detail(request, pk):
+    """
+    Return an article as JSON.
+
+    :param request: HTTP request.
+    :type request: HttpRequest
+    :param pk: Article primary key.
+    :type pk: int
+    :return: The article's id, title, content, approval, timestamps,
+        journalist and publisher, 403 for anonymous users or 404 if not
+        found (or not approved and the user is a reader).
+    :rtype: JsonResponse
+    """
+    return await _detail(request, Article, pk, (
+        'id', 'title', 'content', 'approved', 'created_at', 'updated_at'
+    ))
+
+
+@require_GET
+async def newsletter_detail(request, pk):
+    """
+    Return a newsletter as JSON.
+
+    :param request: HTTP request.
+    :type request: HttpRequest
+    :param pk: Newsletter primary key.
+    :type pk: int
+    :return: The newsletter's id, title, body, approval, timestamps,
+        journalist and publisher, 403 for anonymous users or 404 if not
+        found (or not approved and the user is a reader).
+    :rtype: JsonResponse
+    """
+    return await _detail(request, Newsletter, pk, (
+        'id', 'title', 'body', 'approved', 'created_at', 'updated_at'
+    ))
+
+
+async def _event_stream(journalist_ids, publisher_ids):
+    """
+    Yield a connection's events in Server-Sent Events format.
+
+    The connection subscribes to the broker once the response starts
+    streaming and unsubscribes when it stops, so a client gone before
+    the first chunk never holds a subscription.
+
+    Sends a comment every ``LIVE_HEARTBEAT_SECONDS`` so proxies keep
+    idle connections open, and a ``reset`` event before closing if the
+    client fell too far behind.
+    """
+    broker = live.get_broker()
+    subscription = broker.subscribe(journalist_ids, publisher_ids)
+    try:
+        yield f"retry: {settings.LIVE_RETRY_MS}\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    subscription.queue.get(),
+                    settings.LIVE_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield (
+                f"event: {event['type']}\n"
+                f"id: {event['type']}:{event['id']}\n"
+                f"data: {json.dumps(event)}\n\n"
+            )
+            if subscription.overflowed and subscription.queue.empty():
+                yield "event: reset\ndata: {}\n\n"
+                return
+    finally:
+        broker.unsubscribe(subscription)
+
+
+@require_GET
+async def live_events(request):
+    """
+    Push newly approved articles and newsletters to a reader.
+
+    A Server-Sent Events stream of the items approved while the client
+    is connected, limited to the journalists and publishers the reader
+    follows. Each event is named after the item's type and carries the
+    same JSON as an item of the merged feed.
+
+    Serve it from the ASGI app: a waiting connection only holds a queue
+    in its worker's :class:`~core.functions.live.Broker`, which listens
+    to ``LIVE_BACKEND`` once for all connections. On reconnect, or after
+    a ``reset`` event sent to clients that fell behind, catch up with
+    ``/api/changes/``. Subscriptions are read when the stream opens.
+
+    :param request: HTTP request from the user.
+    :type request: HttpRequest
+    :return: ``text/event-stream`` response, or 403 if the user is not a
+        reader.
+    :rtype: StreamingHttpResponse | JsonResponse
+    """
+    user, error = await _get_reader(request)
+    if error is not None:
+        return error
+
+    journalist_ids, publisher_ids = await sync_to_async(
+        feed_cache.subscriptions
+    )(user)
+    response = StreamingHttpResponse(
+        _event_stream(journalist_ids, publisher_ids),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+
+@register()
+def check_shared_caches(app_configs, **kwargs):
+    """
+    Refuse per-process caches for the feed and fragment caches.
+
+    Their entries are invalidated by bumping version tokens. With a
+    local-memory backend a bump only reaches the process that made it,
+    so the other web processes and workers keep serving stale content.
+
+    :return: Errors for every cache alias that is not shared.
+    :rtype: list[Error]
+    """
+    errors = []
+    for setting in ('FEED_CACHE_ALIAS', 'FRAGMENT_CACHE_ALIAS'):
+        alias = getattr(settings, setting)
+        backend = settings.CACHES.get(alias, {}).get('BACKEND', '')
+        if backend.endswith('LocMemCache'):
+            errors.append(Error(
+                f"{setting} points to the local-memory cache {alias!r}, "
+                "which is not shared between processes.",
+                hint="Configure a shared backend such as Redis or "
+                     "Memcached in CACHES.",
+                id='core.E001',
+            ))
+    return errors
@@ -8,7 +8,8 @@ class SubscriptionForm(forms.Form):
     Form for readers to manage their subscriptions.
 
     Allows selection of multiple publishers and journalists.
-    Both fields are optional.
+    Both fields are optional. Readers also choose whether they are
+    emailed for every item or receive an hourly or daily digest.
     """
     publishers = forms.ModelMultipleChoiceField(
         queryset=Publisher.objects.all(),
@@ -20,6 +21,12 @@ class SubscriptionForm(forms.Form):
         widget=forms.CheckboxSelectMultiple,
         required=False
     )
+    digest_frequency = forms.ChoiceField(
+        choices=CustomUser.DIGEST_CHOICES,
+        initial=CustomUser.DIGEST_IMMEDIATE,
+        label='Email delivery',
+        widget=forms.Select(attrs={'class': 'form-control'})
+    )
 
 
 class ArticleForm(forms.ModelForm):
@@ -0,0 +1,197 @@
+import heapq
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import Tombstone
+from core.pagination import (
+    InvalidCursor, decode_merged_cursor, encode_merged_cursor
+)
+from . import feed_cache
+
+
+DELETED = 'deleted'
+SYNCED = 'synced'
+STREAMS = tuple(feed_cache.KINDS) + (DELETED, SYNCED)
+
+
+class ExpiredCursor(Exception):
+    """
+    Raised when a sync cursor can no longer be served incrementally.
+
+    Either the tombstones it needs have been pruned or the reader's
+    subscriptions changed since the client last synced. The client has
+    to start again without ``since``.
+    """
+
+
+def _after(queryset, field, position):
+    """Restrict ``queryset`` to rows after a ``(stamp, id)`` position."""
+    if position is None:
+        return queryset
+    stamp, pk = position
+    return queryset.filter(
+        Q(**{f'{field}__gt': stamp}) | Q(**{field: stamp, 'id__gt': pk})
+    )
+
+
+def _streams(user, positions, horizon, limit):
+    """
+    Return the next changes of every stream, oldest first.
+
+    Each stream yields ``(stamp, stream, id, kind, object_id)`` tuples:
+    one per created or updated item of each kind, keyed on
+    ``updated_at``, and one per tombstone, keyed on ``deleted_at``.
+    """
+    journalist_ids, publisher_ids = feed_cache.subscriptions(user)
+    streams = []
+    for kind, (_, subscribed) in feed_cache.KINDS.items():
+        items = _after(
+            subscribed(user).filter(updated_at__lt=horizon),
+            'updated_at', positions.get(kind)
+        ).order_by('updated_at', 'id').values_list('updated_at', 'id')
+        streams.append([
+            (stamp, kind, pk, kind, pk) for stamp, pk in items[:limit]
+        ])
+
+    # Items still in the feed through another source are reported as
+    # updates instead
+    still_visible = Q()
+    for kind, (_, subscribed) in feed_cache.KINDS.items():
+        still_visible |= Q(
+            kind=kind, object_id__in=subscribed(user).values('id')
+        )
+    tombstones = _after(
+        Tombstone.objects.filter(
+            Q(journalist_id__in=journalist_ids) |
+            Q(publisher_id__in=publisher_ids),
+            deleted_at__lt=horizon
+        ).exclude(still_visible),
+        'deleted_at', positions.get(DELETED)
+    ).order_by('deleted_at', 'id').values_list(
+        'deleted_at', 'id', 'kind', 'object_id'
+    )
+    streams.append([
+        (stamp, DELETED, pk, kind, object_id)
+        for stamp, pk, kind, object_id in tombstones[:limit]
+    ])
+    return streams
+
+
+def changes(user, cursor=None, page_size=None, querysets=None):
+    """
+    Return the next batch of changes to a reader's feed.
+
+    Without a cursor the whole feed is returned as created items, oldest
+    change first, and the final cursor marks the point the client is in
+    sync with. With a cursor only items created, updated or deleted
+    since are returned, so a sync costs O(changes) rather than O(feed).
+
+    Changes newer than ``SYNC_LAG_SECONDS`` are held back until the next
+    sync, so rows committed late by a slow transaction are not skipped.
+
+    :param user: The reader.
+    :type user: CustomUser
+    :param cursor: ``since`` cursor from the previous response, if any.
+    :type cursor: str
+    :param page_size: Changes per batch. Defaults to ``API_PAGE_SIZE``.
+    :type page_size: int
+    :param querysets: Per-kind querysets items are loaded from.
+    :type querysets: dict
+    :return: The changes as ``(deleted, kind, item)`` triples, where
+        ``item`` is the created or updated item, or just its id when
+        ``deleted`` is True; the cursor to send next; and whether more
+        changes are waiting.
+    :rtype: tuple[list[tuple[bool, str, object]], str, bool]
+    :raises InvalidCursor: If the cursor is malformed.
+    :raises ExpiredCursor: If the client has to sync from scratch.
+    """
+    page_size = page_size or settings.API_PAGE_SIZE
+    querysets = querysets or {}
+    now = timezone.now()
+    horizon = now - timedelta(seconds=settings.SYNC_LAG_SECONDS)
+
+    if cursor:
+        positions = decode_merged_cursor(cursor, STREAMS)
+        if SYNCED not in positions:
+            raise InvalidCursor("Invalid cursor.")
+        retained = now - timedelta(days=settings.TOMBSTONE_RETENTION_DAYS)
+        deleted = positions.get(DELETED, positions[SYNCED])
+        if deleted[0] < retained:
+            raise ExpiredCursor("Sync cursor expired; sync from scratch.")
+        changed = user.subscriptions_changed_at
+        if changed is not None and changed >= positions[SYNCED][0]:
+            raise ExpiredCursor(
+                "Subscriptions changed; sync from scratch."
+            )
+    else:
+        # A new client only needs the current feed, not past deletions
+        positions = {SYNCED: (now, 0), DELETED: (horizon, 0)}
+
+    window = list(islice(
+        heapq.merge(*_streams(user, positions, horizon, page_size + 1)),
+        page_size + 1
+    ))
+    more = len(window) > page_size
+    if more:
+        window = window[:page_size]
+        for stamp, stream, pk, _, _ in window:
+            positions[stream] = (stamp, pk)
+    else:
+        # Everything before the horizon has been sent, for the
+        # subscriptions as they are now
+        positions = {stream: (horizon, 0) for stream in STREAMS}
+        positions[SYNCED] = (now, 0)
+
+    loaded = {
+        kind: {
+            item.pk: item for item in feed_cache.load(
+                kind,
+                [pk for _, stream, pk, _, _ in window if stream == kind],
+                querysets.get(kind)
+            )
+        }
+        for kind in feed_cache.KINDS
+    }
+    results = []
+    for _, stream, pk, kind, object_id in window:
+        if stream == DELETED:
+            results.append((True, kind, object_id))
+        elif pk in loaded[kind]:
+            results.append((False, kind, loaded[kind][pk]))
+    return results, encode_merged_cursor(positions), more
+
+
+def prune(before=None, batch_size=None):
+    """
+    Delete tombstones older than the retention period.
+
+    Rows are deleted in batches of primary keys so each statement stays
+    short on large tables.
+
+    :param before: Delete tombstones older than this. Defaults to
+        ``TOMBSTONE_RETENTION_DAYS`` ago.
+    :type before: datetime
+    :param batch_size: Rows deleted per query. Defaults to
+        ``TOMBSTONE_PRUNE_BATCH_SIZE``.
+    :type batch_size: int
+    :return: Number of tombstones deleted.
+    :rtype: int
+    """
+    before = before or timezone.now() - timedelta(
+        days=settings.TOMBSTONE_RETENTION_DAYS
+    )
+    batch_size = batch_size or settings.TOMBSTONE_PRUNE_BATCH_SIZE
+    deleted = 0
+    while True:
+        ids = list(
+            Tombstone.objects.filter(deleted_at__lt=before).order_by(
+                'deleted_at', 'id'
+            ).values_list('id', flat=True)[:batch_size]
+        )
+        if not ids:
+            return deleted
+        deleted += Tombstone.objects.filter(pk__in=ids).delete()[0]
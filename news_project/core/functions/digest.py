@@ -0,0 +1,182 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMessage
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.text import Truncator
+
+from core.models import Article, Newsletter, OutboxEvent, PendingDigestItem
+from .mailer import send_messages_in_chunks
+from .recipients import iter_recipient_chunks
+
+
+User = get_user_model()
+
+
+def queue_digest_items(item, kind, chunk_size=None):
+    """
+    Queue an approved item for every digest reader in its audience.
+
+    Safe to call again when an outbox event is retried: rows that already
+    exist are ignored.
+
+    :param item: Approved Article or Newsletter.
+    :type item: Article | Newsletter
+    :param kind: One of the ``OutboxEvent.KIND_*`` values.
+    :type kind: str
+    :param chunk_size: Readers inserted per query.
+    :type chunk_size: int
+    :return: Number of readers the item was queued for.
+    :rtype: int
+    """
+    queued = 0
+    for chunk in iter_recipient_chunks(item, chunk_size, digest=True):
+        PendingDigestItem.objects.bulk_create(
+            [
+                PendingDigestItem(
+                    reader_id=reader_id, kind=kind, object_id=item.pk
+                )
+                for reader_id, _ in chunk
+            ],
+            ignore_conflicts=True
+        )
+        queued += len(chunk)
+    return queued
+
+
+def format_entries(entries):
+    """
+    Format items as the sections of a multi-item email.
+
+    :param entries: ``(kind, item)`` pairs, with ``journalist`` loaded.
+    :type entries: list[tuple[str, Article | Newsletter]]
+    :return: Plain text body with one section per item.
+    :rtype: str
+    """
+    sections = []
+    for kind, item in entries:
+        if kind == OutboxEvent.KIND_ARTICLE:
+            heading = f"📰 Article: {item.title}"
+            text = item.content
+        else:
+            heading = f"📬 Newsletter: {item.title}"
+            text = item.body
+        sections.append(
+            f"{heading}\nBy {item.journalist.username}\n"
+            f"{Truncator(text).chars(settings.DIGEST_EXCERPT_LENGTH)}"
+        )
+    return "\n\n".join(sections)
+
+
+def build_digest_message(email, frequency, entries):
+    """
+    Build the digest email for one reader.
+
+    :param email: Reader's email address.
+    :type email: str
+    :param frequency: Digest frequency, used in the subject.
+    :type frequency: str
+    :param entries: ``(kind, item)`` pairs in the order they were queued.
+    :type entries: list[tuple[str, Article | Newsletter]]
+    :return: Message ready to be sent.
+    :rtype: EmailMessage
+    """
+    subject = f"Your {frequency} digest: {len(entries)} new items"
+    return EmailMessage(
+        subject,
+        format_entries(entries),
+        settings.DEFAULT_FROM_EMAIL,
+        [email]
+    )
+
+
+def send_digests(frequency, chunk_size=None):
+    """
+    Send one digest email to every reader with pending items.
+
+    Readers are processed in chunks ordered by id. Each chunk's pending
+    items are first marked as sent with a single UPDATE, and only the
+    items this run marked go into its messages, so a run that crashes
+    after sending never sends them again and concurrent runs never share
+    an item. The messages are then sent over one mail connection and the
+    items deleted; items a crashed run left marked are deleted by a later
+    run after ``DIGEST_CLAIM_SECONDS``. The daily run also flushes items
+    left behind by readers who switched back to immediate delivery.
+
+    :param frequency: ``CustomUser.DIGEST_HOURLY`` or ``DIGEST_DAILY``.
+    :type frequency: str
+    :param chunk_size: Readers per chunk. Defaults to
+        ``RECIPIENT_CHUNK_SIZE``.
+    :type chunk_size: int
+    :return: Number of digests sent.
+    :rtype: int
+    """
+    chunk_size = chunk_size or settings.RECIPIENT_CHUNK_SIZE
+    frequencies = Q(digest_frequency=frequency)
+    if frequency == User.DIGEST_DAILY:
+        frequencies |= Q(digest_frequency=User.DIGEST_IMMEDIATE)
+
+    models = {
+        OutboxEvent.KIND_ARTICLE: Article,
+        OutboxEvent.KIND_NEWSLETTER: Newsletter,
+    }
+    PendingDigestItem.objects.filter(
+        sent_at__lt=timezone.now() - timedelta(
+            seconds=settings.DIGEST_CLAIM_SECONDS
+        )
+    ).delete()
+
+    sent = 0
+    after_id = 0
+    while True:
+        readers = dict(
+            User.objects.filter(
+                frequencies,
+                pk__gt=after_id,
+                pending_digest_items__isnull=False,
+                pending_digest_items__sent_at__isnull=True
+            ).exclude(email='').distinct().order_by('pk').values_list(
+                'pk', 'email'
+            )[:chunk_size]
+        )
+        if not readers:
+            return sent
+
+        claimed_at = timezone.now()
+        PendingDigestItem.objects.filter(
+            reader_id__in=readers, sent_at__isnull=True
+        ).update(sent_at=claimed_at)
+        pending = list(
+            PendingDigestItem.objects.filter(
+                reader_id__in=readers, sent_at=claimed_at
+            ).order_by('reader_id', 'created_at', 'id').values_list(
+                'id', 'reader_id', 'kind', 'object_id'
+            )
+        )
+        items = {
+            kind: model.objects.select_related('journalist').in_bulk({
+                object_id for _, _, k, object_id in pending if k == kind
+            })
+            for kind, model in models.items()
+        }
+
+        entries = {}
+        for _, reader_id, kind, object_id in pending:
+            item = items[kind].get(object_id)
+            # Items deleted after approval are left out of the digest
+            if item is not None:
+                entries.setdefault(reader_id, []).append((kind, item))
+
+        messages = [
+            build_digest_message(readers[reader_id], frequency, reader_items)
+            for reader_id, reader_items in entries.items()
+        ]
+        send_messages_in_chunks(messages, label=f"{frequency} digest")
+        PendingDigestItem.objects.filter(
+            id__in=[pk for pk, _, _, _ in pending]
+        ).delete()
+
+        sent += len(messages)
+        after_id = max(readers)
@@ -0,0 +1,280 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from core.models import DeliveryShard
+from .mailer import send_messages_in_chunks
+from .recipients import iter_recipient_chunks
+
+
+class ShardDeliveryError(Exception):
+    """Raised when one or more shards of a fan-out could not be sent."""
+
+
+class ShardsBusy(ShardDeliveryError):
+    """Raised when shards of a fan-out are held by another worker."""
+
+
+class ShardLost(Exception):
+    """Raised when another worker has claimed a shard after its lease."""
+
+
+class ItemAudience():
+    """
+    The readers emailed individually about one approved item.
+
+    Audiences tell the fan-out who to email and what to send:
+    ``chunks()`` yields ``(id, email)`` pairs ordered by reader id and
+    ``messages()`` builds the emails for one chunk.
+
+    Attributes:
+        - item: Approved Article or Newsletter.
+        - subject: Email subject.
+        - message: Plain text body.
+        - label: Name used when logging throughput.
+    """
+
+    def __init__(self, item, subject, message):
+        self.item = item
+        self.subject = subject
+        self.message = message
+        self.label = subject
+
+    def chunks(self, chunk_size, after_id=0, last_id=None):
+        return iter_recipient_chunks(
+            self.item, chunk_size, after_id=after_id, last_id=last_id
+        )
+
+    def messages(self, chunk):
+        return [
+            EmailMessage(
+                self.subject, self.message, settings.DEFAULT_FROM_EMAIL,
+                [email]
+            )
+            for _, email in chunk
+        ]
+
+
+def plan_shards(event, audience, shard_size=None):
+    """
+    Split an audience into reader id ranges.
+
+    Shards are planned once per outbox event. If the event already has
+    shards (because an earlier attempt failed), they are reused as they
+    are so completed ranges are never sent again.
+
+    :param event: Outbox event being delivered.
+    :type event: OutboxEvent
+    :param audience: Readers to email, e.g. an :class:`ItemAudience`.
+    :type audience: ItemAudience
+    :param shard_size: Readers per shard. Defaults to ``FANOUT_SHARD_SIZE``.
+    :type shard_size: int
+    :return: Shards of the event that still need delivering.
+    :rtype: list[DeliveryShard]
+    """
+    if not event.shards.exists():
+        shard_size = shard_size or settings.FANOUT_SHARD_SIZE
+        shards = [
+            DeliveryShard(
+                event=event,
+                first_reader_id=chunk[0][0],
+                last_reader_id=chunk[-1][0]
+            )
+            for chunk in audience.chunks(shard_size)
+        ]
+        # Planning is all or nothing, so a crash here never leaves gaps
+        with transaction.atomic():
+            DeliveryShard.objects.bulk_create(shards)
+
+    return list(
+        event.shards.exclude(
+            status=DeliveryShard.STATUS_DONE
+        ).order_by('first_reader_id')
+    )
+
+
+def claim_shard(shard):
+    """
+    Claim a shard for this worker before sending it.
+
+    Pending and failed shards can be claimed, as can shards whose sender
+    has not renewed its claim for ``OUTBOX_LEASE_SECONDS``. The claim is
+    a conditional UPDATE on the status and lease read with the shard, so
+    only one worker wins it; the winner then reloads the progress.
+
+    :param shard: Shard read by :func:`plan_shards`.
+    :type shard: DeliveryShard
+    :return: True if this worker now holds the shard.
+    :rtype: bool
+    """
+    now = timezone.now()
+    lease_expired = now - timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)
+    claimed = DeliveryShard.objects.filter(
+        Q(status__in=[
+            DeliveryShard.STATUS_PENDING, DeliveryShard.STATUS_FAILED
+        ]) |
+        Q(status=DeliveryShard.STATUS_SENDING, locked_at__lt=lease_expired),
+        pk=shard.pk, status=shard.status, locked_at=shard.locked_at
+    ).update(
+        status=DeliveryShard.STATUS_SENDING,
+        locked_at=now,
+        attempts=F('attempts') + 1
+    )
+    if not claimed:
+        return False
+    shard.refresh_from_db()
+    return True
+
+
+def _save_shard(shard, **fields):
+    """
+    Save a claimed shard's progress and renew the claim.
+
+    :raises ShardLost: If another worker has claimed the shard since.
+    """
+    now = timezone.now()
+    saved = DeliveryShard.objects.filter(
+        pk=shard.pk, status=DeliveryShard.STATUS_SENDING,
+        locked_at=shard.locked_at
+    ).update(locked_at=now, updated_at=now, **fields)
+    if not saved:
+        raise ShardLost(f"Shard {shard} was claimed by another worker")
+    for name, value in fields.items():
+        setattr(shard, name, value)
+    shard.locked_at = now
+
+
+def deliver_shard(shard, audience):
+    """
+    Claim one shard of a fan-out and send it over its own mail connection.
+
+    Progress is saved after every chunk of ``EMAIL_BATCH_SIZE`` messages,
+    so a retry resumes after the last reader that was sent to. Each save
+    renews the claim and checks that this worker still holds it, so a
+    worker that lost the shard stops before sending another chunk.
+
+    :param shard: Shard to deliver.
+    :type shard: DeliveryShard
+    :param audience: Readers to email, e.g. an :class:`ItemAudience`.
+    :type audience: ItemAudience
+    :return: True if the whole shard was sent, False if it failed, None
+        if another worker holds it.
+    :rtype: bool | None
+    """
+    if not claim_shard(shard):
+        return None
+    try:
+        mail_connection = get_connection(fail_silently=False)
+        with mail_connection:
+            chunks = audience.chunks(
+                settings.EMAIL_BATCH_SIZE,
+                after_id=max(shard.progress_reader_id,
+                             shard.first_reader_id - 1),
+                last_id=shard.last_reader_id
+            )
+            for chunk in chunks:
+                send_messages_in_chunks(
+                    audience.messages(chunk),
+                    connection=mail_connection,
+                    label=audience.label
+                )
+                _save_shard(
+                    shard, progress_reader_id=chunk[-1][0],
+                    sent_count=shard.sent_count + len(chunk)
+                )
+        _save_shard(
+            shard, status=DeliveryShard.STATUS_DONE, last_error=''
+        )
+    except ShardLost:
+        return None
+    except Exception as e:
+        try:
+            _save_shard(
+                shard, status=DeliveryShard.STATUS_FAILED, last_error=str(e)
+            )
+        except ShardLost:
+            return None
+        return False
+    return True
+
+
+def _deliver_shard_in_thread(args):
+    """
+    Run :func:`deliver_shard` from a worker thread.
+
+    Worker threads own their database connection, so it is closed once
+    the shard has been handled.
+    """
+    close_old_connections()
+    try:
+        return deliver_shard(*args)
+    finally:
+        connection.close()
+
+
+def fan_out_to(event, audience, workers=None):
+    """
+    Email an audience, one shard per worker.
+
+    :param event: Outbox event being delivered.
+    :type event: OutboxEvent
+    :param audience: Readers to email, e.g. an :class:`ItemAudience`.
+    :type audience: ItemAudience
+    :param workers: Shards delivered concurrently. Defaults to
+        ``FANOUT_WORKERS``. With one worker, shards are delivered in the
+        calling thread.
+    :type workers: int
+    :raises ShardDeliveryError: If any shard failed. The outbox retries
+        the event and only the unfinished shards are sent again.
+    :raises ShardsBusy: If no shard failed but some are being sent by
+        another worker.
+    """
+    workers = workers or settings.FANOUT_WORKERS
+    shards = plan_shards(event, audience)
+    jobs = [(shard, audience) for shard in shards]
+
+    if workers <= 1 or len(jobs) <= 1:
+        results = [deliver_shard(*job) for job in jobs]
+    else:
+        with ThreadPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            results = list(pool.map(_deliver_shard_in_thread, jobs))
+
+    failed = results.count(False)
+    if failed:
+        raise ShardDeliveryError(
+            f"{failed} of {len(jobs)} shards failed for event {event.pk}"
+        )
+    busy = results.count(None)
+    if busy:
+        raise ShardsBusy(
+            f"{busy} of {len(jobs)} shards of event {event.pk} are held by "
+            "another worker"
+        )
+
+
+def fan_out(event, item, subject, message, workers=None):
+    """
+    Email an item to its whole audience, one shard per worker.
+
+    :param event: Outbox event being delivered.
+    :type event: OutboxEvent
+    :param item: Approved Article or Newsletter.
+    :type item: Article | Newsletter
+    :param subject: Email subject.
+    :type subject: str
+    :param message: Plain text body.
+    :type message: str
+    :param workers: Shards delivered concurrently. Defaults to
+        ``FANOUT_WORKERS``. With one worker, shards are delivered in the
+        calling thread.
+    :type workers: int
+    :raises ShardDeliveryError: If any shard failed. The outbox retries
+        the event and only the unfinished shards are sent again.
+    :raises ShardsBusy: If some shards are being sent by another worker.
+    """
+    fan_out_to(event, ItemAudience(item, subject, message), workers)
@@ -0,0 +1,189 @@
+import hashlib
+
+from django.db.models import Count, Max, Q
+
+from core.models import (
+    Article, Newsletter, OutboxEvent, TimelineEntry, Tombstone
+)
+from . import timeline
+
+
+def subscription_filter(user):
+    """
+    Build the filter matching items from a reader's subscriptions.
+
+    Both subscriptions are matched with ``IN`` subqueries instead of
+    joins, so every item appears once and no ``DISTINCT`` is needed.
+
+    :param user: The reader.
+    :type user: CustomUser
+    :return: Filter on ``journalist`` and ``publisher``.
+    :rtype: Q
+    """
+    return (
+        Q(journalist__in=user.subscribed_journalists.all()) |
+        Q(publisher__in=user.subscribed_publishers.all())
+    )
+
+
+def timeline_entries(user, kind):
+    """
+    Return a reader's timeline rows of one kind.
+
+    :param user: The reader.
+    :type user: CustomUser
+    :param kind: One of the ``OutboxEvent.KIND_*`` values.
+    :type kind: str
+    :return: Unordered queryset of timeline entries.
+    :rtype: QuerySet
+    """
+    return TimelineEntry.objects.filter(reader=user, kind=kind)
+
+
+def _subscribed(model, kind, user):
+    items = model.objects.filter(approved=True)
+    if timeline.enabled():
+        return items.filter(
+            pk__in=timeline_entries(user, kind).values('object_id')
+        )
+    return items.filter(subscription_filter(user))
+
+
+def subscribed_articles(user):
+    """
+    Return the approved articles from a reader's subscriptions.
+
+    Read from the reader's timeline when ``FEED_TIMELINE_ENABLED`` is
+    set, otherwise from their subscriptions.
+
+    :param user: The reader.
+    :type user: CustomUser
+    :return: Unordered queryset of articles.
+    :rtype: QuerySet
+    """
+    return _subscribed(Article, OutboxEvent.KIND_ARTICLE, user)
+
+
+def subscribed_newsletters(user):
+    """
+    Return the approved newsletters from a reader's subscriptions.
+
+    Read from the reader's timeline when ``FEED_TIMELINE_ENABLED`` is
+    set, otherwise from their subscriptions.
+
+    :param user: The reader.
+    :type user: CustomUser
+    :return: Unordered queryset of newsletters.
+    :rtype: QuerySet
+    """
+    return _subscribed(Newsletter, OutboxEvent.KIND_NEWSLETTER, user)
+
+
+def removed_at(user, kind):
+    """
+    Return when an approved item last left a reader's feed.
+
+    Read from the tombstones of the reader's sources, so unlike the
+    newest ``updated_at`` of the remaining items it never moves back
+    when an item is deleted or unapproved.
+
+    :param user: The reader.
+    :type user: CustomUser
+    :param kind: One of the ``OutboxEvent.KIND_*`` values.
+    :type kind: str
+    :return: Time of the latest removal, or None.
+    :rtype: datetime | None
+    """
+    return Tombstone.objects.filter(
+        Q(journalist_id__in=user.subscribed_journalists.values('pk')) |
+        Q(publisher_id__in=user.subscribed_publishers.values('pk')),
+        kind=kind
+    ).aggregate(removed=Max('deleted_at'))['removed']
+
+
+def positions(user, kind, after=None):
+    """
+    Return the ``(created_at, id)`` of a reader's feed items, newest first.
+
+    With the timeline enabled this is a range scan of the reader's own
+    timeline rows.
+
+    :param user: The reader.
+    :type user: CustomUser
+    :param kind: One of the ``OutboxEvent.KIND_*`` values.
+    :type kind: str
+    :param after: Only include items older than this ``(created_at,
+        id)`` position.
+    :type after: tuple
+    :return: Queryset of ``(created_at, id)`` tuples.
+    :rtype: QuerySet
+    """
+    if timeline.enabled():
+        queryset, id_field = timeline_entries(user, kind), 'object_id'
+    else:
+        subscribed = (
+            subscribed_articles if kind == OutboxEvent.KIND_ARTICLE
+            else subscribed_newsletters
+        )
+        queryset, id_field = subscribed(user), 'id'
+
+    if after is not None:
+        created_at, pk = after
+        queryset = queryset.filter(
+            Q(created_at__lt=created_at) |
+            Q(created_at=created_at, **{f'{id_field}__lt': pk})
+        )
+    return queryset.order_by('-created_at', '-' + id_field).values_list(
+        'created_at', id_field
+    )
+
+
+def articles_validators(user, variant='', stats=None):
+    """
+    Compute the cache validators of a reader's article feed.
+
+    The feed changes when an approved article from a subscription is
+    added, edited, unapproved or deleted, or when the reader's
+    subscriptions change. The newest ``updated_at`` and the number of
+    matching articles cover additions and edits in one aggregate query;
+    the latest tombstone of the reader's sources covers removals, so the
+    last modification time never moves back; ``subscriptions_changed_at``
+    on the already loaded user covers subscription changes.
+
+    :param user: The reader.
+    :type user: CustomUser
+    :param variant: Distinguishes representations of the same feed,
+        e.g. the query string of a page, so each gets its own ETag.
+    :type variant: str
+    :param stats: Precomputed ``latest``, ``count`` and ``removed``,
+        e.g. a feed cache entry. Aggregated from the database when
+        omitted.
+    :type stats: dict
+    :return: The feed's ETag and last modification time (None when the
+        feed has never had content or subscriptions).
+    :rtype: tuple[str, datetime | None]
+    """
+    if stats is None:
+        stats = subscribed_articles(user).aggregate(
+            latest=Max('updated_at'), count=Count('id')
+        )
+        stats['removed'] = removed_at(user, OutboxEvent.KIND_ARTICLE)
+    stamps = [
+        stamp for stamp in (
+            stats['latest'], stats.get('removed'),
+            user.subscriptions_changed_at
+        )
+        if stamp is not None
+    ]
+    last_modified = max(stamps) if stamps else None
+
+    key = '{}:{}:{}:{}:{}:{}'.format(
+        user.pk,
+        variant,
+        user.subscriptions_changed_at and user.subscriptions_changed_at
+        .isoformat(),
+        stats['latest'] and stats['latest'].isoformat(),
+        stats.get('removed') and stats['removed'].isoformat(),
+        stats['count'],
+    )
+    return hashlib.md5(key.encode()).hexdigest(), last_modified
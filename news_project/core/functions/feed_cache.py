@@ -0,0 +1,532 @@
+import heapq
+import threading
+import time
+import uuid
+import hashlib
+from collections import Counter
+from functools import partial
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Count, Max
+
+from core.models import Article, Newsletter
+from core.pagination import (
+    decode_cursor, decode_merged_cursor, encode_cursor, encode_merged_cursor
+)
+from . import feed
+
+
+KINDS = {
+    'article': (Article, feed.subscribed_articles),
+    'newsletter': (Newsletter, feed.subscribed_newsletters),
+}
+STATS_KEYS = {'hits': 'feed:stats:hits', 'misses': 'feed:stats:misses'}
+
+
+def get_cache():
+    """Return the cache configured by ``FEED_CACHE_ALIAS``."""
+    return caches[settings.FEED_CACHE_ALIAS]
+
+
+# Counters of this process not yet added to the shared ones
+_pending = Counter()
+_pending_lock = threading.Lock()
+_flushed_at = time.monotonic()
+
+
+def _count(name):
+    with _pending_lock:
+        _pending[name] += 1
+
+
+def flush_stats(force=False):
+    """
+    Add this process's hit and miss counts to the shared counters.
+
+    Reads only count in memory, so the request path never writes to the
+    cache for statistics. Called when a request finishes, and then only
+    once every ``FEED_CACHE_STATS_INTERVAL`` seconds.
+
+    :param force: Flush even if the interval has not elapsed.
+    :type force: bool
+    """
+    global _flushed_at
+    with _pending_lock:
+        now = time.monotonic()
+        interval = settings.FEED_CACHE_STATS_INTERVAL
+        if not force and now - _flushed_at < interval:
+            return
+        _flushed_at = now
+        counts = dict(_pending)
+        _pending.clear()
+
+    cache = get_cache()
+    for name, count in counts.items():
+        key = STATS_KEYS[name]
+        try:
+            cache.incr(key, count)
+        except ValueError:
+            # incr() raises for missing keys; add() keeps racing workers safe
+            if not cache.add(key, count, None):
+                cache.incr(key, count)
+
+
+def _version_key(kind, source, pk):
+    return f'feed:v:{kind}:{source}:{pk}'
+
+
+def _subscriptions_key(reader_id):
+    return f'feed:subs:{reader_id}'
+
+
+def subscriptions(user):
+    """
+    Return the journalists and publishers a reader follows.
+
+    Cached until :func:`forget_subscriptions` is called for the reader.
+
+    :param user: The reader.
+    :type user: CustomUser
+    :return: Sorted journalist ids and sorted publisher ids.
+    :rtype: tuple[list[int], list[int]]
+    """
+    cache = get_cache()
+    key = _subscriptions_key(user.pk)
+    sources = cache.get(key)
+    if sources is None:
+        sources = (
+            sorted(user.subscribed_journalists.values_list('pk', flat=True)),
+            sorted(user.subscribed_publishers.values_list('pk', flat=True)),
+        )
+        cache.set(key, sources, settings.FEED_CACHE_TIMEOUT)
+    return sources
+
+
+def _source_versions(kind, journalist_ids, publisher_ids, create=True):
+    """
+    Return the current version token of every followed source.
+
+    Tokens are random rather than counters, so a token evicted from the
+    cache is replaced by a new one and can never bring back an entry
+    built from older content. With ``create=False`` missing tokens are
+    not written and None is returned instead.
+    """
+    cache = get_cache()
+    keys = [_version_key(kind, 'j', pk) for pk in journalist_ids]
+    keys += [_version_key(kind, 'p', pk) for pk in publisher_ids]
+    versions = cache.get_many(keys)
+    if not create and len(versions) < len(keys):
+        return None
+    missing = {
+        key: uuid.uuid4().hex for key in keys if key not in versions
+    }
+    if missing:
+        # One round trip for all of them. Racing requests may each set
+        # a token, which only costs a miss: a token is never reused
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return [(key, versions.get(key)) for key in keys]
+
+
+def _set_versions(keys):
+    get_cache().set_many({key: uuid.uuid4().hex for key in keys}, None)
+
+
+def bump(kind, journalist_ids=(), publisher_ids=()):
+    """
+    Invalidate the feeds of every reader following the given sources.
+
+    Only the sources' version tokens change; readers' entries are keyed
+    by the tokens of the sources they follow, so stale entries are
+    simply never read again and expire on their own.
+
+    Tokens are replaced now and again once the current transaction
+    commits, so a feed rebuilt by a concurrent request from the
+    uncommitted state in between is never reused either.
+
+    :param kind: ``'article'`` or ``'newsletter'``.
+    :type kind: str
+    :param journalist_ids: Journalists whose content changed.
+    :type journalist_ids: Iterable[int]
+    :param publisher_ids: Publishers whose content changed.
+    :type publisher_ids: Iterable[int]
+    """
+    keys = [_version_key(kind, 'j', pk) for pk in journalist_ids if pk]
+    keys += [_version_key(kind, 'p', pk) for pk in publisher_ids if pk]
+    if keys:
+        _set_versions(keys)
+        transaction.on_commit(partial(_set_versions, keys))
+
+
+def forget_subscriptions(reader_ids):
+    """
+    Invalidate the feeds of readers whose subscriptions changed.
+
+    :param reader_ids: Primary keys of the readers.
+    :type reader_ids: Iterable[int]
+    """
+    get_cache().delete_many(
+        [_subscriptions_key(pk) for pk in reader_ids]
+    )
+
+
+def _entry_key(user, kind, versions):
+    digest = hashlib.md5(repr(versions).encode()).hexdigest()
+    return f'feed:{kind}:{user.pk}:{digest}'
+
+
+def cached_feed(user, kind):
+    """
+    Return a reader's cached feed, or None, without writing anything.
+
+    Unlike :func:`get_feed` a miss is not rebuilt and no subscription
+    list or version token is stored, so conditional requests can be
+    answered with cache reads alone.
+
+    :param user: The reader.
+    :type user: CustomUser
+    :param kind: ``'article'`` or ``'newsletter'``.
+    :type kind: str
+    :return: The entry :func:`get_feed` would return, or None.
+    :rtype: dict | None
+    """
+    sources = get_cache().get(_subscriptions_key(user.pk))
+    if sources is None:
+        return None
+    versions = _source_versions(kind, *sources, create=False)
+    if versions is None:
+        return None
+    entry = get_cache().get(_entry_key(user, kind, versions))
+    if entry is not None:
+        _count('hits')
+    return entry
+
+
+def get_feed(user, kind):
+    """
+    Return a reader's cached feed, building it on a miss.
+
+    The entry holds the ``(created_at, id)`` positions of the newest
+    ``FEED_CACHE_SIZE`` items, newest first, plus the newest
+    ``updated_at``, the item count and the latest removal used as cache
+    validators.
+
+    :param user: The reader.
+    :type user: CustomUser
+    :param kind: ``'article'`` or ``'newsletter'``.
+    :type kind: str
+    :return: Dict with ``items``, ``complete`` (True if ``items`` holds
+        the whole feed), ``latest``, ``count`` and ``removed``.
+    :rtype: dict
+    """
+    journalist_ids, publisher_ids = subscriptions(user)
+    versions = _source_versions(kind, journalist_ids, publisher_ids)
+    key = _entry_key(user, kind, versions)
+
+    cache = get_cache()
+    entry = cache.get(key)
+    if entry is not None:
+        _count('hits')
+        return entry
+
+    _count('misses')
+    size = settings.FEED_CACHE_SIZE
+    queryset = KINDS[kind][1](user)
+    items = list(feed.positions(user, kind)[:size + 1])
+    entry = {
+        'items': items[:size],
+        'complete': len(items) <= size,
+        **queryset.aggregate(latest=Max('updated_at'), count=Count('id')),
+        'removed': feed.removed_at(user, kind),
+    }
+    cache.set(key, entry, settings.FEED_CACHE_TIMEOUT)
+    return entry
+
+
+def feed_queryset(user, kind):
+    """
+    Return a reader's feed, newest first, using the cached ids.
+
+    When the cached entry holds the whole feed the items are fetched by
+    primary key; otherwise the subscription query is used.
+
+    :param user: The reader.
+    :type user: CustomUser
+    :param kind: ``'article'`` or ``'newsletter'``.
+    :type kind: str
+    :return: Ordered queryset of items.
+    :rtype: QuerySet
+    """
+    model, subscribed = KINDS[kind]
+    entry = get_feed(user, kind)
+    if entry['complete']:
+        queryset = model.objects.filter(
+            pk__in=[pk for _, pk in entry['items']]
+        )
+    else:
+        queryset = subscribed(user)
+    return queryset.order_by('-created_at', '-id')
+
+
+def positions_after(user, kind, after=None, limit=None, entry=None):
+    """
+    Return the next ``limit`` positions of a reader's feed.
+
+    Served from the cached entry when it covers them, otherwise by a
+    keyset query on the reader's timeline or subscriptions.
+
+    :param user: The reader.
+    :type user: CustomUser
+    :param kind: ``'article'`` or ``'newsletter'``.
+    :type kind: str
+    :param after: Position to continue after, or None for the newest.
+    :type after: tuple
+    :param limit: Number of positions. Defaults to ``API_PAGE_SIZE``.
+    :type limit: int
+    :param entry: Entry already returned by :func:`get_feed`.
+    :type entry: dict
+    :return: ``(created_at, id)`` tuples, newest first.
+    :rtype: list[tuple]
+    """
+    entry = entry or get_feed(user, kind)
+    limit = limit or settings.API_PAGE_SIZE
+    items = entry['items']
+    if after is not None:
+        items = [item for item in items if item < tuple(after)]
+    if len(items) >= limit or entry['complete']:
+        return items[:limit]
+    return list(feed.positions(user, kind, after)[:limit])
+
+
+def load(kind, ids, queryset=None):
+    """
+    Load items by primary key, keeping the order of ``ids``.
+
+    :param kind: ``'article'`` or ``'newsletter'``.
+    :type kind: str
+    :param ids: Primary keys to load.
+    :type ids: list[int]
+    :param queryset: Queryset to load from, e.g. limited with
+        ``only()``. Defaults to all items of the kind.
+    :type queryset: QuerySet
+    :return: The items that still exist.
+    :rtype: list
+    """
+    if queryset is None:
+        queryset = KINDS[kind][0].objects.all()
+    objects = queryset.in_bulk(ids)
+    return [objects[pk] for pk in ids if pk in objects]
+
+
+async def aload(kind, ids, queryset=None):
+    """
+    Async version of :func:`load`, using the async ORM.
+    """
+    if queryset is None:
+        queryset = KINDS[kind][0].objects.all()
+    objects = await queryset.ain_bulk(ids)
+    return [objects[pk] for pk in ids if pk in objects]
+
+
+def page_window(user, kind, cursor=None, page_size=None, entry=None):
+    """
+    Return the positions of one page of a reader's feed.
+
+    :return: ``(created_at, id)`` positions of the page and the next
+        page's cursor, or None on the last page.
+    :rtype: tuple[list[tuple], str | None]
+    :raises InvalidCursor: If the cursor is malformed.
+    """
+    page_size = page_size or settings.API_PAGE_SIZE
+    after = decode_cursor(cursor) if cursor else None
+    window = positions_after(user, kind, after, page_size + 1, entry)
+
+    next_cursor = None
+    if len(window) > page_size:
+        window = window[:page_size]
+        next_cursor = encode_cursor(*window[-1])
+    return window, next_cursor
+
+
+def page(user, kind, cursor=None, page_size=None, entry=None,
+         queryset=None):
+    """
+    Return one keyset page of a reader's feed, served from the cache.
+
+    Same contract as :func:`core.pagination.keyset_page`. Pages within
+    the cached items cost one primary key lookup; deeper pages fall back
+    to the reader's timeline or, without it, the subscription query.
+
+    :param user: The reader.
+    :type user: CustomUser
+    :param kind: ``'article'`` or ``'newsletter'``.
+    :type kind: str
+    :param cursor: Cursor of the previous page's last item, if any.
+    :type cursor: str
+    :param page_size: Items per page. Defaults to ``API_PAGE_SIZE``.
+    :type page_size: int
+    :param entry: Entry already returned by :func:`get_feed`.
+    :type entry: dict
+    :param queryset: Queryset the page's items are loaded from, e.g.
+        limited with ``only()``. Defaults to all items of the kind.
+    :type queryset: QuerySet
+    :return: The page's items and the next page's cursor, or None on
+        the last page.
+    :rtype: tuple[list, str | None]
+    :raises InvalidCursor: If the cursor is malformed.
+    """
+    window, next_cursor = page_window(user, kind, cursor, page_size, entry)
+    return load(kind, [pk for _, pk in window], queryset), next_cursor
+
+
+async def apage(user, kind, cursor=None, page_size=None, entry=None,
+                queryset=None):
+    """
+    Async version of :func:`page`.
+
+    The positions come from the cache, or from a keyset query run in a
+    worker thread on a miss; the items are loaded with the async ORM.
+    """
+    window, next_cursor = await sync_to_async(page_window)(
+        user, kind, cursor, page_size, entry
+    )
+    items = await aload(kind, [pk for _, pk in window], queryset)
+    return items, next_cursor
+
+
+def merged_window(user, cursor=None, page_size=None):
+    """
+    Return the positions of one page of a reader's merged feed.
+
+    :return: ``(created_at, kind, id)`` positions of the page and the
+        next page's cursor, or None on the last page.
+    :rtype: tuple[list[tuple], str | None]
+    :raises InvalidCursor: If the cursor is malformed.
+    """
+    page_size = page_size or settings.API_PAGE_SIZE
+    after = decode_merged_cursor(cursor, KINDS) if cursor else {}
+
+    # Ties on created_at are broken by kind, then id, in every list
+    sources = [
+        [
+            (created_at, kind, pk) for created_at, pk in positions_after(
+                user, kind, after.get(kind), page_size + 1
+            )
+        ]
+        for kind in KINDS
+    ]
+    window = list(
+        islice(heapq.merge(*sources, reverse=True), page_size + 1)
+    )
+
+    next_cursor = None
+    if len(window) > page_size:
+        window = window[:page_size]
+        for created_at, kind, pk in window:
+            after[kind] = (created_at, pk)
+        next_cursor = encode_merged_cursor(after)
+    return window, next_cursor
+
+
+def _interleave(window, loaded):
+    return [
+        (kind, loaded[kind][pk]) for _, kind, pk in window
+        if pk in loaded[kind]
+    ]
+
+
+def _window_ids(window, kind):
+    return [pk for _, item_kind, pk in window if item_kind == kind]
+
+
+def merged_page(user, cursor=None, page_size=None, querysets=None):
+    """
+    Return one page of a reader's articles and newsletters interleaved.
+
+    Each kind contributes at most ``page_size + 1`` positions, newest
+    first, from the cache or an indexed keyset query; the two sorted
+    lists are k-way merged with :func:`heapq.merge`, so nothing larger
+    than a page is ever sorted. The cursor records the last position
+    returned of each kind, so every kind resumes exactly where it
+    stopped.
+
+    :param user: The reader.
+    :type user: CustomUser
+    :param cursor: Cursor from the previous page, if any.
+    :type cursor: str
+    :param page_size: Items per page. Defaults to ``API_PAGE_SIZE``.
+    :type page_size: int
+    :param querysets: Per-kind querysets the items are loaded from.
+    :type querysets: dict
+    :return: ``(kind, item)`` pairs, newest first, and the next page's
+        cursor, or None on the last page.
+    :rtype: tuple[list[tuple[str, Model]], str | None]
+    :raises InvalidCursor: If the cursor is malformed.
+    """
+    querysets = querysets or {}
+    window, next_cursor = merged_window(user, cursor, page_size)
+    loaded = {
+        kind: {
+            item.pk: item for item in load(
+                kind, _window_ids(window, kind), querysets.get(kind)
+            )
+        }
+        for kind in KINDS
+    }
+    return _interleave(window, loaded), next_cursor
+
+
+async def amerged_page(user, cursor=None, page_size=None, querysets=None):
+    """
+    Async version of :func:`merged_page`.
+
+    The positions are merged in a worker thread; the items are loaded
+    with the async ORM.
+    """
+    querysets = querysets or {}
+    window, next_cursor = await sync_to_async(merged_window)(
+        user, cursor, page_size
+    )
+    loaded = {}
+    for kind in KINDS:
+        items = await aload(
+            kind, _window_ids(window, kind), querysets.get(kind)
+        )
+        loaded[kind] = {item.pk: item for item in items}
+    return _interleave(window, loaded), next_cursor
+
+
+def stats():
+    """
+    Return the hit and miss counters of the feed cache.
+
+    The shared counters cover every process up to its last flush; this
+    process's unflushed counts are added on top.
+
+    :return: ``hits``, ``misses`` and ``hit_ratio``.
+    :rtype: dict
+    """
+    counters = get_cache().get_many(list(STATS_KEYS.values()))
+    with _pending_lock:
+        pending = dict(_pending)
+    hits = counters.get(STATS_KEYS['hits'], 0) + pending.get('hits', 0)
+    misses = (
+        counters.get(STATS_KEYS['misses'], 0) + pending.get('misses', 0)
+    )
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': round(hits / total, 3) if total else 0.0,
+    }
+
+
+def reset_stats():
+    """Reset the hit and miss counters."""
+    with _pending_lock:
+        _pending.clear()
+    get_cache().delete_many(list(STATS_KEYS.values()))
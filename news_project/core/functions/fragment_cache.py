@@ -0,0 +1,165 @@
+import hashlib
+import uuid
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import models, transaction
+
+
+LIST = 'list'
+
+
+def get_cache():
+    """Return the cache configured by ``FRAGMENT_CACHE_ALIAS``."""
+    return caches[settings.FRAGMENT_CACHE_ALIAS]
+
+
+def _version_key(ref):
+    name, pk = ref
+    return f'fragment:v:{name}:{pk}'
+
+
+def object_ref(instance):
+    """Return the version reference of a model instance."""
+    return (instance._meta.model_name, instance.pk)
+
+
+def list_ref(kind):
+    """
+    Return the version reference of every list of one kind of item.
+
+    :param kind: ``'article'`` or ``'newsletter'``.
+    :type kind: str
+    """
+    return (LIST, kind)
+
+
+def refs_for(instance):
+    """
+    Return the references a rendered item depends on.
+
+    Articles and newsletters show their journalist and publisher, so
+    their fragments also vary on those.
+
+    :param instance: Model instance rendered by a fragment.
+    :type instance: Model
+    :return: ``(model_name, pk)`` references.
+    :rtype: list[tuple]
+    """
+    refs = [object_ref(instance)]
+    journalist_id = getattr(instance, 'journalist_id', None)
+    if journalist_id:
+        refs.append(('customuser', journalist_id))
+    publisher_id = getattr(instance, 'publisher_id', None)
+    if publisher_id:
+        refs.append(('publisher', publisher_id))
+    return refs
+
+
+def versions(refs):
+    """
+    Return the current version token of every reference.
+
+    Tokens are random rather than counters, so a token evicted from the
+    cache is replaced by a new one and can never bring back a fragment
+    rendered from older content.
+
+    :param refs: ``(name, pk)`` references.
+    :type refs: Iterable[tuple]
+    :return: Tokens in the order of ``refs``.
+    :rtype: list[str]
+    """
+    cache = get_cache()
+    keys = [_version_key(ref) for ref in refs]
+    tokens = cache.get_many(keys)
+    missing = {
+        key: uuid.uuid4().hex for key in keys if key not in tokens
+    }
+    if missing:
+        # One round trip for all of them. Racing requests may each set
+        # a token, which only costs a miss: a token is never reused
+        cache.set_many(missing, None)
+        tokens.update(missing)
+    return [tokens.get(key) for key in keys]
+
+
+def _set_versions(keys):
+    get_cache().set_many({key: uuid.uuid4().hex for key in keys}, None)
+
+
+def bump(refs):
+    """
+    Invalidate every fragment depending on the given references.
+
+    Tokens are replaced now and again once the current transaction
+    commits, so a fragment rendered by a concurrent request from the
+    old rows in between is never reused either.
+
+    :param refs: ``(name, pk)`` references that changed.
+    :type refs: Iterable[tuple]
+    """
+    keys = [_version_key(ref) for ref in dict.fromkeys(refs)]
+    if keys:
+        _set_versions(keys)
+        transaction.on_commit(partial(_set_versions, keys))
+
+
+def fragment_key(name, refs=(), vary=()):
+    """
+    Build the cache key of a fragment.
+
+    :param name: Name of the fragment, e.g. ``'article-detail'``.
+    :type name: str
+    :param refs: References the fragment depends on.
+    :type refs: Iterable[tuple]
+    :param vary: Other values the fragment depends on.
+    :type vary: Iterable
+    :return: Cache key.
+    :rtype: str
+    """
+    refs = list(dict.fromkeys(refs))
+    digest = hashlib.md5(
+        repr((list(vary), refs, versions(refs))).encode()
+    ).hexdigest()
+    return f'fragment:{name}:{digest}'
+
+
+def get_fragment(key):
+    """Return the cached HTML of a fragment, or None."""
+    return get_cache().get(key)
+
+
+def set_fragment(key, html):
+    """Store the HTML of a fragment for ``FRAGMENT_CACHE_TIMEOUT``."""
+    get_cache().set(key, html, settings.FRAGMENT_CACHE_TIMEOUT)
+
+
+def split_args(values):
+    """
+    Split the arguments of a fragment into references and vary values.
+
+    Model instances, and lists or querysets of them, contribute their
+    :func:`refs_for`; anything else is a vary value.
+
+    :param values: Resolved arguments.
+    :type values: Iterable
+    :return: References and vary values.
+    :rtype: tuple[list[tuple], list]
+    """
+    refs, vary = [], []
+    for value in values:
+        if isinstance(value, models.Model):
+            refs += refs_for(value)
+        elif isinstance(value, (list, tuple, models.QuerySet)):
+            items = list(value)
+            if all(isinstance(item, models.Model) for item in items):
+                for item in items:
+                    refs += refs_for(item)
+                # An empty list still differs from a missing one
+                vary.append(len(items))
+            else:
+                vary.append(items)
+        else:
+            vary.append(value)
+    return refs, vary
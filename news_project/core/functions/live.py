@@ -0,0 +1,324 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Max
+from django.utils.module_loading import import_string
+
+from core.models import OutboxEvent
+from core.serializers import FeedItemSerializer
+from . import feed_cache
+
+
+logger = logging.getLogger(__name__)
+
+
+def load_events(kind, queryset):
+    """
+    Serialize approved items as live events.
+
+    :param kind: ``'article'`` or ``'newsletter'``.
+    :type kind: str
+    :param queryset: Items of that kind.
+    :type queryset: QuerySet
+    :return: One dict per item, shaped like the merged feed's items.
+    :rtype: list[dict]
+    """
+    serializer = FeedItemSerializer()
+    items = serializer.select(kind, queryset)
+    return serializer.serialize((kind, item) for item in items)
+
+
+class BaseLiveBackend():
+    """
+    Interface for backends that carry approval events to web processes.
+
+    Backends are selected with the ``LIVE_BACKEND`` setting. Each web
+    process runs a single ``listen()`` loop however many clients are
+    connected; the :class:`Broker` fans its events out in memory.
+    """
+
+    def publish(self, kind, item):
+        """
+        Announce an item that was just delivered. Called by the outbox
+        worker; backends that discover events on their own ignore it.
+
+        :param kind: ``'article'`` or ``'newsletter'``.
+        :type kind: str
+        :param item: The approved item.
+        :type item: Article | Newsletter
+        """
+
+    def listen(self):
+        """
+        Yield events for items approved from now on. Implemented as an
+        async generator.
+
+        :return: Async iterator of event dicts.
+        :rtype: AsyncIterator[dict]
+        """
+        raise NotImplementedError
+
+
+class PollingBackend(BaseLiveBackend):
+    """
+    Finds new approvals by polling the outbox.
+
+    Every approval records an outbox event in its own transaction, so
+    web processes page through events by id, which unlike a timestamp
+    does not depend on the clock: one primary key query per
+    ``LIVE_POLL_INTERVAL`` serves all of a process's connections, plus
+    one while there are gaps.
+
+    An event id is assigned when the approving transaction inserts it,
+    not when it commits, so an id passed over by a poll may still turn
+    up. Such gaps are looked up again on every poll until
+    ``LIVE_GAP_SECONDS`` have passed, after which the transaction is
+    assumed to have rolled back.
+    """
+
+    def start(self):
+        """
+        Return the position of the newest event, so only approvals from
+        now on are announced.
+
+        :return: Position to pass to :meth:`poll`.
+        :rtype: dict
+        """
+        last = OutboxEvent.objects.aggregate(last=Max('id'))['last']
+        return {'after': last or 0, 'gaps': {}}
+
+    def poll(self, position):
+        """
+        Return items approved after ``position``, oldest first.
+
+        :param position: Highest event id reached (``after``) and the
+            lower ids not seen yet (``gaps``), with the time each was
+            first missed.
+        :type position: dict
+        :return: The events and the new position.
+        :rtype: tuple[list[dict], dict]
+        """
+        now = time.monotonic()
+        after = position['after']
+        gaps = {
+            pk: missed_at for pk, missed_at in position['gaps'].items()
+            if now - missed_at < settings.LIVE_GAP_SECONDS
+        }
+        columns = ('id', 'kind', 'object_id', 'payload')
+        rows = list(
+            OutboxEvent.objects.filter(id__gt=after).order_by(
+                'id'
+            ).values_list(*columns)[:settings.LIVE_POLL_LIMIT]
+        )
+        if gaps:
+            # Separate lookup, so both queries stay primary key seeks
+            rows = list(
+                OutboxEvent.objects.filter(pk__in=list(gaps)).order_by(
+                    'id'
+                ).values_list(*columns)
+            ) + rows
+
+        approved = defaultdict(list)
+        for pk, kind, object_id, payload in rows:
+            gaps.pop(pk, None)
+            if kind == OutboxEvent.KIND_BULK:
+                for bulk_kind, ids in payload.items():
+                    approved[bulk_kind] += ids
+            elif kind in feed_cache.KINDS:
+                approved[kind].append(object_id)
+        if rows and rows[-1][0] > after:
+            seen = {pk for pk, _, _, _ in rows}
+            gaps.update(
+                (pk, now) for pk in range(after + 1, rows[-1][0])
+                if pk not in seen
+            )
+            after = rows[-1][0]
+
+        events = []
+        for kind, (model, _) in feed_cache.KINDS.items():
+            if approved[kind]:
+                events += load_events(
+                    kind, model.objects.filter(
+                        pk__in=approved[kind], approved=True
+                    ).order_by('approved_at', 'id')
+                )
+        return events, {'after': after, 'gaps': gaps}
+
+    async def listen(self):
+        position = await sync_to_async(self.start)()
+        while True:
+            await asyncio.sleep(settings.LIVE_POLL_INTERVAL)
+            events, position = await sync_to_async(self.poll)(position)
+            for event in events:
+                yield event
+
+
+class LocMemBackend(BaseLiveBackend):
+    """
+    Passes published events straight to listeners in the same process.
+
+    Useful for tests and single-process deployments that run the outbox
+    in the web process. Events from other processes are never seen.
+    """
+    _listeners = []
+    _lock = threading.Lock()
+
+    def publish(self, kind, item):
+        events = load_events(kind, type(item).objects.filter(pk=item.pk))
+        with self._lock:
+            listeners = list(self._listeners)
+        for loop, queue in listeners:
+            if loop.is_closed():
+                continue
+            for event in events:
+                loop.call_soon_threadsafe(queue.put_nowait, event)
+
+    async def listen(self):
+        listener = (asyncio.get_running_loop(), asyncio.Queue())
+        with self._lock:
+            self._listeners.append(listener)
+        try:
+            while True:
+                yield await listener[1].get()
+        finally:
+            with self._lock:
+                self._listeners.remove(listener)
+
+
+def get_backend(backend=None):
+    """
+    Instantiate the configured live backend.
+
+    :param backend: Dotted path of a backend class. Defaults to
+        ``LIVE_BACKEND``.
+    :type backend: str
+    :return: Backend instance.
+    :rtype: BaseLiveBackend
+    """
+    return import_string(backend or settings.LIVE_BACKEND)()
+
+
+def publish(kind, item):
+    """
+    Announce a delivered item through the configured backend.
+
+    :param kind: ``'article'`` or ``'newsletter'``.
+    :type kind: str
+    :param item: The approved item.
+    :type item: Article | Newsletter
+    """
+    get_backend().publish(kind, item)
+
+
+class Subscription():
+    """
+    One connected reader's queue of events.
+
+    Attributes:
+        - keys: Sources followed, as ``('j', id)`` and ``('p', id)``.
+        - queue: Events waiting to be sent, at most ``LIVE_QUEUE_SIZE``.
+        - overflowed: True once events were dropped because the client
+          reads too slowly; the stream then asks it to resync.
+    """
+
+    def __init__(self, journalist_ids, publisher_ids):
+        self.keys = {('j', pk) for pk in journalist_ids}
+        self.keys |= {('p', pk) for pk in publisher_ids}
+        self.queue = asyncio.Queue(maxsize=settings.LIVE_QUEUE_SIZE)
+        self.overflowed = False
+
+    def put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class Broker():
+    """
+    In-process fan-out of live events to connected readers.
+
+    Connections are indexed by the sources they follow, so dispatching
+    an event touches only its audience. The backend is listened to by a
+    single task, started with the first connection and cancelled with
+    the last, so idle connections cost a queue each and no queries.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or get_backend()
+        self.subscribers = defaultdict(set)
+        self.count = 0
+        self.task = None
+
+    def subscribe(self, journalist_ids, publisher_ids):
+        """
+        Register a connection.
+
+        :param journalist_ids: Journalists the reader follows.
+        :type journalist_ids: Iterable[int]
+        :param publisher_ids: Publishers the reader follows.
+        :type publisher_ids: Iterable[int]
+        :return: The connection's subscription.
+        :rtype: Subscription
+        """
+        subscription = Subscription(journalist_ids, publisher_ids)
+        for key in subscription.keys:
+            self.subscribers[key].add(subscription)
+        self.count += 1
+        if self.task is None:
+            self.task = asyncio.get_running_loop().create_task(self.run())
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Unregister a connection, stopping the listener after the last."""
+        for key in subscription.keys:
+            self.subscribers[key].discard(subscription)
+            if not self.subscribers[key]:
+                del self.subscribers[key]
+        self.count -= 1
+        if not self.count and self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    def dispatch(self, event):
+        """Queue an event for every connection following its sources."""
+        targets = set(self.subscribers.get(('j', event['journalist']), ()))
+        if event['publisher']:
+            targets |= self.subscribers.get(('p', event['publisher']), set())
+        for subscription in targets:
+            subscription.put(event)
+
+    async def run(self):
+        """Dispatch the backend's events, restarting it after errors."""
+        while True:
+            try:
+                async for event in self.backend.listen():
+                    self.dispatch(event)
+            except Exception:
+                logger.exception("Live backend failed, restarting")
+                await asyncio.sleep(settings.LIVE_POLL_INTERVAL)
+
+
+_brokers = {}
+
+
+def get_broker():
+    """
+    Return the broker of the running event loop.
+
+    An ASGI worker runs one loop, so all of its connections share one
+    broker and one backend listener.
+
+    :rtype: Broker
+    """
+    loop = asyncio.get_running_loop()
+    for other in [other for other in _brokers if other.is_closed()]:
+        del _brokers[other]
+    if loop not in _brokers:
+        _brokers[loop] = Broker()
+    return _brokers[loop]
@@ -0,0 +1,110 @@
+import logging
+import time
+from collections import namedtuple
+from itertools import islice
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+
+from .ratelimit import throttle
+
+
+logger = logging.getLogger(__name__)
+
+ChunkStats = namedtuple('ChunkStats', ['sent', 'elapsed', 'rate'])
+
+
+def chunked(iterable, size):
+    """
+    Split an iterable into lists of at most ``size`` items.
+
+    :param iterable: Items to split.
+    :type iterable: Iterable
+    :param size: Maximum number of items per chunk.
+    :type size: int
+    :return: Generator of lists.
+    :rtype: Iterator[list]
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def send_messages_in_chunks(messages, chunk_size=None, connection=None,
+                            label=''):
+    """
+    Send pre-built messages over a single mail connection in chunks.
+
+    Each chunk first waits for the ``'email'`` rate limiter, so a busy
+    fan-out slows down to the relay's allowed rate instead of failing.
+
+    :param messages: Messages to send, consumed lazily.
+    :type messages: Iterable[EmailMessage]
+    :param chunk_size: Messages per chunk. Defaults to ``EMAIL_BATCH_SIZE``.
+    :type chunk_size: int
+    :param connection: Open or unopened mail backend to reuse.
+    :type connection: BaseEmailBackend
+    :param label: Text added to the throughput log lines.
+    :type label: str
+    :return: Statistics for every chunk sent.
+    :rtype: list[ChunkStats]
+    :raises Exception: If the mail backend fails, so the caller can retry.
+    """
+    chunk_size = chunk_size or settings.EMAIL_BATCH_SIZE
+    connection = connection or get_connection(fail_silently=False)
+
+    stats = []
+    with connection:
+        for chunk in chunked(messages, chunk_size):
+            throttle('email', len(chunk))
+            started = time.monotonic()
+            for message in chunk:
+                message.connection = connection
+            sent = connection.send_messages(chunk) or 0
+            elapsed = time.monotonic() - started
+            rate = sent / elapsed if elapsed else float(sent)
+            stats.append(ChunkStats(sent, elapsed, rate))
+            logger.info(
+                "Sent %d/%d messages in %.2fs (%.1f msg/s): %s",
+                sent, len(chunk), elapsed, rate, label
+            )
+    return stats
+
+
+def send_individual_messages(subject, body, recipients, from_email=None,
+                             chunk_size=None, connection=None):
+    """
+    Send one message per recipient over a single mail connection.
+
+    Every reader still receives their own message (no shared To or BCC
+    list), but the SMTP connection and TLS handshake are reused for the
+    whole fan-out. Messages are built and handed to the backend in chunks
+    and the throughput of each chunk is logged.
+
+    :param subject: Email subject.
+    :type subject: str
+    :param body: Plain text body.
+    :type body: str
+    :param recipients: Email addresses, consumed lazily.
+    :type recipients: Iterable[str]
+    :param from_email: Sender address. Defaults to ``DEFAULT_FROM_EMAIL``.
+    :type from_email: str
+    :param chunk_size: Messages per chunk. Defaults to ``EMAIL_BATCH_SIZE``.
+    :type chunk_size: int
+    :param connection: Open or unopened mail backend to reuse.
+    :type connection: BaseEmailBackend
+    :return: Statistics for every chunk sent.
+    :rtype: list[ChunkStats]
+    :raises Exception: If the mail backend fails, so the caller can retry.
+    """
+    from_email = from_email or settings.DEFAULT_FROM_EMAIL
+    messages = (
+        EmailMessage(subject, body, from_email, [address])
+        for address in recipients
+    )
+    return send_messages_in_chunks(
+        messages, chunk_size, connection, label=subject
+    )
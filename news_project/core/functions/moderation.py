@@ -0,0 +1,148 @@
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import Article, Newsletter, OutboxEvent
+from core.pagination import keyset_page
+from . import feed_cache, fragment_cache
+
+
+MODELS = (
+    (OutboxEvent.KIND_ARTICLE, Article),
+    (OutboxEvent.KIND_NEWSLETTER, Newsletter),
+)
+
+# Sections of the editor's moderation queue: the kind of item and
+# whether it lists approved history or pending items
+SECTIONS = {
+    'pending-articles': (OutboxEvent.KIND_ARTICLE, False),
+    'pending-newsletters': (OutboxEvent.KIND_NEWSLETTER, False),
+    'approved-articles': (OutboxEvent.KIND_ARTICLE, True),
+    'approved-newsletters': (OutboxEvent.KIND_NEWSLETTER, True),
+}
+
+
+def section_page(section, cursor=None, page_size=None):
+    """
+    Return one page of a section of the moderation queue.
+
+    Pending items are listed oldest first, so the longest waiting are
+    triaged first; approved history is listed newest first. Pages are
+    keyset-paginated, so every page costs one indexed query however
+    large the archive is.
+
+    :param section: One of :data:`SECTIONS`.
+    :type section: str
+    :param cursor: Cursor of the previous page's last item, if any.
+    :type cursor: str
+    :param page_size: Items per page. Defaults to
+        ``MODERATION_PAGE_SIZE``.
+    :type page_size: int
+    :return: The page's items, with journalist and publisher loaded, and
+        the next page's cursor, or None on the last page.
+    :rtype: tuple[list, str | None]
+    :raises KeyError: If the section does not exist.
+    :raises InvalidCursor: If the cursor is malformed.
+    """
+    kind, approved = SECTIONS[section]
+    model = dict(MODELS)[kind]
+    return keyset_page(
+        model.objects.filter(approved=approved).select_related(
+            'journalist', 'publisher'
+        ),
+        cursor,
+        page_size or settings.MODERATION_PAGE_SIZE,
+        descending=approved
+    )
+
+
+def approve_items(article_ids=(), newsletter_ids=()):
+    """
+    Approve many pending articles and newsletters at once.
+
+    Pending rows are locked and flipped with one UPDATE per model, and a
+    single ``bulk`` outbox event is recorded for the whole batch, so the
+    request never waits on email or X. ``run_outbox`` then resolves the
+    audiences of all items together and emails each reader once (see
+    :func:`~core.functions.notifications.deliver_bulk`).
+
+    The UPDATE bypasses ``save()`` and its signals, so ``approved_at``
+    and ``updated_at`` are stamped here and the feed cache of every
+    affected source and the items' rendered fragments are invalidated. Items
+    that are already approved are skipped.
+
+    :param article_ids: Articles to approve.
+    :type article_ids: Iterable[int]
+    :param newsletter_ids: Newsletters to approve.
+    :type newsletter_ids: Iterable[int]
+    :return: Ids that were approved, by kind.
+    :rtype: dict[str, list[int]]
+    """
+    ids = {
+        OutboxEvent.KIND_ARTICLE: list(article_ids),
+        OutboxEvent.KIND_NEWSLETTER: list(newsletter_ids),
+    }
+    approved = {}
+    now = timezone.now()
+
+    with transaction.atomic():
+        for kind, model in MODELS:
+            if not ids[kind]:
+                continue
+            rows = list(
+                model.objects.select_for_update().filter(
+                    pk__in=ids[kind], approved=False
+                ).values_list('pk', 'journalist_id', 'publisher_id')
+            )
+            if not rows:
+                continue
+            model.objects.filter(
+                pk__in=[pk for pk, _, _ in rows]
+            ).update(approved=True, approved_at=now, updated_at=now)
+            approved[kind] = [pk for pk, _, _ in rows]
+
+            journalist_ids = {journalist_id for _, journalist_id, _ in rows}
+            publisher_ids = {publisher_id for _, _, publisher_id in rows}
+            feed_cache.bump(kind, journalist_ids, publisher_ids)
+            # The UPDATE sends no signals
+            fragment_cache.bump(
+                [(kind, pk) for pk, _, _ in rows] +
+                [fragment_cache.list_ref(kind)]
+            )
+
+        if approved:
+            OutboxEvent.objects.create(
+                kind=OutboxEvent.KIND_BULK, payload=approved
+            )
+
+    return approved
+
+
+def reject_items(article_ids=(), newsletter_ids=()):
+    """
+    Reject many pending articles and newsletters at once.
+
+    Content has no rejected state, so rejecting deletes the pending
+    items, as the per-item delete action does. Approved items are never
+    touched.
+
+    :param article_ids: Articles to reject.
+    :type article_ids: Iterable[int]
+    :param newsletter_ids: Newsletters to reject.
+    :type newsletter_ids: Iterable[int]
+    :return: Number of items deleted, by kind.
+    :rtype: dict[str, int]
+    """
+    ids = {
+        OutboxEvent.KIND_ARTICLE: list(article_ids),
+        OutboxEvent.KIND_NEWSLETTER: list(newsletter_ids),
+    }
+    rejected = {}
+    with transaction.atomic():
+        for kind, model in MODELS:
+            if ids[kind]:
+                _, counts = model.objects.filter(
+                    pk__in=ids[kind], approved=False
+                ).delete()
+                rejected[kind] = counts.get(model._meta.label, 0)
+    return rejected
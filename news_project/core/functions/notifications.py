@@ -0,0 +1,268 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMessage
+
+from core.models import Article, Newsletter, OutboxEvent
+from . import feed_cache, live, timeline
+from .digest import format_entries, queue_digest_items
+from .fanout import fan_out, fan_out_to
+from .recipients import iter_batch_recipient_chunks
+from .social_queue import enqueue as enqueue_social_post
+
+
+User = get_user_model()
+
+
+def item_message(item, kind):
+    """
+    Return the subject and body emailed for a single approved item.
+
+    :param item: Approved Article or Newsletter, with ``journalist``.
+    :type item: Article | Newsletter
+    :param kind: One of the ``OutboxEvent.KIND_*`` values.
+    :type kind: str
+    :return: ``(subject, body)``.
+    :rtype: tuple[str, str]
+    """
+    if kind == OutboxEvent.KIND_ARTICLE:
+        return f"New Article: {item.title}", item.content
+    return (
+        f"📰 Newsletter from {item.journalist.username}: {item.title}",
+        item.body
+    )
+
+
+def social_text(article):
+    """
+    Return the text posted to X for an approved article.
+
+    :param article: Approved Article, with ``journalist``.
+    :type article: Article
+    :rtype: str
+    """
+    return f'''📰 Article from {article.journalist.username}: {article.title}
+{article.content}'''
+
+
+class BatchAudience():
+    """
+    The readers emailed about a bulk approval.
+
+    Every reader following at least one source of the batch gets one
+    email. Readers who follow a single item get the same message as for
+    an individual approval; readers who follow several get one message
+    listing all of them.
+
+    Attributes:
+        - entries: ``(kind, item)`` pairs of the batch.
+        - label: Name used when logging throughput.
+    """
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.journalist_ids = {item.journalist_id for _, item in entries}
+        self.publisher_ids = {
+            item.publisher_id for _, item in entries if item.publisher_id
+        }
+        self.label = f"bulk approval of {len(entries)} items"
+
+    def chunks(self, chunk_size, after_id=0, last_id=None):
+        return iter_batch_recipient_chunks(
+            self.journalist_ids, self.publisher_ids, chunk_size,
+            after_id=after_id, last_id=last_id
+        )
+
+    def follows(self, reader_ids):
+        """
+        Map each reader to the journalists and publishers of the batch
+        they follow.
+
+        :param reader_ids: Readers of one chunk.
+        :type reader_ids: list[int]
+        :return: Reader id to ``(journalist_ids, publisher_ids)``.
+        :rtype: dict[int, tuple[set[int], set[int]]]
+        """
+        follows = defaultdict(lambda: (set(), set()))
+        journalists = User.subscribed_journalists.through.objects.filter(
+            from_customuser_id__in=reader_ids,
+            to_customuser_id__in=self.journalist_ids
+        ).values_list('from_customuser_id', 'to_customuser_id')
+        for reader_id, journalist_id in journalists:
+            follows[reader_id][0].add(journalist_id)
+        if self.publisher_ids:
+            publishers = User.subscribed_publishers.through.objects.filter(
+                customuser_id__in=reader_ids,
+                publisher_id__in=self.publisher_ids
+            ).values_list('customuser_id', 'publisher_id')
+            for reader_id, publisher_id in publishers:
+                follows[reader_id][1].add(publisher_id)
+        return follows
+
+    def messages(self, chunk):
+        follows = self.follows([reader_id for reader_id, _ in chunk])
+        messages = []
+        for reader_id, email in chunk:
+            journalists, publishers = follows[reader_id]
+            entries = [
+                (kind, item) for kind, item in self.entries
+                if item.journalist_id in journalists
+                or item.publisher_id in publishers
+            ]
+            if not entries:
+                continue
+            if len(entries) == 1:
+                subject, body = item_message(entries[0][1], entries[0][0])
+            else:
+                subject = f"{len(entries)} new items from your subscriptions"
+                body = format_entries(entries)
+            messages.append(EmailMessage(
+                subject, body, settings.DEFAULT_FROM_EMAIL, [email]
+            ))
+        return messages
+
+
+def add_to_timelines(item, kind):
+    """
+    Write an approved item into its followers' timelines, if enabled.
+
+    The feed cache was invalidated when the item was approved, possibly
+    before the timeline rows existed, so it is invalidated again once
+    they are written.
+
+    :param item: The approved Article or Newsletter.
+    :type item: Article | Newsletter
+    :param kind: One of the ``OutboxEvent.KIND_*`` values.
+    :type kind: str
+    """
+    if timeline.enabled():
+        timeline.add_item(item, kind)
+        feed_cache.bump(kind, [item.journalist_id], [item.publisher_id])
+
+
+def push_live(item, kind):
+    """
+    Announce an approved item to connected readers.
+
+    Only backends that need telling (e.g. ``LocMemBackend``) do anything
+    here; the default ``PollingBackend`` finds approvals on its own.
+
+    :param item: The approved Article or Newsletter.
+    :type item: Article | Newsletter
+    :param kind: One of the ``OutboxEvent.KIND_*`` values.
+    :type kind: str
+    """
+    live.publish(kind, item)
+
+
+def deliver_article(article, event):
+    """
+    Notify subscribers about an approved article.
+
+    Sends an individual email with the article to all users subscribed
+    to the journalist or publisher, sharded across parallel mail
+    connections. Readers who opted into a digest get the article queued
+    for their next digest instead. With ``FEED_TIMELINE_ENABLED`` the
+    article is first written into every follower's timeline; connected
+    readers are told through the live backend. Once every shard has
+    been sent, a post to X (formerly Twitter) is queued for
+    ``run_social_queue``.
+
+    :param article: The approved Article instance.
+    :type article: Article
+    :param event: Outbox event being delivered.
+    :type event: OutboxEvent
+    """
+    add_to_timelines(article, OutboxEvent.KIND_ARTICLE)
+    push_live(article, OutboxEvent.KIND_ARTICLE)
+
+    subject, message = item_message(article, OutboxEvent.KIND_ARTICLE)
+    queue_digest_items(article, OutboxEvent.KIND_ARTICLE)
+    fan_out(event, article, subject, message)
+
+    enqueue_social_post(social_text(article), event, article.pk)
+
+
+def deliver_newsletter(newsletter, event):
+    """
+    Email an approved newsletter to its subscribers.
+
+    Sends the newsletter body to all readers subscribed to the journalist
+    or the selected publisher, if provided. Each reader gets their own
+    message; large audiences are split into shards sent in parallel.
+    Readers who opted into a digest get it in their next digest instead.
+    With ``FEED_TIMELINE_ENABLED`` the newsletter is first written into
+    every follower's timeline.
+
+    :param newsletter: The approved Newsletter instance.
+    :type newsletter: Newsletter
+    :param event: Outbox event being delivered.
+    :type event: OutboxEvent
+    """
+    add_to_timelines(newsletter, OutboxEvent.KIND_NEWSLETTER)
+    push_live(newsletter, OutboxEvent.KIND_NEWSLETTER)
+
+    subject, message = item_message(
+        newsletter, OutboxEvent.KIND_NEWSLETTER
+    )
+    queue_digest_items(newsletter, OutboxEvent.KIND_NEWSLETTER)
+    fan_out(event, newsletter, subject, message)
+
+
+def deliver_bulk(payload, event):
+    """
+    Notify subscribers about the items of a bulk approval.
+
+    Each item is written into timelines and queued for digest readers as
+    if it had been approved on its own, but immediate readers get a
+    single email for the whole batch (see :class:`BatchAudience`). Posts
+    to X are queued per article. Items deleted since the approval are
+    skipped.
+
+    :param payload: Approved ids by kind, as stored on the event.
+    :type payload: dict[str, list[int]]
+    :param event: Outbox event being delivered.
+    :type event: OutboxEvent
+    """
+    entries = []
+    for kind, model in ((OutboxEvent.KIND_ARTICLE, Article),
+                        (OutboxEvent.KIND_NEWSLETTER, Newsletter)):
+        items = model.objects.filter(
+            pk__in=payload.get(kind, []), approved=True
+        ).select_related('journalist').order_by('created_at', 'id')
+        entries.extend((kind, item) for item in items)
+
+    for kind, item in entries:
+        add_to_timelines(item, kind)
+        push_live(item, kind)
+        queue_digest_items(item, kind)
+    if entries:
+        fan_out_to(event, BatchAudience(entries))
+
+    for kind, item in entries:
+        if kind == OutboxEvent.KIND_ARTICLE:
+            enqueue_social_post(social_text(item), event, item.pk)
+
+
+def deliver_timeline(payload, event):
+    """
+    Rewrite the timeline rows of an approved item that changed source.
+
+    Queued when an approved item moves to another journalist or
+    publisher, so the writes for every follower of the new source
+    happen in the worker rather than in the editor's request. The item
+    is read again and its rows rebuilt from its current source, so
+    events for several quick moves leave the rows of the last one.
+
+    :param payload: The item's ``kind`` and ``id``.
+    :type payload: dict
+    :param event: Outbox event being delivered.
+    :type event: OutboxEvent
+    """
+    kind = payload['kind']
+    model = Article if kind == OutboxEvent.KIND_ARTICLE else Newsletter
+    item = model.objects.filter(pk=payload['id'], approved=True).first()
+    timeline.remove_item(kind, payload['id'])
+    if item is not None:
+        add_to_timelines(item, kind)
@@ -0,0 +1,266 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import F, Q
+from django.utils import timezone
+
+from core.models import Article, Newsletter, OutboxEvent
+from .fanout import ShardsBusy
+from .notifications import (
+    deliver_article, deliver_bulk, deliver_newsletter, deliver_timeline
+)
+
+logger = logging.getLogger(__name__)
+
+# Maps an outbox event kind to the model holding the content and the
+# function that fans it out to subscribers. Events without a model pass
+# their payload to the handler instead.
+HANDLERS = {
+    OutboxEvent.KIND_ARTICLE: (Article, deliver_article),
+    OutboxEvent.KIND_NEWSLETTER: (Newsletter, deliver_newsletter),
+    OutboxEvent.KIND_BULK: (None, deliver_bulk),
+    OutboxEvent.KIND_TIMELINE: (None, deliver_timeline),
+}
+
+
+class LeaseLost(Exception):
+    """Raised when another worker has claimed an event after its lease."""
+
+
+def enqueue(kind, object_id=None, payload=None):
+    """
+    Record a notification job for approved content.
+
+    Call this inside the transaction that approves the content so the
+    event is only visible to workers once the approval is committed.
+
+    :param kind: One of the ``OutboxEvent.KIND_*`` values.
+    :type kind: str
+    :param object_id: Primary key of the approved content.
+    :type object_id: int
+    :param payload: Data for events without a single object.
+    :type payload: dict
+    :return: The created outbox event.
+    :rtype: OutboxEvent
+    """
+    return OutboxEvent.objects.create(
+        kind=kind, object_id=object_id, payload=payload
+    )
+
+
+def claim_batch(limit):
+    """
+    Claim up to ``limit`` events that are ready to be processed.
+
+    Pending events whose ``available_at`` has passed are claimed, as are
+    events whose lease (``locked_at``) has not been renewed for
+    ``OUTBOX_LEASE_SECONDS``, i.e. whose worker crashed or hung. Each
+    row is claimed with a conditional UPDATE, so two workers never claim
+    the same event at once. The claimed event's ``locked_at`` identifies
+    the claim: :func:`process_event` renews it while delivering and only
+    records the outcome while it still holds it.
+
+    :param limit: Maximum number of events to claim.
+    :type limit: int
+    :return: The claimed events.
+    :rtype: list[OutboxEvent]
+    """
+    now = timezone.now()
+    lease_expired = now - timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)
+    candidates = OutboxEvent.objects.filter(
+        Q(status=OutboxEvent.STATUS_PENDING, available_at__lte=now) |
+        Q(status=OutboxEvent.STATUS_PROCESSING, locked_at__lt=lease_expired)
+    ).order_by('available_at', 'id').values_list(
+        'id', 'status', 'locked_at'
+    )[:limit]
+
+    claimed_ids = []
+    for pk, status, locked_at in candidates:
+        claimed = OutboxEvent.objects.filter(
+            pk=pk, status=status, locked_at=locked_at
+        ).update(
+            status=OutboxEvent.STATUS_PROCESSING,
+            locked_at=now,
+            attempts=F('attempts') + 1
+        )
+        if claimed:
+            claimed_ids.append(pk)
+
+    return list(OutboxEvent.objects.filter(pk__in=claimed_ids))
+
+
+def renew_lease(event):
+    """
+    Extend the lease of an event this worker is processing.
+
+    :param event: An event claimed by :func:`claim_batch`.
+    :type event: OutboxEvent
+    :raises LeaseLost: If the lease expired and another worker claimed
+        the event.
+    """
+    now = timezone.now()
+    renewed = OutboxEvent.objects.filter(
+        pk=event.pk, status=OutboxEvent.STATUS_PROCESSING,
+        locked_at=event.locked_at
+    ).update(locked_at=now)
+    if not renewed:
+        raise LeaseLost(f"Event {event.pk} was claimed by another worker")
+    event.locked_at = now
+
+
+class Heartbeat(threading.Thread):
+    """
+    Renew an event's lease every ``OUTBOX_HEARTBEAT_SECONDS``.
+
+    Runs beside a long delivery, such as a rate-limited fan-out, so the
+    event is not claimed again while this worker is still sending it.
+    Stops when :meth:`stop` is called or the lease is lost.
+
+    Attributes:
+        - event: The event being processed.
+    """
+
+    def __init__(self, event):
+        super().__init__(name=f'outbox-heartbeat-{event.pk}', daemon=True)
+        self.event = event
+        self._stopped = threading.Event()
+
+    def run(self):
+        try:
+            interval = settings.OUTBOX_HEARTBEAT_SECONDS
+            while not self._stopped.wait(interval):
+                renew_lease(self.event)
+        except LeaseLost as e:
+            logger.warning("%s", e)
+        finally:
+            connection.close()
+
+    def stop(self):
+        """Stop renewing and wait for a renewal in flight to finish."""
+        self._stopped.set()
+        self.join()
+
+
+def _finish(event, **fields):
+    """
+    Record the outcome of an event if this worker still holds its lease.
+
+    :return: True if the outcome was recorded.
+    :rtype: bool
+    """
+    recorded = OutboxEvent.objects.filter(
+        pk=event.pk, status=OutboxEvent.STATUS_PROCESSING,
+        locked_at=event.locked_at
+    ).update(locked_at=None, **fields)
+    if not recorded:
+        logger.warning(
+            "Event %s was claimed by another worker; not recording %s",
+            event.pk, fields['status']
+        )
+        return False
+    for name, value in fields.items():
+        setattr(event, name, value)
+    event.locked_at = None
+    return True
+
+
+def process_event(event):
+    """
+    Deliver a single claimed event and record the outcome.
+
+    The lease is renewed by a :class:`Heartbeat` while the handler runs,
+    and the outcome is only saved if this worker still holds it.
+
+    On failure the event is rescheduled with exponential backoff until
+    ``OUTBOX_MAX_ATTEMPTS`` is reached, after which it is marked failed.
+    Events whose content has since been deleted are marked done.
+
+    :param event: A claimed outbox event.
+    :type event: OutboxEvent
+    :return: True if the event was delivered and recorded as done.
+    :rtype: bool
+    """
+    model, handler = HANDLERS[event.kind]
+    heartbeat = Heartbeat(event)
+    heartbeat.start()
+    try:
+        if model is None:
+            instance = event.payload
+        else:
+            instance = model.objects.filter(pk=event.object_id).first()
+        if instance is not None:
+            handler(instance, event)
+    except ShardsBusy as e:
+        # Another worker is still sending part of it: check back once
+        # its shard lease would have expired, without using an attempt
+        heartbeat.stop()
+        _finish(
+            event, status=OutboxEvent.STATUS_PENDING, last_error=str(e),
+            attempts=event.attempts - 1,
+            available_at=timezone.now() + timedelta(
+                seconds=settings.OUTBOX_LEASE_SECONDS
+            )
+        )
+        return False
+    except Exception as e:
+        heartbeat.stop()
+        if event.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+            status, available_at = OutboxEvent.STATUS_FAILED, None
+        else:
+            status = OutboxEvent.STATUS_PENDING
+            available_at = timezone.now() + timedelta(
+                seconds=2 ** event.attempts
+            )
+        fields = {'status': status, 'last_error': str(e)}
+        if available_at is not None:
+            fields['available_at'] = available_at
+        _finish(event, **fields)
+        return False
+
+    heartbeat.stop()
+    return _finish(event, status=OutboxEvent.STATUS_DONE, last_error='')
+
+
+def _process_in_thread(event):
+    """
+    Run :func:`process_event` from a worker thread.
+
+    Worker threads own their database connection, so it is closed once
+    the event has been handled.
+    """
+    close_old_connections()
+    try:
+        return process_event(event)
+    finally:
+        connection.close()
+
+
+def drain(workers=None, batch_size=None):
+    """
+    Claim one batch of events and deliver it.
+
+    :param workers: Number of threads delivering events concurrently.
+        Defaults to ``OUTBOX_WORKERS``. With one worker, events are
+        delivered in the calling thread.
+    :type workers: int
+    :param batch_size: Maximum number of events to claim.
+        Defaults to ``OUTBOX_BATCH_SIZE``.
+    :type batch_size: int
+    :return: Number of events claimed.
+    :rtype: int
+    """
+    workers = workers or settings.OUTBOX_WORKERS
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+
+    events = claim_batch(batch_size)
+    if workers <= 1:
+        for event in events:
+            process_event(event)
+    elif events:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(_process_in_thread, events))
+    return len(events)
@@ -0,0 +1,261 @@
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+
+from core.models import RateLimitBucket
+
+
+class TokenBucket():
+    """
+    Thread-safe token bucket limiting how fast a channel may send.
+
+    Tokens refill continuously at ``rate`` per second up to ``burst``.
+    :meth:`acquire` blocks until enough tokens are available, so callers
+    are slowed down (backpressure) rather than having sends dropped.
+
+    Attributes:
+        - rate: Tokens added per second.
+        - burst: Maximum number of tokens the bucket holds.
+        - acquired: Total tokens handed out.
+        - throttled: Number of acquire calls that had to wait.
+        - throttled_seconds: Total time spent waiting for tokens.
+    """
+
+    def __init__(self, rate, burst, clock=time.monotonic, sleep=time.sleep):
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1")
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.throttled = 0
+        self.throttled_seconds = 0.0
+
+    def _refill(self):
+        now = self._clock()
+        elapsed = now - self._updated
+        self._updated = now
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+
+    def available(self):
+        """
+        Return the number of tokens that could be taken right now.
+
+        :rtype: float
+        """
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    def try_acquire(self, tokens=1):
+        """
+        Take tokens if they are available right now.
+
+        :param tokens: Number of tokens to take, at most ``burst``.
+        :type tokens: int
+        :return: 0 if the tokens were taken, otherwise the number of
+            seconds until they will be available.
+        :rtype: float
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                self.acquired += tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens=1):
+        """
+        Block until ``tokens`` tokens have been taken.
+
+        Requests larger than ``burst`` are taken in burst-sized pieces.
+
+        :param tokens: Number of tokens to take.
+        :type tokens: int
+        :return: Seconds spent waiting.
+        :rtype: float
+        """
+        waited = 0.0
+        remaining = tokens
+        while remaining > 0:
+            piece = min(remaining, int(self.burst))
+            wait = self.try_acquire(piece)
+            if wait:
+                self._sleep(wait)
+                waited += wait
+                continue
+            remaining -= piece
+
+        if waited:
+            with self._lock:
+                self.throttled += 1
+                self.throttled_seconds += waited
+        return waited
+
+    def stats(self):
+        """
+        Return the bucket's counters.
+
+        :return: Configuration and counters of the bucket.
+        :rtype: dict
+        """
+        with self._lock:
+            return {
+                'rate': self.rate,
+                'burst': self.burst,
+                'acquired': self.acquired,
+                'throttled': self.throttled,
+                'throttled_seconds': round(self.throttled_seconds, 3),
+            }
+
+
+class SharedTokenBucket(TokenBucket):
+    """
+    Token bucket whose tokens are shared by every process.
+
+    The bucket's state lives in a :class:`~core.models.RateLimitBucket`
+    row that is locked while tokens are counted, so the limit holds for
+    the web and worker processes together rather than for each of them.
+    Only the ``acquired`` and ``throttled`` counters are per-process.
+
+    Attributes:
+        - channel: Channel name of the bucket's row.
+    """
+
+    def __init__(self, channel, rate, burst, clock=time.time,
+                 sleep=time.sleep):
+        super().__init__(rate, burst, clock=clock, sleep=sleep)
+        self.channel = channel
+
+    def available(self):
+        """
+        Return the tokens left in the shared bucket, without taking any.
+
+        :rtype: float
+        """
+        row = RateLimitBucket.objects.filter(
+            channel=self.channel
+        ).values_list('tokens', 'updated_at').first()
+        if row is None:
+            return self.burst
+        tokens, updated_at = row
+        elapsed = max(0.0, self._clock() - updated_at)
+        return min(self.burst, tokens + elapsed * self.rate)
+
+    def try_acquire(self, tokens=1):
+        """
+        Take tokens from the shared bucket if they are available now.
+
+        :param tokens: Number of tokens to take, at most ``burst``.
+        :type tokens: int
+        :return: 0 if the tokens were taken, otherwise the number of
+            seconds until they will be available.
+        :rtype: float
+        """
+        with transaction.atomic():
+            RateLimitBucket.objects.get_or_create(
+                channel=self.channel,
+                defaults={'tokens': self.burst, 'updated_at': self._clock()}
+            )
+            bucket = RateLimitBucket.objects.select_for_update().get(
+                channel=self.channel
+            )
+            now = self._clock()
+            elapsed = max(0.0, now - bucket.updated_at)
+            available = min(self.burst, bucket.tokens + elapsed * self.rate)
+            if available < tokens:
+                return (tokens - available) / self.rate
+            bucket.tokens = available - tokens
+            bucket.updated_at = now
+            bucket.save(update_fields=['tokens', 'updated_at'])
+
+        with self._lock:
+            self.acquired += tokens
+        return 0.0
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(channel):
+    """
+    Return the shared token bucket for a delivery channel.
+
+    Buckets are configured by ``RATE_LIMITS`` and their tokens are
+    shared by all threads and processes through the database. Channels
+    without a configured limit are unlimited.
+
+    :param channel: Channel name, e.g. ``'email'`` or ``'social'``.
+    :type channel: str
+    :return: The channel's bucket, or None if it is not limited.
+    :rtype: SharedTokenBucket | None
+    """
+    with _limiters_lock:
+        if channel not in _limiters:
+            config = getattr(settings, 'RATE_LIMITS', {}).get(channel)
+            _limiters[channel] = (
+                SharedTokenBucket(channel, config['rate'], config['burst'])
+                if config else None
+            )
+        return _limiters[channel]
+
+
+def throttle(channel, tokens=1):
+    """
+    Wait for permission to send ``tokens`` items on a channel.
+
+    :param channel: Channel name, e.g. ``'email'`` or ``'social'``.
+    :type channel: str
+    :param tokens: Number of items about to be sent.
+    :type tokens: int
+    :return: Seconds spent waiting.
+    :rtype: float
+    """
+    limiter = get_limiter(channel)
+    if limiter is None:
+        return 0.0
+    return limiter.acquire(tokens)
+
+
+def available_tokens(channel):
+    """
+    Return how many items a channel could send right now without waiting.
+
+    :param channel: Channel name, e.g. ``'email'`` or ``'social'``.
+    :type channel: str
+    :return: Available tokens, or None if the channel is not limited.
+    :rtype: float | None
+    """
+    limiter = get_limiter(channel)
+    if limiter is None:
+        return None
+    return limiter.available()
+
+
+def limiter_stats():
+    """
+    Return the counters of every limiter used in this process.
+
+    :return: Mapping of channel name to bucket stats.
+    :rtype: dict
+    """
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {
+        channel: limiter.stats()
+        for channel, limiter in limiters.items() if limiter is not None
+    }
+
+
+def reset_limiters():
+    """Forget all buckets so they are rebuilt from current settings."""
+    with _limiters_lock:
+        _limiters.clear()
@@ -0,0 +1,215 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+
+
+User = get_user_model()
+
+
+def recipient_query(journalist_id, publisher_id=None, after_id=0,
+                    last_id=None, digest=False):
+    """
+    Build the query for readers following a journalist or publisher.
+
+    Followers of the journalist and subscribers of the publisher are
+    combined with a single SQL UNION, which also removes duplicates.
+    Only ``(id, email)`` pairs are selected and readers without an email
+    address are excluded in SQL.
+
+    :param journalist_id: Primary key of the authoring journalist.
+    :type journalist_id: int
+    :param publisher_id: Primary key of the publisher, if any.
+    :type publisher_id: int
+    :param after_id: Only include readers with a greater primary key.
+    :type after_id: int
+    :param last_id: Only include readers up to this primary key.
+    :type last_id: int
+    :param digest: Select readers who opted into a digest instead of
+        readers who are emailed for every item.
+    :type digest: bool
+    :return: Queryset of ``(id, email)`` tuples ordered by id.
+    :rtype: QuerySet
+    """
+    readers = User.objects.filter(pk__gt=after_id).exclude(email='')
+    if digest:
+        readers = readers.exclude(digest_frequency=User.DIGEST_IMMEDIATE)
+    else:
+        readers = readers.filter(digest_frequency=User.DIGEST_IMMEDIATE)
+    if last_id is not None:
+        readers = readers.filter(pk__lte=last_id)
+    query = readers.filter(
+        subscribed_journalists=journalist_id
+    ).values_list('id', 'email')
+
+    if publisher_id:
+        query = query.union(
+            readers.filter(
+                subscribed_publishers=publisher_id
+            ).values_list('id', 'email')
+        )
+
+    return query.order_by('id')
+
+
+def iter_recipient_chunks(item, chunk_size=None, after_id=0, last_id=None,
+                          digest=False):
+    """
+    Yield the audience of an article or newsletter in chunks.
+
+    Chunks are fetched with keyset pagination on the reader id, so memory
+    stays bounded however large the audience is.
+
+    :param item: Approved Article or Newsletter.
+    :type item: Article | Newsletter
+    :param chunk_size: Readers per chunk. Defaults to
+        ``RECIPIENT_CHUNK_SIZE``.
+    :type chunk_size: int
+    :param after_id: Resume after this reader id.
+    :type after_id: int
+    :param last_id: Stop at this reader id, inclusive.
+    :type last_id: int
+    :param digest: Yield digest readers instead of immediate readers.
+    :type digest: bool
+    :return: Generator of lists of ``(id, email)`` tuples.
+    :rtype: Iterator[list[tuple[int, str]]]
+    """
+    chunk_size = chunk_size or settings.RECIPIENT_CHUNK_SIZE
+    while True:
+        chunk = list(recipient_query(
+            item.journalist_id, item.publisher_id, after_id, last_id, digest
+        )[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        if len(chunk) < chunk_size:
+            return
+        after_id = chunk[-1][0]
+
+
+def follower_query(journalist_id, publisher_id=None, after_id=0):
+    """
+    Build the query for the ids of every reader following a source.
+
+    Unlike :func:`recipient_query` this ignores email addresses and
+    digest preferences; it is used to maintain the feed timeline.
+
+    :param journalist_id: Primary key of the authoring journalist.
+    :type journalist_id: int
+    :param publisher_id: Primary key of the publisher, if any.
+    :type publisher_id: int
+    :param after_id: Only include readers with a greater primary key.
+    :type after_id: int
+    :return: Queryset of reader ids ordered by id.
+    :rtype: QuerySet
+    """
+    readers = User.objects.filter(pk__gt=after_id)
+    query = readers.filter(
+        subscribed_journalists=journalist_id
+    ).values_list('id', flat=True)
+
+    if publisher_id:
+        query = query.union(
+            readers.filter(
+                subscribed_publishers=publisher_id
+            ).values_list('id', flat=True)
+        )
+
+    return query.order_by('id')
+
+
+def iter_follower_chunks(item, chunk_size=None):
+    """
+    Yield the ids of every reader following an item's sources in chunks.
+
+    :param item: Article or Newsletter.
+    :type item: Article | Newsletter
+    :param chunk_size: Readers per chunk. Defaults to
+        ``RECIPIENT_CHUNK_SIZE``.
+    :type chunk_size: int
+    :return: Generator of lists of reader ids.
+    :rtype: Iterator[list[int]]
+    """
+    chunk_size = chunk_size or settings.RECIPIENT_CHUNK_SIZE
+    after_id = 0
+    while True:
+        chunk = list(follower_query(
+            item.journalist_id, item.publisher_id, after_id
+        )[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        if len(chunk) < chunk_size:
+            return
+        after_id = chunk[-1]
+
+
+def batch_recipient_query(journalist_ids, publisher_ids=(), after_id=0,
+                          last_id=None):
+    """
+    Build the query for readers following any of several sources.
+
+    Used to email the items of a bulk approval together. Like
+    :func:`recipient_query` it selects immediate readers with an email
+    address, and each reader appears once however many of the sources
+    they follow.
+
+    :param journalist_ids: Journalists whose items were approved.
+    :type journalist_ids: Iterable[int]
+    :param publisher_ids: Publishers whose items were approved.
+    :type publisher_ids: Iterable[int]
+    :param after_id: Only include readers with a greater primary key.
+    :type after_id: int
+    :param last_id: Only include readers up to this primary key.
+    :type last_id: int
+    :return: Queryset of ``(id, email)`` tuples ordered by id.
+    :rtype: QuerySet
+    """
+    readers = User.objects.filter(
+        pk__gt=after_id, digest_frequency=User.DIGEST_IMMEDIATE
+    ).exclude(email='')
+    if last_id is not None:
+        readers = readers.filter(pk__lte=last_id)
+    query = readers.filter(
+        subscribed_journalists__in=list(journalist_ids)
+    ).values_list('id', 'email').distinct()
+
+    publisher_ids = [pk for pk in publisher_ids if pk]
+    if publisher_ids:
+        query = query.union(
+            readers.filter(
+                subscribed_publishers__in=publisher_ids
+            ).values_list('id', 'email')
+        )
+
+    return query.order_by('id')
+
+
+def iter_batch_recipient_chunks(journalist_ids, publisher_ids=(),
+                                chunk_size=None, after_id=0, last_id=None):
+    """
+    Yield the combined audience of several sources in chunks.
+
+    :param journalist_ids: Journalists whose items were approved.
+    :type journalist_ids: Iterable[int]
+    :param publisher_ids: Publishers whose items were approved.
+    :type publisher_ids: Iterable[int]
+    :param chunk_size: Readers per chunk. Defaults to
+        ``RECIPIENT_CHUNK_SIZE``.
+    :type chunk_size: int
+    :param after_id: Resume after this reader id.
+    :type after_id: int
+    :param last_id: Stop at this reader id, inclusive.
+    :type last_id: int
+    :return: Generator of lists of ``(id, email)`` tuples.
+    :rtype: Iterator[list[tuple[int, str]]]
+    """
+    chunk_size = chunk_size or settings.RECIPIENT_CHUNK_SIZE
+    while True:
+        chunk = list(batch_recipient_query(
+            journalist_ids, publisher_ids, after_id, last_id
+        )[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        if len(chunk) < chunk_size:
+            return
+        after_id = chunk[-1][0]
@@ -0,0 +1,92 @@
+import itertools
+import threading
+
+import requests
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .tweet import Tweet, post_tweet
+
+
+class BaseSocialBackend():
+    """
+    Interface for backends that publish posts to a social network.
+
+    Backends are selected with the ``SOCIAL_BACKEND`` setting, the same
+    way Django selects email backends. ``post()`` returns the API's JSON
+    response and reports failures with the ``Tweet*Error`` exceptions
+    from :mod:`core.functions.tweet`, which the posting queue uses to
+    decide whether to retry.
+    """
+
+    def post(self, text):
+        """
+        Publish ``text``.
+
+        :param text: Text to post.
+        :type text: str
+        :return: Response with the new post's id under ``data.id``.
+        :rtype: dict
+        """
+        raise NotImplementedError
+
+
+class XBackend(BaseSocialBackend):
+    """Posts to the real X API through the :class:`Tweet` client."""
+
+    def post(self, text):
+        return Tweet().make_tweet(text)
+
+
+class LocMemBackend(BaseSocialBackend):
+    """
+    Records posts in memory instead of publishing them.
+
+    Like Django's locmem email backend, posts are appended to the class
+    level ``outbox`` list so tests and load tests can inspect them.
+    """
+    outbox = []
+    _ids = itertools.count(1)
+    _lock = threading.Lock()
+
+    def post(self, text):
+        with self._lock:
+            post_id = str(next(self._ids))
+            self.outbox.append(text.strip()[:280])
+        return {'data': {'id': post_id, 'text': text}}
+
+
+class HTTPStubBackend(BaseSocialBackend):
+    """
+    Posts to a local stand-in for the X API over plain HTTP.
+
+    Point ``SOCIAL_STUB_URL`` at ``manage.py run_x_stub`` to exercise the
+    whole HTTP path (timeouts, 429s, latency) without network access or
+    credentials.
+    """
+    _local = threading.local()
+
+    def post(self, text):
+        # One keep-alive session per worker thread
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return post_tweet(
+            session,
+            f"{settings.SOCIAL_STUB_URL}/2/tweets",
+            {"text": text.strip()[:280]},
+            settings.TWITTER_TIMEOUT
+        )
+
+
+def get_backend(backend=None):
+    """
+    Instantiate the configured social backend.
+
+    :param backend: Dotted path of a backend class. Defaults to
+        ``SOCIAL_BACKEND``.
+    :type backend: str
+    :return: Backend instance.
+    :rtype: BaseSocialBackend
+    """
+    return import_string(backend or settings.SOCIAL_BACKEND)()
@@ -0,0 +1,242 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import Q
+from django.utils import timezone
+
+from core.models import SocialPost
+from .ratelimit import available_tokens
+from .social import get_backend
+from .tweet import TweetPermanentError, TweetRateLimited
+
+
+def enqueue(text, event=None, object_id=None):
+    """
+    Queue a post to X.
+
+    Posts queued for an outbox event are only created once per article,
+    so retrying the event never posts twice.
+
+    :param text: Text to post.
+    :type text: str
+    :param event: Outbox event the post belongs to.
+    :type event: OutboxEvent
+    :param object_id: Article the post is about.
+    :type object_id: int
+    :return: The queued post.
+    :rtype: SocialPost
+    """
+    if event is None:
+        return SocialPost.objects.create(text=text, object_id=object_id)
+    post, _ = SocialPost.objects.get_or_create(
+        event=event, object_id=object_id, defaults={'text': text}
+    )
+    return post
+
+
+def claim_batch(limit, benchmark=False):
+    """
+    Claim up to ``limit`` posts that are due.
+
+    Posts left in ``sending`` by a crashed worker are claimed again once
+    ``SOCIAL_LEASE_SECONDS`` have passed. The claimed post's
+    ``locked_at`` identifies the claim; :func:`process_post` renews it
+    before sending and only records the outcome while it holds it.
+
+    :param limit: Maximum number of posts to claim.
+    :type limit: int
+    :param benchmark: Claim the posts queued by ``manage.py bench_social``
+        instead of real ones. The two never mix, so the worker cannot
+        publish a benchmark post.
+    :type benchmark: bool
+    :return: The claimed posts.
+    :rtype: list[SocialPost]
+    """
+    now = timezone.now()
+    lease_expired = now - timedelta(seconds=settings.SOCIAL_LEASE_SECONDS)
+    candidates = SocialPost.objects.filter(
+        Q(status=SocialPost.STATUS_PENDING, available_at__lte=now) |
+        Q(status=SocialPost.STATUS_SENDING, locked_at__lt=lease_expired),
+        benchmark=benchmark
+    )
+    candidates = candidates.order_by('available_at', 'id').values_list(
+        'id', 'status', 'locked_at'
+    )[:limit]
+
+    claimed_ids = [
+        pk for pk, status, locked_at in candidates
+        if SocialPost.objects.filter(
+            pk=pk, status=status, locked_at=locked_at
+        ).update(status=SocialPost.STATUS_SENDING, locked_at=now)
+    ]
+    return list(SocialPost.objects.filter(pk__in=claimed_ids).order_by('id'))
+
+
+def backoff(attempts):
+    """
+    Return the delay before retrying a post that failed ``attempts`` times.
+
+    :param attempts: Number of failed attempts so far.
+    :type attempts: int
+    :return: Delay before the next attempt.
+    :rtype: timedelta
+    """
+    seconds = settings.SOCIAL_BACKOFF_SECONDS * 2 ** max(attempts - 1, 0)
+    return timedelta(
+        seconds=min(seconds, settings.SOCIAL_MAX_BACKOFF_SECONDS)
+    )
+
+
+def renew_claim(post):
+    """
+    Renew a claimed post's lease just before it is sent.
+
+    :param post: A post claimed by :func:`claim_batch`.
+    :type post: SocialPost
+    :return: False if the lease expired and another worker claimed the
+        post.
+    :rtype: bool
+    """
+    now = timezone.now()
+    renewed = SocialPost.objects.filter(
+        pk=post.pk, status=SocialPost.STATUS_SENDING,
+        locked_at=post.locked_at
+    ).update(locked_at=now)
+    if renewed:
+        post.locked_at = now
+    return bool(renewed)
+
+
+def process_post(post, backend=None):
+    """
+    Send one claimed post and record the outcome.
+
+    The post's lease is renewed first, and a post claimed in the
+    meantime by another worker is left to it. The post is published
+    with the configured social backend, and the outcome is only saved
+    while this worker still holds the lease.
+
+    - 201: the post is marked sent.
+    - 429: the post waits until the API's ``x-rate-limit-reset`` time
+      (or the normal backoff if the header is missing). Rate limiting
+      does not count towards the attempt limit.
+    - Timeouts, connection and server errors: exponential backoff until
+      ``SOCIAL_MAX_ATTEMPTS``, then the post is dead-lettered.
+    - Any other rejection: the post is dead-lettered immediately.
+
+    :param post: A claimed post.
+    :type post: SocialPost
+    :param backend: Backend to publish with. Defaults to
+        ``SOCIAL_BACKEND``.
+    :type backend: BaseSocialBackend
+    :return: The post's new status, or None if another worker holds it.
+    :rtype: str | None
+    """
+    backend = backend or get_backend()
+    if not renew_claim(post):
+        return None
+    now = timezone.now()
+    try:
+        response = backend.post(post.text)
+    except TweetRateLimited as e:
+        post.status = SocialPost.STATUS_PENDING
+        if e.reset_at:
+            post.available_at = max(
+                now, datetime.fromtimestamp(e.reset_at, tz=dt_timezone.utc)
+            )
+        else:
+            post.available_at = now + backoff(post.attempts + 1)
+        post.last_error = str(e)
+    except TweetPermanentError as e:
+        post.status = SocialPost.STATUS_DEAD
+        post.attempts += 1
+        post.last_error = str(e)
+    except Exception as e:
+        post.attempts += 1
+        post.last_error = str(e)
+        if post.attempts >= settings.SOCIAL_MAX_ATTEMPTS:
+            post.status = SocialPost.STATUS_DEAD
+        else:
+            post.status = SocialPost.STATUS_PENDING
+            post.available_at = now + backoff(post.attempts)
+    else:
+        post.status = SocialPost.STATUS_SENT
+        post.sent_at = now
+        post.last_error = ''
+        post.external_id = str(
+            (response or {}).get('data', {}).get('id', '')
+        )
+
+    fields = [
+        'status', 'attempts', 'available_at', 'last_error', 'sent_at',
+        'external_id',
+    ]
+    recorded = SocialPost.objects.filter(
+        pk=post.pk, status=SocialPost.STATUS_SENDING,
+        locked_at=post.locked_at
+    ).update(
+        locked_at=None, **{name: getattr(post, name) for name in fields}
+    )
+    if not recorded:
+        return None
+    post.locked_at = None
+    return post.status
+
+
+def _process_in_thread(args):
+    """
+    Run :func:`process_post` from a worker thread.
+
+    Worker threads own their database connection, so it is closed once
+    the post has been handled.
+    """
+    close_old_connections()
+    try:
+        return process_post(*args)
+    finally:
+        connection.close()
+
+
+def drain(batch_size=None, workers=None, backend=None, benchmark=False):
+    """
+    Claim one batch of due posts and send them.
+
+    No more posts are claimed than the ``'social'`` rate limit lets
+    through right now (but at least one), so claimed posts are not left
+    waiting for tokens until their lease expires.
+
+    :param batch_size: Maximum number of posts to claim. Defaults to
+        ``SOCIAL_BATCH_SIZE``.
+    :type batch_size: int
+    :param workers: Posts sent concurrently. Defaults to
+        ``SOCIAL_WORKERS``; with one worker posts are sent in order in
+        the calling thread.
+    :type workers: int
+    :param backend: Backend to publish with. Defaults to
+        ``SOCIAL_BACKEND``.
+    :type backend: BaseSocialBackend
+    :param benchmark: Send benchmark posts instead of real ones.
+    :type benchmark: bool
+    :return: Number of posts claimed.
+    :rtype: int
+    """
+    workers = workers or settings.SOCIAL_WORKERS
+    backend = backend or get_backend()
+    limit = batch_size or settings.SOCIAL_BATCH_SIZE
+    tokens = available_tokens('social')
+    if tokens is not None:
+        # Posts beyond the rate limit would sit out their lease waiting
+        limit = max(1, min(limit, int(tokens)))
+    posts = claim_batch(limit, benchmark)
+
+    if workers <= 1:
+        for post in posts:
+            process_post(post, backend)
+    elif posts:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(
+                _process_in_thread, [(post, backend) for post in posts]
+            ))
+    return len(posts)
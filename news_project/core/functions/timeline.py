@@ -0,0 +1,184 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Exists, OuterRef, Q
+
+from core.models import Article, Newsletter, OutboxEvent, TimelineEntry
+from .recipients import iter_follower_chunks
+
+
+User = get_user_model()
+
+MODELS = {
+    OutboxEvent.KIND_ARTICLE: Article,
+    OutboxEvent.KIND_NEWSLETTER: Newsletter,
+}
+
+
+def enabled():
+    """Return True if feeds are served from the timeline table."""
+    return getattr(settings, 'FEED_TIMELINE_ENABLED', False)
+
+
+def _insert(entries):
+    """Insert timeline rows in batches, skipping rows that exist."""
+    TimelineEntry.objects.bulk_create(
+        entries,
+        batch_size=settings.TIMELINE_BATCH_SIZE,
+        ignore_conflicts=True
+    )
+
+
+def _entry(reader_id, kind, object_id, created_at, journalist_id,
+           publisher_id):
+    return TimelineEntry(
+        reader_id=reader_id, kind=kind, object_id=object_id,
+        created_at=created_at, journalist_id=journalist_id,
+        publisher_id=publisher_id
+    )
+
+
+def add_item(item, kind):
+    """
+    Write an approved item into the timeline of every follower.
+
+    Followers are read in chunks and their rows bulk-inserted; rows that
+    already exist are ignored, so retried deliveries are harmless.
+
+    :param item: Approved Article or Newsletter.
+    :type item: Article | Newsletter
+    :param kind: One of the ``OutboxEvent.KIND_*`` values.
+    :type kind: str
+    :return: Number of followers the item was written for.
+    :rtype: int
+    """
+    written = 0
+    for chunk in iter_follower_chunks(item):
+        _insert([
+            _entry(reader_id, kind, item.pk, item.created_at,
+                   item.journalist_id, item.publisher_id)
+            for reader_id in chunk
+        ])
+        written += len(chunk)
+    return written
+
+
+def remove_item(kind, object_id):
+    """
+    Remove an item from every timeline.
+
+    :param kind: One of the ``OutboxEvent.KIND_*`` values.
+    :type kind: str
+    :param object_id: Primary key of the item.
+    :type object_id: int
+    """
+    TimelineEntry.objects.filter(kind=kind, object_id=object_id).delete()
+
+
+def backfill(reader_id, journalist_ids=(), publisher_ids=()):
+    """
+    Add the approved items of newly followed sources to a timeline.
+
+    Items are streamed and inserted ``TIMELINE_BATCH_SIZE`` at a time,
+    so following a prolific source never holds all its rows in memory.
+
+    :param reader_id: Primary key of the reader.
+    :type reader_id: int
+    :param journalist_ids: Journalists the reader started following.
+    :type journalist_ids: Iterable[int]
+    :param publisher_ids: Publishers the reader started following.
+    :type publisher_ids: Iterable[int]
+    :return: Number of items considered.
+    :rtype: int
+    """
+    sources = Q(pk__in=[])
+    if journalist_ids:
+        sources |= Q(journalist__in=list(journalist_ids))
+    if publisher_ids:
+        sources |= Q(publisher__in=list(publisher_ids))
+
+    batch_size = settings.TIMELINE_BATCH_SIZE
+    count = 0
+    for kind, model in MODELS.items():
+        items = model.objects.filter(approved=True).filter(
+            sources
+        ).values_list('pk', 'created_at', 'journalist_id', 'publisher_id')
+        entries = []
+        for values in items.iterator(chunk_size=batch_size):
+            entries.append(_entry(reader_id, kind, *values))
+            if len(entries) == batch_size:
+                _insert(entries)
+                count += len(entries)
+                entries = []
+        _insert(entries)
+        count += len(entries)
+    return count
+
+
+def trim(reader_ids, journalist_ids=(), publisher_ids=()):
+    """
+    Remove items readers no longer follow from their timelines.
+
+    Call after the subscriptions changed. Items stay when a reader still
+    follows them through their other source, e.g. an article by an
+    unfollowed journalist of a publisher the reader still follows.
+
+    Subscriptions are checked in the database, so each batch of
+    ``TIMELINE_BATCH_SIZE`` readers costs a single DELETE however many
+    readers a publisher loses at once.
+
+    :param reader_ids: Primary keys of the readers.
+    :type reader_ids: Iterable[int]
+    :param journalist_ids: Journalists the readers stopped following.
+        ``None`` checks every entry.
+    :type journalist_ids: Iterable[int] | None
+    :param publisher_ids: Publishers the readers stopped following.
+        ``None`` checks every entry.
+    :type publisher_ids: Iterable[int] | None
+    """
+    follows_journalist = User.subscribed_journalists.through.objects.filter(
+        from_customuser_id=OuterRef('reader_id'),
+        to_customuser_id=OuterRef('journalist_id')
+    )
+    follows_publisher = User.subscribed_publishers.through.objects.filter(
+        customuser_id=OuterRef('reader_id'),
+        publisher_id=OuterRef('publisher_id')
+    )
+    reader_ids = sorted(reader_ids)
+    batch_size = settings.TIMELINE_BATCH_SIZE
+    for start in range(0, len(reader_ids), batch_size):
+        entries = TimelineEntry.objects.filter(
+            reader_id__in=reader_ids[start:start + batch_size]
+        )
+        if journalist_ids is not None and publisher_ids is not None:
+            entries = entries.filter(
+                Q(journalist__in=list(journalist_ids)) |
+                Q(publisher__in=list(publisher_ids))
+            )
+        entries.exclude(Exists(follows_journalist)).exclude(
+            Exists(follows_publisher)
+        ).delete()
+
+
+def rebuild(reader_ids=None):
+    """
+    Rebuild timelines from the readers' subscriptions.
+
+    :param reader_ids: Readers to rebuild. Defaults to every reader.
+    :type reader_ids: Iterable[int]
+    :return: Number of readers rebuilt.
+    :rtype: int
+    """
+    readers = User.objects.filter(role='reader').order_by('pk')
+    if reader_ids is not None:
+        readers = readers.filter(pk__in=list(reader_ids))
+
+    rebuilt = 0
+    for reader in readers.iterator():
+        TimelineEntry.objects.filter(reader=reader).delete()
+        backfill(
+            reader.pk,
+            reader.subscribed_journalists.values_list('pk', flat=True),
+            reader.subscribed_publishers.values_list('pk', flat=True),
+        )
+        rebuilt += 1
+    return rebuilt
@@ -1,12 +1,85 @@
 import os
 import json
+import threading
+import requests
+from django.conf import settings
 from requests_oauthlib import OAuth1Session
+from .ratelimit import throttle
+
+
+class TweetError(Exception):
+    """Base class for failures while posting to X."""
+
+
+class TweetTransientError(TweetError):
+    """A failure that may succeed on retry (timeouts, 5xx responses)."""
+
+
+class TweetPermanentError(TweetError):
+    """A failure that will not succeed on retry (e.g. rejected content)."""
+
+
+class TweetRateLimited(TweetTransientError):
+    """
+    The API answered 429 Too Many Requests.
+
+    Attributes:
+        reset_at (int): Epoch seconds from the ``x-rate-limit-reset``
+            header, when posting is allowed again, or None if missing.
+    """
+
+    def __init__(self, message, reset_at=None):
+        super().__init__(message)
+        self.reset_at = reset_at
+
+
+def post_tweet(session, url, tweet_data, timeout):
+    """
+    POST a tweet payload and translate the response into errors.
+
+    Shared by the real client and the local stub backend so both report
+    failures the same way.
+
+    Args:
+        session (requests.Session): Session used to send the request.
+        url (str): Tweet creation endpoint.
+        tweet_data (dict): JSON payload.
+        timeout (float): Seconds to wait for the API.
+
+    Returns:
+        dict: The JSON response on 201 Created.
+
+    Raises:
+        TweetRateLimited: If the API answered 429.
+        TweetTransientError: On timeouts, connection or server errors.
+        TweetPermanentError: If the API rejected the tweet itself.
+    """
+    try:
+        response = session.post(url, json=tweet_data, timeout=timeout)
+    except requests.RequestException as e:
+        raise TweetTransientError(f"request failed: {e}") from e
+
+    if response.status_code == 201:
+        return response.json()
+
+    message = "request returned an error: {} - {}".format(
+        response.status_code, response.text
+    )
+    if response.status_code == 429:
+        reset = response.headers.get("x-rate-limit-reset", "")
+        raise TweetRateLimited(
+            message, reset_at=int(reset) if reset.isdigit() else None
+        )
+    if response.status_code in (408, 409) or response.status_code >= 500:
+        raise TweetTransientError(message)
+    raise TweetPermanentError(message)
 
 
 class Tweet():
 
     _instance = None
-    TOKEN_FILE = "twitter_token.json"
+    _lock = threading.Lock()
+    TOKEN_FILE = os.path.join(settings.BASE_DIR, "twitter_token.json")
 
     CONSUMER_KEY = 'Enter Consumer Key Here'
     CONSUMER_SECRET = 'Enter Consumer Secret Here'
@@ -16,27 +89,112 @@ class Tweet():
     def __new__(cls):
         """This code will determine whether a class instance of Tweet exists.
 
+        Creating the instance does no I/O. Credentials are loaded from
+        settings or the token file the first time a tweet is posted, and
+        are never verified or requested interactively on that path.
+
         Returns:
             If it does exist , it returns the current instance,
             if it doesn't, a new instance will be created and returned.
         """
         if cls._instance is None:
-            cls._instance = super(Tweet, cls).__new__(cls)
-            cls._instance.authenticate()
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super(Tweet, cls).__new__(cls)
+                    instance.oauth = None
+                    cls._instance = instance
 
         return cls._instance
 
-    def authenticate(self):
+    @property
+    def consumer_key(self):
+        return getattr(settings, 'TWITTER_API_KEY', None) or self.CONSUMER_KEY
+
+    @property
+    def consumer_secret(self):
+        return (
+            getattr(settings, 'TWITTER_API_SECRET', None)
+            or self.CONSUMER_SECRET
+        )
+
+    def load_credentials(self):
         """
-        Authenticate with the Twitter API using OAuth1.
+        Build the OAuth1 session from stored credentials.
 
         Behavior:
-            - If an access token file exists, it loads credentials from it.
-            - If not, it initiates the OAuth flow:
-                - Fetches request token
-                - Prompts user to authorize via a browser link
-                - Exchanges verifier PIN for an access token
-                - Saves the token to disk for reuse
+            - Uses ``TWITTER_ACCESS_TOKEN`` / ``TWITTER_ACCESS_SECRET``
+              from settings when they are set.
+            - Otherwise reads the access token saved in `self.TOKEN_FILE`.
+            - Never makes network requests or prompts for input.
+
+        Returns:
+            bool: True if credentials were found.
+        """
+        access_token = getattr(settings, 'TWITTER_ACCESS_TOKEN', None)
+        access_secret = getattr(settings, 'TWITTER_ACCESS_SECRET', None)
+
+        if not (access_token and access_secret):
+            if not os.path.exists(self.TOKEN_FILE):
+                return False
+            with open(self.TOKEN_FILE, "r") as f:
+                token_data = json.load(f)
+            access_token = token_data["oauth_token"]
+            access_secret = token_data["oauth_token_secret"]
+
+        # Make the request object
+        self.oauth = OAuth1Session(
+            self.consumer_key,
+            client_secret=self.consumer_secret,
+            resource_owner_key=access_token,
+            resource_owner_secret=access_secret
+        )
+        return True
+
+    def verify_credentials(self, timeout=10):
+        """
+        Check the stored credentials against the Twitter API.
+
+        Meant to be run once at deploy time through
+        ``manage.py authorize_x --verify``, not from web requests.
+
+        Args:
+            timeout (float): Seconds to wait for the API.
+
+        Returns:
+            dict: The authenticated account.
+
+        Raises:
+            RuntimeError: If no credentials are stored or they are rejected.
+        """
+        if not self.oauth and not self.load_credentials():
+            raise RuntimeError(
+                "No X credentials found. Run `manage.py authorize_x`."
+            )
+
+        response = self.oauth.get(
+            f"{settings.TWITTER_API_URL}/1.1/account/verify_credentials.json",
+            timeout=timeout
+        )
+        if response.status_code != 200:
+            raise RuntimeError(
+                "credentials were rejected: {} - {}".format(
+                    response.status_code, response.text
+                )
+            )
+        return response.json()
+
+    def authenticate(self, input_func=input):
+        """
+        Authorize the app with the Twitter API using the OAuth1 PIN flow.
+
+        This is interactive and is only run from
+        ``manage.py authorize_x``, never from a web request.
+
+        Behavior:
+            - Fetches request token
+            - Prompts user to authorize via a browser link
+            - Exchanges verifier PIN for an access token
+            - Saves the token to disk for reuse
 
         Side Effects:
             - Sets `self.oauth` to an authenticated OAuth1Session.
@@ -46,37 +204,16 @@ class Tweet():
             ValueError: If consumer key/secret is invalid.
             Exception: On failure during any request or user input step.
         """
-
-        # Check first if token file already exists
-        if os.path.exists(self.TOKEN_FILE):
-            with open(self.TOKEN_FILE, "r") as f:
-                token_data = json.load(f)
-                print("loaded access token from file.")
-                # Make the request object
-                self.oauth = OAuth1Session(
-                    self.CONSUMER_KEY,
-                    client_secret=self.CONSUMER_SECRET,
-                    resource_owner_key=token_data["oauth_token"],
-                    resource_owner_secret=token_data["oauth_token_secret"]
-                )
-                response = self.oauth.get(
-                    "https://api.twitter.com/1.1/account"
-                    "/verify_credentials.json"
-                )
-                print(response.json())  # Shows which user is authenticated
-
-                return
-
         # Start OAuth process from scratch
         print("Authenticating with Twitter...")
         # Get request token
         request_token_url = (
-            "https://api.twitter.com/oauth/request_token"
+            f"{settings.TWITTER_API_URL}/oauth/request_token"
             "?oauth_callback=oob&x_auth_access_type=write"
         )
         oauth = OAuth1Session(
-            self.CONSUMER_KEY,
-            client_secret=self.CONSUMER_SECRET
+            self.consumer_key,
+            client_secret=self.consumer_secret
         )
 
         try:
@@ -86,22 +223,23 @@ class Tweet():
                 "There may have been an issue with the consumer_key"
                 " or consumer_secret you entered"
             )
+            raise
 
         resource_owner_key = fetch_response.get("oauth_token")
         resource_owner_secret = fetch_response.get("oauth_token_secret")
         print(f"Got OAuth token: {resource_owner_key}")
 
         # Get authorization
-        base_authorization_url = "https://api.twitter.com/oauth/authorize"
+        base_authorization_url = f"{settings.TWITTER_API_URL}/oauth/authorize"
         authorization_url = oauth.authorization_url(base_authorization_url)
         print(f"Please go here and authorize: {authorization_url}")
-        verifier = input("Paste the PIN here: ")
+        verifier = input_func("Paste the PIN here: ")
 
         # Get the access token
-        access_token_url = "https://api.twitter.com/oauth/access_token"
+        access_token_url = f"{settings.TWITTER_API_URL}/oauth/access_token"
         oauth = OAuth1Session(
-            self.CONSUMER_KEY,
-            client_secret=self.CONSUMER_SECRET,
+            self.consumer_key,
+            client_secret=self.consumer_secret,
             resource_owner_key=resource_owner_key,
             resource_owner_secret=resource_owner_secret,
             verifier=verifier,
@@ -121,56 +259,51 @@ class Tweet():
 
         # Make the request object
         self.oauth = OAuth1Session(
-            self.CONSUMER_KEY,
-            client_secret=self.CONSUMER_SECRET,
+            self.consumer_key,
+            client_secret=self.consumer_secret,
             resource_owner_key=access_token,
             resource_owner_secret=access_token_secret
         )
 
-    def make_tweet(self, text):
+    def make_tweet(self, text, timeout=None):
         """
         Post a tweet to the Twitter API.
 
         Args:
             text (str): The main tweet content
             (will be trimmed to 280 characters).
+            timeout (float): Seconds to wait for the API. Defaults to
+            ``TWITTER_TIMEOUT``.
 
         Returns:
-            None
+            dict: The JSON response of the API.
 
         Behavior:
-            - Posts the tweet via Twitter API v2.
-            - Handles errors silently, logging them to console.
+            - Loads stored credentials on first use, without verifying
+              them or prompting.
+            - Waits for the ``'social'`` rate limiter before posting.
+            - Posts the tweet via Twitter API v2 at ``TWITTER_API_URL``.
 
         Raises:
-            RuntimeError: If authentication was not completed.
-            Exception: If tweet submission fails.
+            TweetPermanentError: If authentication was not completed or
+                the API rejected the tweet itself.
+            TweetRateLimited: If the API answered 429.
+            TweetTransientError: On timeouts, connection or server errors.
         """
         # twitter api only allows 280 characters
         tweet_data = {"text": text.strip()[:280]}
+        timeout = timeout or settings.TWITTER_TIMEOUT
 
-        try:
-            if not hasattr(self, 'oauth') or not self.oauth:
-                raise RuntimeError("Twitter OAuth session is not initialized.")
-
-            # Making the request
-            response = self.oauth.post(
-                "https://api.twitter.com/2/tweets",
-                json=tweet_data,
+        if not self.oauth and not self.load_credentials():
+            raise TweetPermanentError(
+                "Twitter OAuth session is not initialized. "
+                "Run `manage.py authorize_x`."
             )
 
-            if response.status_code != 201:
-                raise Exception(
-                    "request returned an error: {} - {}".format(
-                        response.status_code, response.text
-                    )
-                )
-        except Exception as e:
-            print(f"[Tweet] Exception while sending tweet: {e}")
-            return
-
-        print("Response code: {}".format(response.text))
-
-        # Saving the response as JSON
-        json_response = response.json()
-        print(json.dumps(json_response, indent=4, sort_keys=True))
+        throttle('social')
+        return post_tweet(
+            self.oauth,
+            f"{settings.TWITTER_API_URL}/2/tweets",
+            tweet_data,
+            timeout
+        )
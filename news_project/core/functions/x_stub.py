@@ -0,0 +1,75 @@
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubXHandler(BaseHTTPRequestHandler):
+    """
+    Minimal stand-in for ``POST /2/tweets`` of the X API.
+
+    Answers 201 with a new id after the server's ``latency``. When
+    ``rate_limit_every`` is set, every n-th request gets a 429 with an
+    ``x-rate-limit-reset`` header, like the real API.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        payload = json.loads(self.rfile.read(length) or b'{}')
+        server = self.server
+        count = next(server.counter)
+
+        if server.latency:
+            time.sleep(server.latency)
+
+        if server.rate_limit_every and count % server.rate_limit_every == 0:
+            self.respond(
+                429,
+                {'title': 'Too Many Requests'},
+                {'x-rate-limit-reset': str(int(time.time()) + 1)}
+            )
+            return
+
+        with server.lock:
+            server.posts.append(payload.get('text', ''))
+        self.respond(201, {'data': {'id': str(count), **payload}})
+
+    def respond(self, status, body, headers=None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def make_server(host='127.0.0.1', port=0, latency=0.0, rate_limit_every=0):
+    """
+    Create a stub X server. Call ``serve_forever()`` to run it.
+
+    :param host: Interface to bind.
+    :type host: str
+    :param port: Port to bind; 0 picks a free port.
+    :type port: int
+    :param latency: Seconds to wait before answering each request.
+    :type latency: float
+    :param rate_limit_every: Answer every n-th request with 429.
+    :type rate_limit_every: int
+    :return: The server, with received texts in ``server.posts``.
+    :rtype: ThreadingHTTPServer
+    """
+    server = ThreadingHTTPServer((host, port), StubXHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.rate_limit_every = rate_limit_every
+    server.counter = itertools.count(1)
+    server.posts = []
+    server.lock = threading.Lock()
+    return server
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core.functions.tweet import Tweet
+
+
+class Command(BaseCommand):
+    """
+    Set up and check the X (Twitter) credentials used for posting.
+
+    Without arguments, runs the interactive PIN flow when no credentials
+    are stored yet, then verifies them. Web requests never do either.
+    """
+    help = "Authorize the app with X and verify the stored credentials."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help="Only verify stored credentials; never prompt."
+        )
+        parser.add_argument(
+            '--reauthorize',
+            action='store_true',
+            help="Run the PIN flow even if credentials are stored."
+        )
+
+    def handle(self, *args, **options):
+        tweet = Tweet()
+        has_credentials = tweet.load_credentials()
+
+        if options['reauthorize'] or not has_credentials:
+            if options['verify']:
+                raise CommandError(
+                    "No X credentials found. Run `manage.py authorize_x`."
+                )
+            tweet.authenticate()
+
+        try:
+            account = tweet.verify_credentials()
+        except Exception as e:
+            raise CommandError(f"Could not verify X credentials: {e}")
+
+        self.stdout.write(
+            f"Authenticated with X as @{account.get('screen_name')}."
+        )
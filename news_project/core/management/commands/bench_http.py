@@ -0,0 +1,112 @@
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+
+class Command(BaseCommand):
+    """
+    Compare API deployments under concurrent load.
+
+    Sends ``--requests`` GET requests to each ``--url`` from
+    ``--concurrency`` clients at once and reports throughput and
+    latency percentiles, e.g. to compare the DRF views served by a WSGI
+    server with the ``/api/async/`` views served by an ASGI server::
+
+        python manage.py runserver 8000
+        uvicorn news_project.asgi:application --port 8001
+        python manage.py bench_http --user reader \\
+            --url http://127.0.0.1:8000/api/articles/ \\
+            --url http://127.0.0.1:8001/api/async/articles/
+
+    Requests are signed in as ``--user`` with a session created in the
+    database the servers use, so run the command with the same settings.
+    """
+    help = "Benchmark API endpoints under concurrent load."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url',
+            action='append',
+            required=True,
+            help="URL to benchmark. Repeat to compare deployments."
+        )
+        parser.add_argument('--user', help="Username to sign in as.")
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--concurrency', type=int, default=50)
+        parser.add_argument('--timeout', type=float, default=30.0)
+
+    def session_cookie(self, username):
+        """Create a signed-in session for ``username``."""
+        User = get_user_model()
+        try:
+            user = User.objects.get(username=username)
+        except User.DoesNotExist:
+            raise CommandError(f"User {username!r} does not exist.")
+        client = Client()
+        client.force_login(user)
+        name = settings.SESSION_COOKIE_NAME
+        return {name: client.cookies[name].value}
+
+    def run(self, url, cookies, total, concurrency, timeout):
+        """
+        Load one URL.
+
+        :return: Elapsed seconds, latencies of successful requests and
+            the number of errors.
+        :rtype: tuple[float, list[float], int]
+        """
+        local = threading.local()
+
+        def fetch(_):
+            # One keep-alive session per client thread
+            session = getattr(local, 'session', None)
+            if session is None:
+                session = local.session = requests.Session()
+                session.cookies.update(cookies)
+            started = time.perf_counter()
+            try:
+                response = session.get(url, timeout=timeout)
+            except requests.RequestException:
+                return None
+            if response.status_code != 200:
+                return None
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(fetch, range(total)))
+        elapsed = time.perf_counter() - started
+
+        latencies = [result for result in results if result is not None]
+        return elapsed, latencies, len(results) - len(latencies)
+
+    def handle(self, *args, **options):
+        cookies = {}
+        if options['user']:
+            cookies = self.session_cookie(options['user'])
+
+        for url in options['url']:
+            elapsed, latencies, errors = self.run(
+                url, cookies, options['requests'], options['concurrency'],
+                options['timeout']
+            )
+            if len(latencies) >= 2:
+                percentiles = statistics.quantiles(
+                    latencies, n=100, method='inclusive'
+                )
+                p50, p95 = percentiles[49], percentiles[94]
+            else:
+                p50 = p95 = latencies[0] if latencies else 0.0
+            self.stdout.write(
+                f"{url}: {len(latencies) / elapsed:.1f} req/s, "
+                f"p50 {p50 * 1000:.1f} ms, p95 {p95 * 1000:.1f} ms, "
+                f"{errors} errors ({options['requests']} requests, "
+                f"concurrency {options['concurrency']})"
+            )
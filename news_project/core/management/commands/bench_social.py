@@ -0,0 +1,95 @@
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test.utils import override_settings
+
+from core.functions import social_queue
+from core.functions.social import get_backend
+from core.functions.x_stub import make_server
+from core.models import SocialPost
+
+
+class Command(BaseCommand):
+    """
+    Measure how many posts per second the posting queue delivers.
+
+    Queues ``--posts`` posts, drains them through the chosen backend and
+    reports throughput. By default an in-process stub X server is
+    started, so no network access is needed. The posts are flagged as
+    ``benchmark`` so the real worker never claims them, and they are
+    deleted afterwards, even if the run fails, unless ``--keep`` is
+    given.
+    """
+    help = "Benchmark posts per second through the X posting queue."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=500)
+        parser.add_argument('--workers', type=int, default=8)
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument(
+            '--backend',
+            choices=['stub', 'locmem'],
+            default='stub',
+            help="Publish to an in-process HTTP stub or to memory."
+        )
+        parser.add_argument(
+            '--latency',
+            type=float,
+            default=0.01,
+            help="Stub server latency per request, in seconds."
+        )
+        parser.add_argument('--keep', action='store_true')
+
+    def handle(self, *args, **options):
+        server = None
+        overrides = {}
+        if options['backend'] == 'stub':
+            server = make_server(latency=options['latency'])
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            host, port = server.server_address[:2]
+            overrides = {
+                'SOCIAL_BACKEND': 'core.functions.social.HTTPStubBackend',
+                'SOCIAL_STUB_URL': f'http://{host}:{port}',
+            }
+        else:
+            overrides = {
+                'SOCIAL_BACKEND': 'core.functions.social.LocMemBackend',
+            }
+
+        ids = []
+        try:
+            # Saved one by one: bulk_create does not return ids on MySQL
+            with transaction.atomic():
+                for i in range(options['posts']):
+                    ids.append(SocialPost.objects.create(
+                        text=f"Benchmark post {i}", benchmark=True
+                    ).pk)
+
+            with override_settings(**overrides):
+                backend = get_backend()
+                started = time.monotonic()
+                while social_queue.drain(
+                    options['batch_size'],
+                    options['workers'],
+                    backend,
+                    benchmark=True
+                ):
+                    pass
+                elapsed = time.monotonic() - started
+
+            sent = SocialPost.objects.filter(
+                pk__in=ids, status=SocialPost.STATUS_SENT
+            ).count()
+            self.stdout.write(
+                f"Sent {sent}/{len(ids)} posts in {elapsed:.2f}s "
+                f"({sent / elapsed if elapsed else sent:.1f} posts/s) "
+                f"with {options['workers']} workers via {options['backend']}."
+            )
+        finally:
+            if server is not None:
+                server.shutdown()
+                server.server_close()
+            if not options['keep']:
+                SocialPost.objects.filter(pk__in=ids).delete()
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from core.functions import feed_cache
+
+
+class Command(BaseCommand):
+    """
+    Report the hit and miss counters of the per-reader feed cache.
+
+    The counters live in the cache itself, so they cover every web
+    process sharing ``FEED_CACHE_ALIAS``. Each process adds its counts
+    at most every ``FEED_CACHE_STATS_INTERVAL`` seconds, so the figures
+    lag by up to that long.
+    """
+    help = "Show (and optionally reset) the feed cache hit/miss counters."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help="Reset the counters after printing them."
+        )
+
+    def handle(self, *args, **options):
+        stats = feed_cache.stats()
+        self.stdout.write(
+            f"hits={stats['hits']} misses={stats['misses']} "
+            f"hit_ratio={stats['hit_ratio']}"
+        )
+        if options['reset']:
+            feed_cache.reset_stats()
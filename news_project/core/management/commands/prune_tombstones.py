@@ -0,0 +1,31 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.functions import changes
+
+
+class Command(BaseCommand):
+    """
+    Delete change feed tombstones past their retention period.
+
+    Schedule it daily (e.g. with cron). Clients whose ``since`` cursor
+    is older than the retention period get 410 Gone and sync again from
+    scratch, so pruned tombstones are never needed.
+    """
+    help = "Delete tombstones older than TOMBSTONE_RETENTION_DAYS."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            help="Keep tombstones for this many days instead."
+        )
+
+    def handle(self, *args, **options):
+        before = None
+        if options['days'] is not None:
+            before = timezone.now() - timedelta(days=options['days'])
+        deleted = changes.prune(before)
+        self.stdout.write(f"Deleted {deleted} tombstones.")
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from core.functions import timeline
+
+
+class Command(BaseCommand):
+    """
+    Rebuild readers' feed timelines from their subscriptions.
+
+    Run once before turning on ``FEED_TIMELINE_ENABLED`` and whenever the
+    timeline table may have drifted, e.g. after bulk changes made with
+    ``QuerySet.update()`` that bypass signals.
+    """
+    help = "Rebuild the materialized feed timelines from scratch."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reader',
+            type=int,
+            action='append',
+            dest='readers',
+            help="Only rebuild this reader's timeline (repeatable)."
+        )
+
+    def handle(self, *args, **options):
+        rebuilt = timeline.rebuild(options['readers'])
+        self.stdout.write(f"Rebuilt {rebuilt} timelines.")
@@ -0,0 +1,71 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.functions import outbox
+from core.functions.ratelimit import limiter_stats
+
+
+class Command(BaseCommand):
+    """
+    Drain the notification outbox.
+
+    Claims pending outbox events and delivers them (emails and X posts)
+    with a pool of worker threads. Runs until interrupted unless
+    ``--once`` is given.
+    """
+    help = "Deliver pending approval notifications from the outbox."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.OUTBOX_WORKERS,
+            help="Number of events delivered concurrently."
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.OUTBOX_BATCH_SIZE,
+            help="Maximum number of events claimed per batch."
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=settings.OUTBOX_POLL_INTERVAL,
+            help="Seconds to wait when the outbox is empty."
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help="Drain the outbox until it is empty, then exit."
+        )
+
+    def handle(self, *args, **options):
+        workers = options['workers']
+        batch_size = options['batch_size']
+        self.stdout.write(f"Outbox worker started with {workers} workers.")
+
+        try:
+            while True:
+                claimed = outbox.drain(workers=workers, batch_size=batch_size)
+                if claimed:
+                    self.stdout.write(f"Processed {claimed} outbox events.")
+                    self.report_throttling()
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            self.stdout.write("Outbox worker stopped.")
+
+    def report_throttling(self):
+        """Print the rate limiter counters of channels that were throttled."""
+        for channel, stats in limiter_stats().items():
+            if stats['throttled']:
+                self.stdout.write(
+                    f"Throttled {channel}: {stats['throttled']} waits, "
+                    f"{stats['throttled_seconds']}s total, "
+                    f"{stats['acquired']} sent."
+                )
@@ -0,0 +1,58 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.functions import social_queue
+
+
+class Command(BaseCommand):
+    """
+    Drain the queue of posts to X.
+
+    Posts are sent one at a time with bounded timeouts. Failed posts are
+    retried with backoff and permanently failed posts are kept with
+    status ``dead``. Runs until interrupted unless ``--once`` is given.
+    """
+    help = "Send queued posts to X with retries and backoff."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.SOCIAL_BATCH_SIZE,
+            help="Maximum number of posts claimed per batch."
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=settings.SOCIAL_WORKERS,
+            help="Number of posts sent concurrently."
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=settings.SOCIAL_POLL_INTERVAL,
+            help="Seconds to wait when no post is due."
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help="Send every due post, then exit."
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("Social posting worker started.")
+        try:
+            while True:
+                claimed = social_queue.drain(
+                    options['batch_size'], options['workers']
+                )
+                if claimed:
+                    self.stdout.write(f"Processed {claimed} posts.")
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            self.stdout.write("Social posting worker stopped.")
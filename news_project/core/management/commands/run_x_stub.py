@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+
+from core.functions.x_stub import make_server
+
+
+class Command(BaseCommand):
+    """
+    Run a local stand-in for the X posting API.
+
+    Use with ``SOCIAL_BACKEND = 'core.functions.social.HTTPStubBackend'``
+    to load-test the approval and posting pipeline without network
+    access.
+    """
+    help = "Serve a local stub of POST /2/tweets for load testing."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8765)
+        parser.add_argument(
+            '--latency',
+            type=float,
+            default=0.0,
+            help="Seconds to wait before answering each request."
+        )
+        parser.add_argument(
+            '--rate-limit-every',
+            type=int,
+            default=0,
+            help="Answer every n-th request with 429."
+        )
+
+    def handle(self, *args, **options):
+        server = make_server(
+            options['host'],
+            options['port'],
+            options['latency'],
+            options['rate_limit_every']
+        )
+        host, port = server.server_address[:2]
+        self.stdout.write(f"Stub X API listening on http://{host}:{port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            self.stdout.write(f"Stopped after {len(server.posts)} posts.")
+        finally:
+            server.server_close()
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from core.functions.digest import send_digests
+from core.models import CustomUser
+
+
+class Command(BaseCommand):
+    """
+    Send digest emails to readers who opted out of per-item emails.
+
+    Intended to be scheduled (e.g. with cron) once per window:
+    ``--frequency hourly`` every hour and ``--frequency daily`` once a day.
+    """
+    help = "Send one digest email per reader for the given frequency."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--frequency',
+            choices=[CustomUser.DIGEST_HOURLY, CustomUser.DIGEST_DAILY],
+            required=True,
+            help="Which digest window to send."
+        )
+
+    def handle(self, *args, **options):
+        sent = send_digests(options['frequency'])
+        self.stdout.write(f"Sent {sent} {options['frequency']} digests.")
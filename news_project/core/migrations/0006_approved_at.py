@@ -0,0 +1,34 @@
+# Generated by Django 5.2.4 on 2026-10-17 00:17
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_approved_at(apps, schema_editor):
+    # Content approved before this migration has already been sent out
+    for model_name in ('Article', 'Newsletter'):
+        model = apps.get_model('core', model_name)
+        model.objects.filter(approved=True).update(approved_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_outboxevent'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='approved_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='newsletter',
+            name='approved_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(
+            backfill_approved_at, migrations.RunPython.noop
+        ),
+    ]
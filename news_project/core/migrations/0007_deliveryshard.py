@@ -0,0 +1,32 @@
+# Generated by Django 5.2.4 on 2026-10-17 00:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_approved_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DeliveryShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_reader_id', models.PositiveBigIntegerField()),
+                ('last_reader_id', models.PositiveBigIntegerField()),
+                ('progress_reader_id', models.PositiveBigIntegerField(default=0)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('sent_count', models.PositiveIntegerField(default=0)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='shards', to='core.outboxevent')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('event', 'first_reader_id'), name='unique_shard_per_event_range')],
+            },
+        ),
+    ]
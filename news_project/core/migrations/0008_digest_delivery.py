@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-17 00:19
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_deliveryshard'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='digest_frequency',
+            field=models.CharField(choices=[('immediate', 'Every item'), ('hourly', 'Hourly digest'), ('daily', 'Daily digest')], default='immediate', max_length=20),
+        ),
+        migrations.CreateModel(
+            name='PendingDigestItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('article', 'Article'), ('newsletter', 'Newsletter')], max_length=20)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('reader', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pending_digest_items', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('reader', 'kind', 'object_id'), name='unique_digest_item_per_reader')],
+            },
+        ),
+    ]
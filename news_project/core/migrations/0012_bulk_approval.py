@@ -0,0 +1,60 @@
+# Generated by Django 5.2.4 on 2026-10-17 00:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_social_post_items(apps, schema_editor):
+    # Posts queued before bulk approval belong to single-item events
+    SocialPost = apps.get_model('core', 'SocialPost')
+    OutboxEvent = apps.get_model('core', 'OutboxEvent')
+    SocialPost.objects.filter(event__isnull=False).update(
+        object_id=Subquery(
+            OutboxEvent.objects.filter(
+                pk=OuterRef('event_id')
+            ).values('object_id')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_timelineentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxevent',
+            name='payload',
+            field=models.JSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='socialpost',
+            name='object_id',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='outboxevent',
+            name='kind',
+            field=models.CharField(choices=[('article', 'Article'), ('newsletter', 'Newsletter'), ('bulk', 'Bulk approval')], max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='outboxevent',
+            name='object_id',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='socialpost',
+            name='event',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='social_posts', to='core.outboxevent'),
+        ),
+        migrations.RunPython(
+            backfill_social_post_items, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name='socialpost',
+            constraint=models.UniqueConstraint(fields=('event', 'object_id'), name='unique_social_post_per_event_item'),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.4 on 2026-10-17 00:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_tombstone'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['journalist', 'approved', 'created_at', 'id'], name='article_journalist_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['publisher', 'approved', 'created_at', 'id'], name='article_publisher_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['journalist', 'approved', 'updated_at', 'id'], name='article_journalist_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['publisher', 'approved', 'updated_at', 'id'], name='article_publisher_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['approved', 'created_at', 'id'], name='article_moderation_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['approved', 'approved_at', 'id'], name='article_approved_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newsletter',
+            index=models.Index(fields=['journalist', 'approved', 'created_at', 'id'], name='newsletter_journalist_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newsletter',
+            index=models.Index(fields=['publisher', 'approved', 'created_at', 'id'], name='newsletter_publisher_feed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newsletter',
+            index=models.Index(fields=['journalist', 'approved', 'updated_at', 'id'], name='newsletter_journalist_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newsletter',
+            index=models.Index(fields=['publisher', 'approved', 'updated_at', 'id'], name='newsletter_publisher_sync_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newsletter',
+            index=models.Index(fields=['approved', 'created_at', 'id'], name='newsletter_moderation_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='newsletter',
+            index=models.Index(fields=['approved', 'approved_at', 'id'], name='newsletter_approved_at_idx'),
+        ),
+    ]
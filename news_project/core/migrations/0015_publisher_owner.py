@@ -0,0 +1,36 @@
+# Generated by Django 5.2.4 on 2026-10-17 00:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_owners(apps, schema_editor):
+    # Publisher accounts were matched to the publisher sharing their
+    # username; keep the oldest match when several share it
+    CustomUser = apps.get_model('core', 'CustomUser')
+    Publisher = apps.get_model('core', 'Publisher')
+    users = CustomUser.objects.filter(role='publisher').order_by('pk')
+    for user in users.iterator():
+        publisher = Publisher.objects.filter(
+            name=user.username, owner__isnull=True
+        ).order_by('pk').first()
+        if publisher is not None:
+            publisher.owner = user
+            publisher.save(update_fields=['owner'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_content_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='publisher',
+            name='owner',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='owned_publisher', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.RunPython(backfill_owners, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-17 01:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_shard_lease'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='socialpost',
+            name='benchmark',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-17 01:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_socialpost_benchmark'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='outboxevent',
+            name='kind',
+            field=models.CharField(choices=[('article', 'Article'), ('newsletter', 'Newsletter'), ('bulk', 'Bulk approval'), ('timeline', 'Timeline update')], max_length=20),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-17 01:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_outbox_timeline_kind'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pendingdigestitem',
+            name='sent_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
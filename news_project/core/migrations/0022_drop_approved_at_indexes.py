@@ -0,0 +1,21 @@
+# Generated by Django 5.2.4 on 2026-10-17 01:37
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_digest_item_sent_at'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='article',
+            name='article_approved_at_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='newsletter',
+            name='newsletter_approved_at_idx',
+        ),
+    ]
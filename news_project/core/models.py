@@ -1,6 +1,7 @@
 from django.contrib.auth.models import AbstractUser, Group
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 
 class CustomUser(AbstractUser):
@@ -13,6 +14,10 @@ class CustomUser(AbstractUser):
             follow publishers.
         - subscribed_journalists: Many-to-many relation for readers to
             follow journalists.
+        - digest_frequency: Whether a reader is emailed for every item
+            or receives an hourly or daily digest.
+        - subscriptions_changed_at: When the reader's subscriptions last
+            changed. Part of the reader's feed validator.
 
     Methods:
         - is_reader(): True if user is a reader.
@@ -28,6 +33,14 @@ class CustomUser(AbstractUser):
         ('editor', 'Editor'),
         ('publisher', 'Publisher')
     )
+    DIGEST_IMMEDIATE = 'immediate'
+    DIGEST_HOURLY = 'hourly'
+    DIGEST_DAILY = 'daily'
+    DIGEST_CHOICES = (
+        (DIGEST_IMMEDIATE, 'Every item'),
+        (DIGEST_HOURLY, 'Hourly digest'),
+        (DIGEST_DAILY, 'Daily digest'),
+    )
     role = models.CharField(max_length=20, choices=ROLE_CHOICES)
 
     # Reader-specific fields
@@ -41,6 +54,12 @@ class CustomUser(AbstractUser):
         blank=True,
         related_name='followers'
     )
+    digest_frequency = models.CharField(
+        max_length=20,
+        choices=DIGEST_CHOICES,
+        default=DIGEST_IMMEDIATE
+    )
+    subscriptions_changed_at = models.DateTimeField(null=True, blank=True)
 
     # Journalist-specific fields
     def is_reader(self):
@@ -79,6 +98,7 @@ class Publisher(models.Model):
 
     Fields:
         - name: Name of the publisher.
+        - owner: Publisher account that manages this publisher.
         - editors: Editors affiliated with this publisher.
         - journalists: Journalists affiliated with this publisher.
 
@@ -86,6 +106,12 @@ class Publisher(models.Model):
         - __str__(): Returns the name of the publisher.
     """
     name = models.CharField(max_length=100)
+    owner = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True, blank=True,
+        related_name='owned_publisher'
+    )
     editors = models.ManyToManyField(
         settings.AUTH_USER_MODEL,
         related_name='editor_publishers',
@@ -101,7 +127,74 @@ class Publisher(models.Model):
         return self.name
 
 
-class Article(models.Model):
+class ApprovalTrackingModel(models.Model):
+    """
+    Abstract base that records when content becomes approved.
+
+    Fields:
+        - approved_at: Timestamp of the unapproved to approved transition.
+
+    Attributes:
+        - just_approved: True after a save() that performed the
+            transition. Signal handlers use it so fan-out happens exactly
+            once per approval rather than on every later edit.
+        - loaded_values: ``approved``, ``journalist_id`` and
+            ``publisher_id`` as they were in the database, so signal
+            handlers can tell which feeds a change leaves.
+
+    Methods:
+        - from_db(): Records ``loaded_values``.
+        - save(): Stamps ``approved_at`` on the transition, clears it
+            when content is unapproved and refreshes ``loaded_values``.
+    """
+    TRACKED_FIELDS = ('approved', 'journalist_id', 'publisher_id')
+
+    approved_at = models.DateTimeField(null=True, blank=True)
+
+    just_approved = False
+    loaded_values = {}
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.loaded_values = {
+            name: getattr(instance, name) for name in cls.TRACKED_FIELDS
+            if name in instance.__dict__
+        }
+        return instance
+
+    def save(self, *args, **kwargs):
+        self.just_approved = False
+        if not self.approved:
+            self.approved_at = None
+        elif self.approved_at is None:
+            self.approved_at = timezone.now()
+            self.just_approved = True
+            if not self._state.adding:
+                # Only one concurrent approval may win the transition
+                claimed = type(self).objects.filter(
+                    pk=self.pk, approved_at__isnull=True
+                ).update(approved_at=self.approved_at)
+                if not claimed:
+                    self.just_approved = False
+                    self.approved_at = type(self).objects.values_list(
+                        'approved_at', flat=True
+                    ).get(pk=self.pk)
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'approved' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'approved_at'}
+        super().save(*args, **kwargs)
+        # post_save handlers have seen the old values by now
+        self.loaded_values = {
+            name: getattr(self, name) for name in self.TRACKED_FIELDS
+        }
+
+
+class Article(ApprovalTrackingModel):
     """
     Represents a news article written by a journalist.
 
@@ -109,7 +202,9 @@ class Article(models.Model):
         - title: Title of the article.
         - content: Full text of the article.
         - created_at: Timestamp when article was created.
+        - updated_at: Timestamp of the last change to the article.
         - approved: True if approved by an editor.
+        - approved_at: Timestamp when the article was approved.
         - journalist: Author (CustomUser) of the article.
         - publisher: Optional publisher for the article.
 
@@ -119,6 +214,7 @@ class Article(models.Model):
     title = models.CharField(max_length=200)
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     approved = models.BooleanField(default=False)
     journalist = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -129,11 +225,39 @@ class Article(models.Model):
         null=True, blank=True
     )
 
+    class Meta:
+        # Approved items by source, newest first (reader feeds and
+        # dashboards) and by last change (the sync change feed); approved
+        # or pending items by age (moderation queue) and by approval time
+        # (live events)
+        indexes = [
+            models.Index(
+                fields=['journalist', 'approved', 'created_at', 'id'],
+                name='article_journalist_feed_idx'
+            ),
+            models.Index(
+                fields=['publisher', 'approved', 'created_at', 'id'],
+                name='article_publisher_feed_idx'
+            ),
+            models.Index(
+                fields=['journalist', 'approved', 'updated_at', 'id'],
+                name='article_journalist_sync_idx'
+            ),
+            models.Index(
+                fields=['publisher', 'approved', 'updated_at', 'id'],
+                name='article_publisher_sync_idx'
+            ),
+            models.Index(
+                fields=['approved', 'created_at', 'id'],
+                name='article_moderation_idx'
+            ),
+        ]
+
     def __str__(self):
         return self.title
 
 
-class Newsletter(models.Model):
+class Newsletter(ApprovalTrackingModel):
     """
     Represents a newsletter created by a journalist.
 
@@ -141,6 +265,9 @@ class Newsletter(models.Model):
         - title: Title of the newsletter.
         - body: Content of the newsletter.
         - created_at: Timestamp when created.
+        - updated_at: Timestamp of the last change.
+        - approved: True if approved by an editor.
+        - approved_at: Timestamp when the newsletter was approved.
         - journalist: Authoring journalist.
         - publisher: Optional publisher for the newsletter.
 
@@ -150,6 +277,7 @@ class Newsletter(models.Model):
     title = models.CharField(max_length=200)
     body = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     approved = models.BooleanField(default=False)
     journalist = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -162,5 +290,405 @@ class Newsletter(models.Model):
         related_name='newsletters'
     )
 
+    class Meta:
+        # Approved items by source, newest first (reader feeds and
+        # dashboards) and by last change (the sync change feed); approved
+        # or pending items by age (moderation queue) and by approval time
+        # (live events)
+        indexes = [
+            models.Index(
+                fields=['journalist', 'approved', 'created_at', 'id'],
+                name='newsletter_journalist_feed_idx'
+            ),
+            models.Index(
+                fields=['publisher', 'approved', 'created_at', 'id'],
+                name='newsletter_publisher_feed_idx'
+            ),
+            models.Index(
+                fields=['journalist', 'approved', 'updated_at', 'id'],
+                name='newsletter_journalist_sync_idx'
+            ),
+            models.Index(
+                fields=['publisher', 'approved', 'updated_at', 'id'],
+                name='newsletter_publisher_sync_idx'
+            ),
+            models.Index(
+                fields=['approved', 'created_at', 'id'],
+                name='newsletter_moderation_idx'
+            ),
+        ]
+
     def __str__(self):
         return self.title
+
+
+class OutboxEvent(models.Model):
+    """
+    A notification job recorded when content is approved.
+
+    Rows are written in the same transaction as the approval and drained
+    later by ``manage.py run_outbox``, so sending emails and posting to X
+    never happens inside the editor's request.
+
+    Fields:
+        - kind: Type of content the event refers to, ``bulk`` for
+            several items approved together, or ``timeline`` for an
+            approved item whose timelines must be rewritten.
+        - object_id: Primary key of the approved Article or Newsletter.
+            Empty for bulk and timeline events.
+        - payload: For bulk events, the approved ids by kind. For
+            timeline events, the item's ``kind`` and ``id``.
+        - status: Delivery state of the event.
+        - attempts: Number of times a worker has claimed the event.
+        - last_error: Error message from the most recent failed attempt.
+        - created_at: Timestamp when the event was recorded.
+        - available_at: Earliest time a worker may claim the event.
+        - locked_at: Time the event was claimed by a worker.
+
+    Methods:
+        - __str__(): Returns the kind, object id and status.
+    """
+    KIND_ARTICLE = 'article'
+    KIND_NEWSLETTER = 'newsletter'
+    KIND_BULK = 'bulk'
+    KIND_TIMELINE = 'timeline'
+    KIND_CHOICES = (
+        (KIND_ARTICLE, 'Article'),
+        (KIND_NEWSLETTER, 'Newsletter'),
+    )
+    EVENT_KIND_CHOICES = KIND_CHOICES + (
+        (KIND_BULK, 'Bulk approval'),
+        (KIND_TIMELINE, 'Timeline update'),
+    )
+
+    STATUS_PENDING = 'pending'
+    STATUS_PROCESSING = 'processing'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = (
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_PROCESSING, 'Processing'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    )
+
+    kind = models.CharField(max_length=20, choices=EVENT_KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField(null=True, blank=True)
+    payload = models.JSONField(null=True, blank=True)
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    available_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'available_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}:{self.object_id} ({self.status})"
+
+
+class DeliveryShard(models.Model):
+    """
+    A slice of one outbox event's audience, delivered independently.
+
+    Large audiences are split into contiguous reader id ranges so they can
+    be sent concurrently. Progress is stored per shard, so a retried event
+    skips shards that already completed and resumes a failed shard after
+    the last reader it reached. A worker claims a shard before sending it
+    and renews the claim (``locked_at``) with every progress update, so
+    two workers never send the same shard at once.
+
+    Fields:
+        - event: Outbox event the shard belongs to.
+        - first_reader_id: Lowest reader id in the shard.
+        - last_reader_id: Highest reader id in the shard.
+        - progress_reader_id: Last reader id that was sent to.
+        - status: Delivery state of the shard.
+        - sent_count: Number of messages sent so far.
+        - attempts: Number of delivery attempts.
+        - last_error: Error message from the most recent failure.
+        - locked_at: When the sending worker last renewed its claim.
+        - updated_at: Timestamp of the last progress update.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_SENDING = 'sending'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = (
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENDING, 'Sending'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    )
+
+    event = models.ForeignKey(
+        OutboxEvent,
+        on_delete=models.CASCADE,
+        related_name='shards'
+    )
+    first_reader_id = models.PositiveBigIntegerField()
+    last_reader_id = models.PositiveBigIntegerField()
+    progress_reader_id = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING
+    )
+    sent_count = models.PositiveIntegerField(default=0)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['event', 'first_reader_id'],
+                name='unique_shard_per_event_range'
+            ),
+        ]
+
+    def __str__(self):
+        return (
+            f"{self.event_id}[{self.first_reader_id}-{self.last_reader_id}]"
+            f" ({self.status})"
+        )
+
+
+class PendingDigestItem(models.Model):
+    """
+    An approved item waiting to be included in a reader's digest.
+
+    Readers who opted into a digest get one row per approved item instead
+    of an email. ``manage.py send_digests`` marks the rows as sent,
+    collects them into one message per reader and deletes them.
+
+    Fields:
+        - reader: Reader the item is queued for.
+        - kind: Type of content (article or newsletter).
+        - object_id: Primary key of the approved content.
+        - created_at: Timestamp when the item was queued.
+        - sent_at: Time a digest run claimed the item for sending.
+    """
+    reader = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='pending_digest_items'
+    )
+    kind = models.CharField(max_length=20, choices=OutboxEvent.KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['reader', 'kind', 'object_id'],
+                name='unique_digest_item_per_reader'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.reader_id}: {self.kind}:{self.object_id}"
+
+
+class SocialPost(models.Model):
+    """
+    A queued post to X (formerly Twitter).
+
+    Approved articles enqueue a post instead of calling the API inline.
+    ``manage.py run_social_queue`` sends queued posts with timeouts,
+    exponential backoff and the API's rate-limit reset time. Posts that
+    fail permanently stay in the table with status ``dead`` (the
+    dead-letter store) for inspection.
+
+    Fields:
+        - event: Outbox event that queued the post, if any.
+        - object_id: Article the post is about, so an event covering
+            several articles queues each post once.
+        - text: Text to post.
+        - status: Delivery state of the post.
+        - attempts: Number of failed attempts so far.
+        - available_at: Earliest time the post may be sent.
+        - locked_at: Time the post was claimed by a worker.
+        - last_error: Error message from the most recent failure.
+        - external_id: Id assigned by the API once posted.
+        - created_at: Timestamp when the post was queued.
+        - sent_at: Timestamp when the post was published.
+        - benchmark: Queued by ``manage.py bench_social``. Such posts are
+            only ever claimed by the benchmark, never by the real worker.
+
+    Methods:
+        - __str__(): Returns the start of the post text.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_DEAD = 'dead'
+    STATUS_CHOICES = (
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENDING, 'Sending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_DEAD, 'Dead'),
+    )
+
+    event = models.ForeignKey(
+        OutboxEvent,
+        null=True, blank=True,
+        on_delete=models.SET_NULL,
+        related_name='social_posts'
+    )
+    object_id = models.PositiveBigIntegerField(null=True, blank=True)
+    text = models.TextField()
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING
+    )
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    external_id = models.CharField(max_length=64, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    benchmark = models.BooleanField(default=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['event', 'object_id'],
+                name='unique_social_post_per_event_item'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'available_at']),
+        ]
+
+    def __str__(self):
+        return self.text[:50]
+
+
+class TimelineEntry(models.Model):
+    """
+    One approved item in a reader's materialized feed.
+
+    Only used when ``FEED_TIMELINE_ENABLED`` is set. Rows are written for
+    every follower when an item is delivered, so a reader's feed is a
+    range scan of their own rows instead of a query over everything they
+    follow. The item's sources are copied onto the row so unsubscribing
+    can trim the timeline without touching the content tables.
+
+    Fields:
+        - reader: Reader whose feed the item is in.
+        - kind: Type of content (article or newsletter).
+        - object_id: Primary key of the item.
+        - created_at: Creation time of the item, the feed's sort key.
+        - journalist: Author of the item.
+        - publisher: Publisher of the item, if any.
+    """
+    reader = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries'
+    )
+    kind = models.CharField(max_length=20, choices=OutboxEvent.KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    created_at = models.DateTimeField()
+    journalist = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    publisher = models.ForeignKey(
+        Publisher,
+        on_delete=models.SET_NULL,
+        null=True, blank=True,
+        related_name='+'
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['reader', 'kind', 'object_id'],
+                name='unique_timeline_item_per_reader'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['reader', 'kind', '-created_at', '-object_id'],
+                name='timeline_reader_feed_idx'
+            ),
+            models.Index(
+                fields=['kind', 'object_id'], name='timeline_item_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.reader_id}: {self.kind}:{self.object_id}"
+
+
+class Tombstone(models.Model):
+    """
+    Record of an approved item leaving readers' feeds.
+
+    Written when an approved item is deleted or unapproved, and for its
+    old sources when it moves to another journalist or publisher, so
+    the change feed can tell offline clients to drop it. Rows are pruned
+    after ``TOMBSTONE_RETENTION_DAYS`` by ``manage.py prune_tombstones``.
+
+    The item's former sources are plain ids rather than foreign keys:
+    the journalist or publisher may be deleted along with the item.
+
+    Fields:
+        - kind: Type of content (article or newsletter).
+        - object_id: Primary key of the item.
+        - journalist_id: Journalist the item was visible through.
+        - publisher_id: Publisher the item was visible through, if any.
+        - deleted_at: When the item left the feeds.
+    """
+    kind = models.CharField(max_length=20, choices=OutboxEvent.KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    journalist_id = models.PositiveBigIntegerField()
+    publisher_id = models.PositiveBigIntegerField(null=True, blank=True)
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['deleted_at', 'id'], name='tombstone_deleted_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}:{self.object_id} at {self.deleted_at}"
+
+
+class RateLimitBucket(models.Model):
+    """
+    Token bucket state of one outbound channel, shared by all processes.
+
+    Rows are created on first use by
+    :class:`core.functions.ratelimit.SharedTokenBucket` and locked while
+    tokens are taken, so the web and worker processes together keep to
+    the channel's ``RATE_LIMITS`` entry.
+
+    Fields:
+        - channel: Channel name, e.g. ``'email'`` or ``'social'``.
+        - tokens: Tokens left at ``updated_at``.
+        - updated_at: Unix time the tokens were last counted.
+    """
+    channel = models.CharField(max_length=50, unique=True)
+    tokens = models.FloatField()
+    updated_at = models.FloatField()
+
+    def __str__(self):
+        return f"{self.channel}: {self.tokens:.1f} tokens"
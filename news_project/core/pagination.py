@@ -0,0 +1,181 @@
+import base64
+import binascii
+import json
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.utils.urls import replace_query_param
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor that cannot be decoded."""
+
+
+def encode_cursor(created_at, pk):
+    """
+    Encode a ``(created_at, id)`` position as an opaque cursor string.
+
+    :param created_at: Creation time of the last item on a page.
+    :type created_at: datetime
+    :param pk: Primary key of the last item on a page.
+    :type pk: int
+    :return: URL-safe cursor.
+    :rtype: str
+    """
+    raw = json.dumps([created_at.isoformat(), pk]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by :func:`encode_cursor`.
+
+    :param cursor: Cursor sent by the client.
+    :type cursor: str
+    :return: The ``(created_at, id)`` position.
+    :rtype: tuple[datetime, int]
+    :raises InvalidCursor: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, pk = json.loads(base64.urlsafe_b64decode(padded))
+        created_at = parse_datetime(created_at)
+        if created_at is None or not isinstance(pk, int):
+            raise ValueError(cursor)
+    except (ValueError, TypeError, binascii.Error) as e:
+        raise InvalidCursor("Invalid cursor.") from e
+    return created_at, pk
+
+
+def encode_merged_cursor(positions):
+    """
+    Encode the positions reached in several interleaved feeds.
+
+    :param positions: Mapping of feed name to the ``(created_at, id)``
+        of the last item returned from it.
+    :type positions: dict
+    :return: URL-safe cursor.
+    :rtype: str
+    """
+    raw = json.dumps({
+        name: [created_at.isoformat(), pk]
+        for name, (created_at, pk) in positions.items()
+    }).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_merged_cursor(cursor, names):
+    """
+    Decode a cursor produced by :func:`encode_merged_cursor`.
+
+    :param cursor: Cursor sent by the client.
+    :type cursor: str
+    :param names: Feed names the cursor may contain.
+    :type names: Iterable[str]
+    :return: Mapping of feed name to ``(created_at, id)``.
+    :rtype: dict
+    :raises InvalidCursor: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded))
+        positions = {}
+        for name, (created_at, pk) in raw.items():
+            created_at = parse_datetime(created_at)
+            valid = (
+                name in names and created_at is not None and
+                isinstance(pk, int)
+            )
+            if not valid:
+                raise ValueError(cursor)
+            positions[name] = (created_at, pk)
+    except (ValueError, TypeError, AttributeError, binascii.Error) as e:
+        raise InvalidCursor("Invalid cursor.") from e
+    return positions
+
+
+def keyset_page(queryset, cursor=None, page_size=None, descending=True,
+                id_field='id'):
+    """
+    Return one page of ``queryset`` ordered by ``(created_at, id)``.
+
+    Instead of OFFSET, the page starts right after the cursor position
+    with a ``(created_at, id)`` comparison, so fetching a deep page costs
+    the same as fetching the first one and items never shift between
+    pages when new content arrives.
+
+    :param queryset: Items with ``created_at`` and ``id_field`` fields.
+    :type queryset: QuerySet
+    :param cursor: Cursor of the previous page's last item, if any.
+    :type cursor: str
+    :param page_size: Items per page. Defaults to ``API_PAGE_SIZE``.
+    :type page_size: int
+    :param descending: Newest first when True, oldest first otherwise.
+    :type descending: bool
+    :param id_field: Field breaking ties between equal ``created_at``,
+        e.g. ``object_id`` when paging over timeline rows.
+    :type id_field: str
+    :return: The page's items and the cursor of the next page, or None
+        on the last page.
+    :rtype: tuple[list, str | None]
+    :raises InvalidCursor: If the cursor is malformed.
+    """
+    page_size = page_size or settings.API_PAGE_SIZE
+    if descending:
+        queryset = queryset.order_by('-created_at', '-' + id_field)
+    else:
+        queryset = queryset.order_by('created_at', id_field)
+
+    if cursor:
+        created_at, pk = decode_cursor(cursor)
+        lookup = 'lt' if descending else 'gt'
+        queryset = queryset.filter(
+            Q(**{f'created_at__{lookup}': created_at}) |
+            Q(created_at=created_at, **{f'{id_field}__{lookup}': pk})
+        )
+
+    # Fetch one extra row to know whether another page exists
+    items = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        next_cursor = encode_cursor(
+            items[-1].created_at, getattr(items[-1], id_field)
+        )
+    return items, next_cursor
+
+
+def get_page_size(request):
+    """
+    Read the ``page_size`` query parameter, bounded by the settings.
+
+    :param request: API request.
+    :type request: Request | HttpRequest
+    :return: Requested page size, or ``API_PAGE_SIZE`` if missing or
+        invalid, never more than ``API_MAX_PAGE_SIZE``.
+    :rtype: int
+    """
+    try:
+        page_size = int(request.GET['page_size'])
+    except (KeyError, ValueError):
+        return settings.API_PAGE_SIZE
+    return max(1, min(page_size, settings.API_MAX_PAGE_SIZE))
+
+
+def next_page_url(request, next_cursor):
+    """
+    Build the absolute URL of the next page.
+
+    :param request: API request for the current page.
+    :type request: Request | HttpRequest
+    :param next_cursor: Cursor returned by :func:`keyset_page`.
+    :type next_cursor: str | None
+    :return: URL of the next page, or None on the last page.
+    :rtype: str | None
+    """
+    if next_cursor is None:
+        return None
+    return replace_query_param(
+        request.build_absolute_uri(), 'cursor', next_cursor
+    )
@@ -1,3 +1,5 @@
+from django.conf import settings
+from django.db.models.functions import Substr
 from rest_framework import serializers
 from .models import Article
 
@@ -14,7 +16,8 @@ class ArticleSerializer(serializers.ModelSerializer):
         - title: Title of the article
         - content: Full text of the article
         - created_at: Timestamp when the article was created
-        - approved: Boolean indicating whether the article was approved by an editor
+        - approved: Boolean indicating whether the article was approved
+          by an editor
         - journalist: The user who authored the article
         - publisher: The publisher (if any) associated with the article
     """
@@ -29,3 +32,216 @@ class ArticleSerializer(serializers.ModelSerializer):
             'journalist',
             'publisher'
         ]
+
+
+class FastArticleSerializer():
+    """
+    Read-only serializer for article lists with selectable fields.
+
+    Produces the same output as :class:`ArticleSerializer` but builds
+    each dict directly from model attributes instead of going through
+    ModelSerializer's per-field machinery, and only for the fields the
+    client asked for.
+
+    Fields:
+        - Any of ``ArticleSerializer.Meta.fields``.
+        - excerpt: The first ``API_EXCERPT_LENGTH`` characters of the
+          content, cut in the database so ``content`` is never loaded.
+
+    Methods:
+        - parse_fields(): Validate a ``?fields=`` parameter.
+        - select(): Restrict a queryset to the columns the fields need.
+        - serialize(): Serialize loaded articles.
+    """
+    FIELDS = tuple(ArticleSerializer.Meta.fields) + ('excerpt',)
+    DEFAULT_FIELDS = tuple(ArticleSerializer.Meta.fields)
+    # Model columns each output field needs
+    COLUMNS = {
+        'journalist': 'journalist_id',
+        'publisher': 'publisher_id',
+        'excerpt': None,
+    }
+
+    _datetime = serializers.DateTimeField()
+
+    def __init__(self, fields=None):
+        self.fields = tuple(fields or self.DEFAULT_FIELDS)
+
+    @classmethod
+    def parse_fields(cls, value):
+        """
+        Parse a comma separated ``?fields=`` value.
+
+        :param value: Query parameter value, or None for all fields.
+        :type value: str
+        :return: Requested fields in the order given, or the default
+            fields.
+        :rtype: tuple[str]
+        :raises serializers.ValidationError: On unknown field names.
+        """
+        if not value:
+            return cls.DEFAULT_FIELDS
+        fields = tuple(dict.fromkeys(
+            name.strip() for name in value.split(',') if name.strip()
+        ))
+        unknown = [name for name in fields if name not in cls.FIELDS]
+        if unknown or not fields:
+            raise serializers.ValidationError({
+                'fields': "Unknown fields: {}. Choose from: {}.".format(
+                    ', '.join(unknown), ', '.join(cls.FIELDS)
+                )
+            })
+        return fields
+
+    def select(self, queryset):
+        """
+        Load only the columns needed by the selected fields.
+
+        :param queryset: Articles to load.
+        :type queryset: QuerySet
+        :return: Queryset using ``only()`` and, for ``excerpt``, a
+            ``Substr`` annotation computed by the database.
+        :rtype: QuerySet
+        """
+        columns = {'id'} | {
+            self.COLUMNS.get(name, name) for name in self.fields
+        }
+        columns.discard(None)
+        queryset = queryset.only(*columns)
+        if 'excerpt' in self.fields:
+            queryset = queryset.annotate(
+                excerpt=Substr('content', 1, settings.API_EXCERPT_LENGTH)
+            )
+        return queryset
+
+    def serialize(self, articles):
+        """
+        Serialize articles loaded with :meth:`select`.
+
+        :param articles: Articles to serialize.
+        :type articles: Iterable[Article]
+        :return: One dict per article with the selected fields.
+        :rtype: list[dict]
+        """
+        getters = [
+            (name, self.COLUMNS.get(name) or name) for name in self.fields
+        ]
+        to_datetime = self._datetime.to_representation
+        data = []
+        for article in articles:
+            row = {name: getattr(article, attr) for name, attr in getters}
+            if 'created_at' in row:
+                row['created_at'] = to_datetime(row['created_at'])
+            data.append(row)
+        return data
+
+
+class FeedItemSerializer():
+    """
+    Read-only serializer for the merged article and newsletter feed.
+
+    Items of both types share one shape, so clients can render the feed
+    as a single list. Like :class:`FastArticleSerializer` it builds dicts
+    directly from model attributes and never loads full bodies.
+
+    Fields:
+        - type: ``'article'`` or ``'newsletter'``.
+        - id: Primary key within the type.
+        - title: Title of the item.
+        - excerpt: The first ``API_EXCERPT_LENGTH`` characters of the
+          article content or newsletter body.
+        - created_at: Timestamp when the item was created.
+        - journalist: Primary key of the author.
+        - publisher: Primary key of the publisher, if any.
+
+    Methods:
+        - select(): Restrict a queryset to the columns needed.
+        - serialize(): Serialize ``(type, item)`` pairs.
+    """
+    TEXT_FIELDS = {'article': 'content', 'newsletter': 'body'}
+
+    _datetime = serializers.DateTimeField()
+
+    def select(self, kind, queryset):
+        """
+        Load only the columns the feed shows.
+
+        :param kind: ``'article'`` or ``'newsletter'``.
+        :type kind: str
+        :param queryset: Items of that type.
+        :type queryset: QuerySet
+        :return: Queryset with an ``excerpt`` computed by the database.
+        :rtype: QuerySet
+        """
+        return queryset.only(
+            'id', 'title', 'created_at', 'journalist_id', 'publisher_id'
+        ).annotate(excerpt=Substr(
+            self.TEXT_FIELDS[kind], 1, settings.API_EXCERPT_LENGTH
+        ))
+
+    def serialize(self, items):
+        """
+        Serialize items loaded with :meth:`select`.
+
+        :param items: ``(type, item)`` pairs.
+        :type items: Iterable[tuple[str, Model]]
+        :return: One dict per item.
+        :rtype: list[dict]
+        """
+        to_datetime = self._datetime.to_representation
+        return [
+            {
+                'type': kind,
+                'id': item.pk,
+                'title': item.title,
+                'excerpt': item.excerpt,
+                'created_at': to_datetime(item.created_at),
+                'journalist': item.journalist_id,
+                'publisher': item.publisher_id,
+            }
+            for kind, item in items
+        ]
+
+
+class ChangeSerializer(FeedItemSerializer):
+    """
+    Read-only serializer for the change feed.
+
+    Created and updated items have the fields of
+    :class:`FeedItemSerializer` plus ``updated_at`` and
+    ``deleted: false``. Deleted items only carry ``type``, ``id`` and
+    ``deleted: true``.
+
+    Methods:
+        - select(): Restrict a queryset to the columns needed.
+        - serialize(): Serialize ``(deleted, type, item)`` triples.
+    """
+
+    def select(self, kind, queryset):
+        return super().select(kind, queryset).only(
+            'id', 'title', 'created_at', 'updated_at', 'journalist_id',
+            'publisher_id'
+        )
+
+    def serialize(self, changes):
+        """
+        Serialize changes returned by
+        :func:`core.functions.changes.changes`.
+
+        :param changes: ``(deleted, type, item)`` triples; ``item`` is
+            the item's id for deletions.
+        :type changes: Iterable[tuple[bool, str, object]]
+        :return: One dict per change.
+        :rtype: list[dict]
+        """
+        to_datetime = self._datetime.to_representation
+        data = []
+        for deleted, kind, item in changes:
+            if deleted:
+                data.append({'type': kind, 'id': item, 'deleted': True})
+                continue
+            row = super().serialize([(kind, item)])[0]
+            row['updated_at'] = to_datetime(item.updated_at)
+            row['deleted'] = False
+            data.append(row)
+        return data
@@ -1,10 +1,13 @@
-from django.db.models.signals import post_save
+from django.core.signals import request_finished
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_save, pre_delete
+)
 from django.dispatch import receiver
-from django.core.mail import send_mail
-from django.conf import settings
-from .models import Article, Newsletter
-from django.contrib.auth import get_user_model
-from .functions.tweet import Tweet
+from django.utils import timezone
+from .models import (
+    Article, CustomUser, Newsletter, OutboxEvent, Publisher, Tombstone
+)
+from .functions import feed_cache, fragment_cache, outbox, timeline
 
 
 @receiver(post_save, sender=Article)
@@ -12,7 +15,9 @@ def notify_on_approval(sender, instance, created, **kwargs):
     """
     Signal handler triggered when an Article is saved.
 
-    If the article is approved, this function:
+    When the article has just moved from unapproved to approved, this
+    function records an outbox event; later edits of approved articles
+    do not notify subscribers again. The ``run_outbox`` worker then:
     - Sends an email notification with the article to all users subscribed
     to the journalist or publisher.
     - Posts the article content to X (formerly Twitter) using the Tweet
@@ -27,91 +32,363 @@ def notify_on_approval(sender, instance, created, **kwargs):
     :param kwargs: Additional keyword arguments.
     :type kwargs: dict
     """
+    if instance.just_approved:
+        outbox.enqueue(OutboxEvent.KIND_ARTICLE, instance.pk)
+
+
+@receiver(post_save, sender=Newsletter)
+def send_newsletter_to_subscribers(sender, instance, created, **kwargs):
+    """
+    Signal handler that queues a newsletter email when it is approved.
+
+    Only the unapproved to approved transition queues an email, so edits
+    of approved newsletters are not re-sent. The ``run_outbox`` worker
+    later sends the newsletter body to all readers subscribed to the
+    journalist or the selected publisher, if provided.
+
+    :param sender: The model class (Newsletter).
+    :type sender: Model
+    :param instance: The Newsletter instance being saved.
+    :type instance: Newsletter
+    :param created: True if the instance was created, False if updated.
+    :type created: bool
+    :param kwargs: Additional keyword arguments.
+    :type kwargs: dict
+    """
+    if instance.just_approved:
+        outbox.enqueue(OutboxEvent.KIND_NEWSLETTER, instance.pk)
+
+
+def item_kind(sender):
+    """Return the outbox kind of an Article or Newsletter model."""
+    if sender is Article:
+        return OutboxEvent.KIND_ARTICLE
+    return OutboxEvent.KIND_NEWSLETTER
+
+
+def current_values(instance):
+    """Return the tracked fields of an item as they are now."""
+    return {
+        name: getattr(instance, name) for name in instance.TRACKED_FIELDS
+    }
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_save, sender=Newsletter)
+def update_timelines(sender, instance, created, **kwargs):
+    """
+    Signal handler keeping timelines in line with edited items.
+
+    Only active with ``FEED_TIMELINE_ENABLED``. Newly approved items are
+    written by the outbox worker; this handler removes items that were
+    unapproved. Approved items moved to another journalist or publisher
+    leave the old followers' timelines at once, and a ``timeline``
+    outbox event has the worker write them for the new followers. It is
+    registered before :func:`invalidate_feeds` so caches are rebuilt
+    from the updated timelines.
+
+    :param sender: The model class (Article or Newsletter).
+    :type sender: Model
+    :param instance: The item being saved.
+    :type instance: Article | Newsletter
+    :param created: True if the instance was created, False if updated.
+    :type created: bool
+    :param kwargs: Additional keyword arguments.
+    :type kwargs: dict
+    """
+    before = instance.loaded_values
+    if not timeline.enabled() or not before.get('approved'):
+        return
+    now = current_values(instance)
+    if now == before:
+        return
+    timeline.remove_item(item_kind(sender), instance.pk)
     if instance.approved:
-        # Collect all subscribers to the journalist and publisher
-        journalist = instance.journalist
-        publisher = instance.publisher
-
-        # Get emails from both subscriber groups
-        journalist_subs = journalist.followers.all()
-        publisher_subs = (
-            publisher.subscribed_readers.all() if publisher else []
+        outbox.enqueue(
+            OutboxEvent.KIND_TIMELINE,
+            payload={'kind': item_kind(sender), 'id': instance.pk}
         )
 
-        recipients = set()
 
-        for reader in journalist_subs:
-            recipients.add(reader.email)
+@receiver(post_delete, sender=Article)
+@receiver(post_delete, sender=Newsletter)
+def remove_from_timelines(sender, instance, **kwargs):
+    """
+    Signal handler removing deleted items from every timeline.
 
-        for reader in publisher_subs:
-            recipients.add(reader.email)
+    :param sender: The model class (Article or Newsletter).
+    :type sender: Model
+    :param instance: The item being deleted.
+    :type instance: Article | Newsletter
+    :param kwargs: Additional keyword arguments.
+    :type kwargs: dict
+    """
+    if timeline.enabled():
+        timeline.remove_item(item_kind(sender), instance.pk)
 
-        if recipients:
-            subject = f"New Article: {instance.title}"
-            message = instance.content
-            from_email = settings.DEFAULT_FROM_EMAIL
-            send_mail(subject, message, from_email, list(recipients))
 
-        # MOCK sending to X (Twitter)
-        text = f'''📰 Article from {journalist.username}: {instance.title}
-{instance.content}'''
-        try:
-            tweet = Tweet()
-            tweet.make_tweet(text=text)
-        except Exception as e:
-            print(f"Error posting to X: {e}")
+@receiver(post_save, sender=Article)
+@receiver(post_save, sender=Newsletter)
+@receiver(post_delete, sender=Article)
+@receiver(post_delete, sender=Newsletter)
+def invalidate_feeds(sender, instance, **kwargs):
+    """
+    Signal handler invalidating the feeds an item is or was part of.
 
+    Readers' cached feeds change when an approved item is edited or
+    deleted, when an item is approved or unapproved, and for both the
+    old and the new source when an approved item changes journalist or
+    publisher. Saves of drafts leave every feed alone.
 
-User = get_user_model()
+    :param sender: The model class (Article or Newsletter).
+    :type sender: Model
+    :param instance: The item being saved or deleted.
+    :type instance: Article | Newsletter
+    :param kwargs: Additional keyword arguments.
+    :type kwargs: dict
+    """
+    visible = [
+        values for values in (instance.loaded_values,
+                              current_values(instance))
+        if values.get('approved')
+    ]
+    if visible:
+        feed_cache.bump(
+            item_kind(sender),
+            journalist_ids={values['journalist_id'] for values in visible},
+            publisher_ids={values['publisher_id'] for values in visible},
+        )
 
 
+@receiver(post_save, sender=Article)
 @receiver(post_save, sender=Newsletter)
-def send_newsletter_to_subscribers(sender, instance, created, **kwargs):
+@receiver(post_delete, sender=Article)
+@receiver(post_delete, sender=Newsletter)
+def record_tombstones(sender, instance, **kwargs):
     """
-    Signal handler that emails a newsletter when it is approved.
+    Signal handler recording approved items that leave readers' feeds.
 
-    Sends the newsletter body to all readers subscribed to the journalist
-    or the selected publisher, if provided.
+    A tombstone is written for the item's old journalist and publisher
+    when an approved item is deleted, unapproved or moved to another
+    source, so the change feed can report the removal.
 
-    :param sender: The model class (Newsletter).
+    :param sender: The model class (Article or Newsletter).
     :type sender: Model
-    :param instance: The Newsletter instance being saved.
-    :type instance: Newsletter
-    :param approved: True if the instance is approved.
-    :type approved: bool
+    :param instance: The item being saved or deleted.
+    :type instance: Article | Newsletter
     :param kwargs: Additional keyword arguments.
     :type kwargs: dict
     """
-    if instance.approved:
-        journalist = instance.journalist
-        publisher = instance.publisher
+    before = instance.loaded_values or current_values(instance)
+    if not before.get('approved'):
+        return
+    if 'created' in kwargs and current_values(instance) == before:
+        return
+    Tombstone.objects.create(
+        kind=item_kind(sender),
+        object_id=instance.pk,
+        journalist_id=before['journalist_id'],
+        publisher_id=before['publisher_id']
+    )
+
+
+def touch_subscriptions(reader_ids):
+    """
+    Record that the subscriptions of some readers changed.
+
+    Stamps ``subscriptions_changed_at`` and drops the readers' cached
+    subscriptions, which invalidates their cached feeds.
+
+    :param reader_ids: Primary keys of the affected readers.
+    :type reader_ids: Iterable[int]
+    """
+    reader_ids = list(reader_ids)
+    CustomUser.objects.filter(pk__in=reader_ids).update(
+        subscriptions_changed_at=timezone.now()
+    )
+    feed_cache.forget_subscriptions(reader_ids)
 
-        # Readers subscribed to the journalist
-        journalist_subs = User.objects.filter(
-            subscribed_journalists=journalist
+
+def sync_timelines(reader_ids, action, journalist_ids=(), publisher_ids=()):
+    """
+    Backfill or trim timelines after a subscription change, if enabled.
+
+    :param reader_ids: Readers whose subscriptions changed.
+    :type reader_ids: Iterable[int]
+    :param action: The m2m_changed action that happened.
+    :type action: str
+    :param journalist_ids: Journalists followed or unfollowed. ``None``
+        when all were unfollowed.
+    :type journalist_ids: Iterable[int] | None
+    :param publisher_ids: Publishers followed or unfollowed. ``None``
+        when all were unfollowed.
+    :type publisher_ids: Iterable[int] | None
+    """
+    if not timeline.enabled():
+        return
+    if action != 'post_add':
+        timeline.trim(reader_ids, journalist_ids, publisher_ids)
+        return
+    for reader_id in reader_ids:
+        timeline.backfill(reader_id, journalist_ids, publisher_ids)
+
+
+@receiver(m2m_changed, sender=CustomUser.subscribed_publishers.through)
+@receiver(m2m_changed, sender=CustomUser.subscribed_journalists.through)
+def subscriptions_changed(sender, instance, action, reverse, pk_set,
+                          **kwargs):
+    """
+    Signal handler for changes to readers' subscriptions.
+
+    Handles changes made from either side of the relation, e.g.
+    ``reader.subscribed_publishers.add()`` as well as
+    ``publisher.subscribed_readers.clear()``: readers' timelines are
+    backfilled or trimmed (with ``FEED_TIMELINE_ENABLED``), then their
+    ``subscriptions_changed_at`` is stamped so the feed validator and
+    cache change whenever the feed's sources do.
+
+    :param sender: The subscription through model.
+    :type sender: Model
+    :param instance: The reader, or the followed publisher/journalist
+        when ``reverse`` is True.
+    :type instance: Model
+    :param action: The m2m_changed action.
+    :type action: str
+    :param reverse: True if the change was made from the followed side.
+    :type reverse: bool
+    :param pk_set: Primary keys added or removed.
+    :type pk_set: set
+    :param kwargs: Additional keyword arguments.
+    :type kwargs: dict
+    """
+    publishers = sender is CustomUser.subscribed_publishers.through
+
+    if action == 'pre_clear' and reverse:
+        # The readers are only known before the rows are removed
+        related = (
+            instance.subscribed_readers if publishers else instance.followers
+        )
+        instance._cleared_readers = list(
+            related.values_list('pk', flat=True)
         )
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if reverse:
+        readers = (
+            instance.__dict__.pop('_cleared_readers', [])
+            if action == 'post_clear' else pk_set
+        )
+        sources = [instance.pk]
+    else:
+        readers = [instance.pk]
+        sources = None if action == 'post_clear' else pk_set
+        instance.subscriptions_changed_at = timezone.now()
+    if not readers:
+        return
+
+    if publishers:
+        sync_timelines(readers, action, publisher_ids=sources)
+    else:
+        sync_timelines(readers, action, journalist_ids=sources)
+    touch_subscriptions(readers)
+
+
+@receiver(pre_delete, sender=Publisher)
+def publisher_deleting(sender, instance, **kwargs):
+    """
+    Signal handler remembering the subscribers of a publisher.
+
+    Deleting a publisher removes its subscriptions without sending
+    ``m2m_changed``, so :func:`publisher_deleted` updates them.
+
+    :param sender: The model class (Publisher).
+    :type sender: Model
+    :param instance: The Publisher being deleted.
+    :type instance: Publisher
+    :param kwargs: Additional keyword arguments.
+    :type kwargs: dict
+    """
+    instance._cleared_readers = list(
+        instance.subscribed_readers.values_list('pk', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Publisher)
+def publisher_deleted(sender, instance, **kwargs):
+    """
+    Signal handler updating the former subscribers of a publisher.
+
+    :param sender: The model class (Publisher).
+    :type sender: Model
+    :param instance: The deleted Publisher.
+    :type instance: Publisher
+    :param kwargs: Additional keyword arguments.
+    :type kwargs: dict
+    """
+    readers = instance.__dict__.pop('_cleared_readers', [])
+    sync_timelines(readers, 'post_remove', publisher_ids=None)
+    touch_subscriptions(readers)
 
-        # Readers subscribed to the publisher (if any)
-        if publisher:
-            publisher_subs = User.objects.filter(
-                subscribed_publishers=publisher
-            )
-        else:
-            publisher_subs = User.objects.none()
-
-        # Combine and deduplicate readers
-        all_readers = (journalist_subs | publisher_subs).distinct()
-
-        subject = f"📰 Newsletter from {journalist.username}: {instance.title}"
-        message = instance.body
-        from_email = settings.DEFAULT_FROM_EMAIL
-
-        for reader in all_readers:
-            if reader.email:
-                send_mail(
-                    subject,
-                    message,
-                    from_email,
-                    [reader.email],
-                    fail_silently=True
-                )
+
+@receiver(post_save, sender=Article)
+@receiver(post_save, sender=Newsletter)
+@receiver(post_delete, sender=Article)
+@receiver(post_delete, sender=Newsletter)
+def invalidate_item_fragments(sender, instance, **kwargs):
+    """
+    Signal handler invalidating rendered fragments of an item.
+
+    Bumps the item's version and the version of every list of its kind,
+    so cached cards, detail bodies and list sections are rendered again.
+
+    :param sender: The model class (Article or Newsletter).
+    :type sender: Model
+    :param instance: The item being saved or deleted.
+    :type instance: Article | Newsletter
+    :param kwargs: Additional keyword arguments.
+    :type kwargs: dict
+    """
+    fragment_cache.bump([
+        fragment_cache.object_ref(instance),
+        fragment_cache.list_ref(item_kind(sender)),
+    ])
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_save, sender=Publisher)
+@receiver(post_delete, sender=CustomUser)
+@receiver(post_delete, sender=Publisher)
+def invalidate_source_fragments(sender, instance, **kwargs):
+    """
+    Signal handler invalidating fragments that show a journalist's or
+    publisher's name.
+
+    Saves limited to other fields, such as the ``last_login`` update on
+    every login, leave fragments alone.
+
+    :param sender: The model class (CustomUser or Publisher).
+    :type sender: Model
+    :param instance: The user or publisher being saved or deleted.
+    :type instance: CustomUser | Publisher
+    :param kwargs: Additional keyword arguments.
+    :type kwargs: dict
+    """
+    update_fields = kwargs.get('update_fields')
+    if update_fields and not update_fields & {'username', 'name'}:
+        return
+    fragment_cache.bump([
+        fragment_cache.object_ref(instance),
+        *(fragment_cache.list_ref(kind) for kind in feed_cache.KINDS),
+    ])
+
+
+@receiver(request_finished)
+def flush_feed_cache_stats(sender, **kwargs):
+    """
+    Add this process's feed cache hit and miss counts to the shared
+    counters once the response has been sent, at most once every
+    ``FEED_CACHE_STATS_INTERVAL`` seconds.
+    """
+    feed_cache.flush_stats()
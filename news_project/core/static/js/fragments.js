@@ -0,0 +1,24 @@
+// Replace links marked with data-fragment by the HTML they point to.
+// Used by the editor dashboard to page through moderation sections.
+document.addEventListener('click', function (event) {
+    var link = event.target.closest('a[data-fragment]');
+    if (!link) {
+        return;
+    }
+    event.preventDefault();
+    link.classList.add('disabled');
+    fetch(link.href, {credentials: 'same-origin'})
+        .then(function (response) {
+            if (!response.ok) {
+                throw new Error(response.statusText);
+            }
+            return response.text();
+        })
+        .then(function (html) {
+            link.insertAdjacentHTML('afterend', html);
+            link.remove();
+        })
+        .catch(function () {
+            link.classList.remove('disabled');
+        });
+});
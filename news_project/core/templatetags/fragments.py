@@ -0,0 +1,58 @@
+from django import template
+
+from core.functions import fragment_cache
+
+
+register = template.Library()
+
+
+class FragmentNode(template.Node):
+    def __init__(self, nodelist, name, args):
+        self.nodelist = nodelist
+        self.name = name
+        self.args = args
+
+    def render(self, context):
+        refs, vary = fragment_cache.split_args(
+            arg.resolve(context) for arg in self.args
+        )
+        key = fragment_cache.fragment_key(
+            self.name.resolve(context), refs, vary
+        )
+        html = fragment_cache.get_fragment(key)
+        if html is None:
+            html = self.nodelist.render(context)
+            fragment_cache.set_fragment(key, html)
+        return html
+
+
+@register.tag
+def fragment(parser, token):
+    """
+    Cache the enclosed template fragment across users.
+
+    Usage::
+
+        {% load fragments %}
+        {% fragment 'article-detail' article %}
+            ...
+        {% endfragment %}
+
+    The first argument names the fragment. Model instances, and lists or
+    querysets of them, key the fragment on their version tokens, which
+    are bumped whenever they are saved or deleted; any other argument is
+    added to the key as is. The enclosed content must not depend on the
+    user, e.g. it must not contain ``{% csrf_token %}``.
+    """
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(
+            f"'{bits[0]}' tag requires at least one argument."
+        )
+    nodelist = parser.parse(('endfragment',))
+    parser.delete_first_token()
+    return FragmentNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        [parser.compile_filter(bit) for bit in bits[2:]]
+    )
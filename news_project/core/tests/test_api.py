@@ -1,11 +1,25 @@
-from django.test import TestCase
+import json
+import re
+from datetime import timedelta
+from urllib.parse import parse_qs, urlparse
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django.utils.http import parse_http_date
 from django.urls import reverse
 from rest_framework.test import APIClient
-from core.models import CustomUser, Publisher, Article
+from core.functions import feed_cache
+from core.models import CustomUser, Publisher, Article, Newsletter
+from core.serializers import ArticleSerializer
+from core.tests.utils import CaptureCacheCalls
 
 
 class SubscribedArticlesAPITest(TestCase):
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
 
         # Create users
@@ -46,11 +60,362 @@ class SubscribedArticlesAPITest(TestCase):
         url = reverse('subscribed_articles_api')
         response = self.client.get(url)
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['title'], 'Exclusive: AI Update')
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(
+            response.data['results'][0]['title'], 'Exclusive: AI Update'
+        )
+        self.assertIsNone(response.data['next'])
 
     def test_non_reader_user_cannot_access_endpoint(self):
         self.client.login(username='journalist', password='testpass')
         url = reverse('subscribed_articles_api')
         response = self.client.get(url)
         self.assertEqual(response.status_code, 403)
+
+
+@override_settings(API_PAGE_SIZE=2, API_MAX_PAGE_SIZE=3)
+class SubscribedArticlesPaginationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.reader = CustomUser.objects.create_user(
+            username='reader', password='testpass', role='reader'
+        )
+        journalist = CustomUser.objects.create_user(
+            username='journalist', password='testpass', role='journalist'
+        )
+        publisher = Publisher.objects.create(name='Tech News')
+        self.reader.subscribed_journalists.add(journalist)
+        self.reader.subscribed_publishers.add(publisher)
+
+        # Two articles share a timestamp to exercise the id tie-breaker
+        now = timezone.now()
+        stamps = [now, now, now - timedelta(minutes=1),
+                  now - timedelta(minutes=2), now - timedelta(minutes=3)]
+        self.articles = []
+        for i, stamp in enumerate(stamps):
+            article = Article.objects.create(
+                title=f'Article {i}', content='Body',
+                journalist=journalist, publisher=publisher, approved=True
+            )
+            Article.objects.filter(pk=article.pk).update(created_at=stamp)
+            self.articles.append(article)
+        Article.objects.create(
+            title='Pending', content='Body',
+            journalist=journalist, publisher=publisher
+        )
+        self.client.login(username='reader', password='testpass')
+        self.url = reverse('subscribed_articles_api')
+
+    def test_pages_cover_every_article_once_newest_first(self):
+        titles = []
+        url = self.url
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data['results']), 2)
+            titles += [a['title'] for a in response.data['results']]
+            url = response.data['next']
+
+        expected = ['Article 1', 'Article 0', 'Article 2', 'Article 3',
+                    'Article 4']
+        self.assertEqual(titles, expected)
+
+    def test_new_articles_do_not_shift_later_pages(self):
+        first = self.client.get(self.url)
+        Article.objects.create(
+            title='Breaking', content='Body',
+            journalist=self.articles[0].journalist, approved=True
+        )
+        second = self.client.get(first.data['next'])
+        self.assertEqual(
+            [a['title'] for a in second.data['results']],
+            ['Article 2', 'Article 3']
+        )
+
+    def test_page_size_is_capped(self):
+        response = self.client.get(self.url, {'page_size': 50})
+        self.assertEqual(len(response.data['results']), 3)
+        response = self.client.get(self.url, {'page_size': 'x'})
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(self.url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_page_query_cost_does_not_depend_on_depth(self):
+        url = self.url
+        while url:
+            response = self.client.get(url)
+            url = response.data['next']
+            if url:
+                last_cursor = parse_qs(urlparse(url).query)['cursor'][0]
+        with self.assertNumQueries(3):
+            self.client.get(self.url)
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, {'cursor': last_cursor})
+        self.assertEqual(response.status_code, 200)
+
+
+class SubscribedArticlesConditionalGetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        # Keep the periodic stats flush out of the measured requests
+        feed_cache.flush_stats(force=True)
+        self.client = APIClient()
+        self.reader = CustomUser.objects.create_user(
+            username='reader', password='testpass', role='reader'
+        )
+        self.journalist = CustomUser.objects.create_user(
+            username='journalist', password='testpass', role='journalist'
+        )
+        self.publisher = Publisher.objects.create(name='Tech News')
+        self.reader.subscribed_journalists.add(self.journalist)
+        self.article = Article.objects.create(
+            title='First', content='Body',
+            journalist=self.journalist, approved=True
+        )
+        self.client.login(username='reader', password='testpass')
+        self.url = reverse('subscribed_articles_api')
+
+    def revalidate(self, etag):
+        return self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+    def count_revalidation(self, etag):
+        with CaptureQueriesContext(connection) as queries, \
+                CaptureCacheCalls() as calls:
+            response = self.revalidate(etag)
+        self.assertEqual(response.status_code, 304)
+        return len(queries), calls
+
+    def test_unchanged_feed_is_not_modified_without_article_query(self):
+        etag = self.client.get(self.url)['ETag']
+        # Session and user only; the validators come from the feed cache
+        queries, calls = self.count_revalidation(etag)
+        self.assertEqual(queries, 2)
+        # Subscriptions, version tokens and the entry, all reads
+        self.assertEqual(calls.calls, ['get', 'get_many', 'get'])
+
+    def test_not_modified_after_eviction_writes_nothing(self):
+        etag = self.client.get(self.url)['ETag']
+        cache.clear()
+        # The validators are aggregated and the entry is not rebuilt
+        queries, calls = self.count_revalidation(etag)
+        self.assertEqual(queries, 4)
+        self.assertEqual(calls.writes, [])
+
+    def test_last_modified_is_honoured(self):
+        last_modified = self.client.get(self.url)['Last-Modified']
+        response = self.client.get(
+            self.url, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_removal_moves_last_modified_forward(self):
+        newest = Article.objects.create(
+            title='Second', content='Body',
+            journalist=self.journalist, approved=True
+        )
+        # Backdate the feed so the removal lands in a later second
+        an_hour_ago = timezone.now() - timedelta(hours=1)
+        Article.objects.update(updated_at=an_hour_ago)
+        CustomUser.objects.update(subscriptions_changed_at=an_hour_ago)
+        cache.clear()
+        last_modified = self.client.get(self.url)['Last-Modified']
+
+        newest.delete()
+        response = self.client.get(
+            self.url, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(
+            parse_http_date(response['Last-Modified']),
+            parse_http_date(last_modified)
+        )
+
+    def test_new_approved_article_changes_validator(self):
+        etag = self.client.get(self.url)['ETag']
+        Article.objects.create(
+            title='Second', content='Body',
+            journalist=self.journalist, approved=True
+        )
+        self.assertEqual(self.revalidate(etag).status_code, 200)
+
+    def test_pending_article_does_not_change_validator(self):
+        etag = self.client.get(self.url)['ETag']
+        Article.objects.create(
+            title='Draft', content='Body', journalist=self.journalist
+        )
+        self.assertEqual(self.revalidate(etag).status_code, 304)
+
+    def test_edit_and_delete_change_validator(self):
+        etag = self.client.get(self.url)['ETag']
+        self.article.title = 'First (updated)'
+        self.article.save()
+        response = self.revalidate(etag)
+        self.assertEqual(response.status_code, 200)
+
+        self.article.delete()
+        self.assertEqual(self.revalidate(response['ETag']).status_code, 200)
+
+    def test_subscription_changes_change_validator(self):
+        etag = self.client.get(self.url)['ETag']
+        self.reader.subscribed_publishers.add(self.publisher)
+        response = self.revalidate(etag)
+        self.assertEqual(response.status_code, 200)
+
+        # Changes made from the publisher's side count too
+        self.publisher.subscribed_readers.clear()
+        self.assertEqual(self.revalidate(response['ETag']).status_code, 200)
+
+    def test_pages_have_distinct_validators(self):
+        first = self.client.get(self.url)
+        other = self.client.get(
+            self.url, {'page_size': 1}, HTTP_IF_NONE_MATCH=first['ETag']
+        )
+        self.assertEqual(other.status_code, 200)
+
+
+@override_settings(API_EXCERPT_LENGTH=10)
+class SubscribedArticlesFieldsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        reader = CustomUser.objects.create_user(
+            username='reader', password='testpass', role='reader'
+        )
+        journalist = CustomUser.objects.create_user(
+            username='journalist', password='testpass', role='journalist'
+        )
+        self.publisher = Publisher.objects.create(name='Tech News')
+        reader.subscribed_journalists.add(journalist)
+        self.article = Article.objects.create(
+            title='Long read', content='0123456789' * 100,
+            journalist=journalist, publisher=self.publisher, approved=True
+        )
+        self.client.login(username='reader', password='testpass')
+        self.url = reverse('subscribed_articles_api')
+
+    def test_default_output_matches_model_serializer(self):
+        response = self.client.get(self.url)
+        expected = ArticleSerializer(self.article).data
+        self.assertEqual(
+            json.loads(response.content)['results'],
+            [json.loads(json.dumps(expected))]
+        )
+
+    def test_fields_selects_keys(self):
+        response = self.client.get(
+            self.url, {'fields': 'id,title,journalist,created_at'}
+        )
+        self.assertEqual(
+            list(response.data['results'][0]),
+            ['id', 'title', 'journalist', 'created_at']
+        )
+
+    def test_excerpt_never_loads_content(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                self.url, {'fields': 'title,excerpt'}
+            )
+        self.assertEqual(
+            response.data['results'],
+            [{'title': 'Long read', 'excerpt': '0123456789'}]
+        )
+        article_queries = [
+            q['sql'] for q in queries.captured_queries
+            if 'FROM "core_article"' in q['sql']
+        ]
+        self.assertTrue(article_queries)
+        for sql in article_queries:
+            # Only the database-side SUBSTR may touch the content column
+            sql = re.sub(r'SUBSTR\([^)]*\)', '', sql)
+            self.assertNotIn('"core_article"."content"', sql)
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get(self.url, {'fields': 'title,password'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('password', str(response.data['fields']))
+
+
+class SubscribedFeedAPITest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.reader = CustomUser.objects.create_user(
+            username='reader', password='testpass', role='reader'
+        )
+        journalist = CustomUser.objects.create_user(
+            username='journalist', password='testpass', role='journalist'
+        )
+        publisher = Publisher.objects.create(name='Tech News')
+        self.reader.subscribed_journalists.add(journalist)
+        self.reader.subscribed_publishers.add(publisher)
+
+        now = timezone.now()
+        minutes = {
+            ('article', 'A1'): 10, ('newsletter', 'N1'): 9,
+            ('newsletter', 'N2'): 8, ('article', 'A2'): 8,
+            ('article', 'A3'): 5, ('newsletter', 'N3'): 1,
+        }
+        for (kind, title), minute in minutes.items():
+            if kind == 'article':
+                model, fields = Article, {'content': 'Body of ' + title}
+            else:
+                model, fields = Newsletter, {'body': 'Body of ' + title}
+            item = model.objects.create(
+                title=title, journalist=journalist, approved=True,
+                publisher=publisher if title.endswith('2') else None,
+                **fields
+            )
+            model.objects.filter(pk=item.pk).update(
+                created_at=now - timedelta(minutes=60 - minute)
+            )
+        Article.objects.create(
+            title='Draft', content='Body', journalist=journalist
+        )
+        self.client.login(username='reader', password='testpass')
+        self.url = reverse('subscribed_feed_api')
+
+    def walk(self, page_size):
+        titles, url = [], self.url
+        params = {'page_size': page_size}
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data['results']), page_size)
+            titles += [item['title'] for item in response.data['results']]
+            url, params = response.data['next'], None
+        return titles
+
+    def test_items_are_interleaved_newest_first(self):
+        # N2 and A2 share a timestamp; ties are broken by type
+        expected = ['A1', 'N1', 'N2', 'A2', 'A3', 'N3']
+        for page_size in (1, 2, 4, 10):
+            self.assertEqual(self.walk(page_size), expected)
+
+    def test_pages_beyond_the_cache_use_keyset_queries(self):
+        with self.settings(FEED_CACHE_SIZE=1):
+            self.assertEqual(
+                self.walk(2), ['A1', 'N1', 'N2', 'A2', 'A3', 'N3']
+            )
+
+    @override_settings(API_EXCERPT_LENGTH=4)
+    def test_item_shape(self):
+        item = self.client.get(self.url).data['results'][0]
+        self.assertEqual(
+            sorted(item),
+            ['created_at', 'excerpt', 'id', 'journalist', 'publisher',
+             'title', 'type']
+        )
+        self.assertEqual((item['type'], item['excerpt']),
+                         ('article', 'Body'))
+
+    def test_invalid_cursor_and_non_readers_are_rejected(self):
+        response = self.client.get(self.url, {'cursor': 'bogus'})
+        self.assertEqual(response.status_code, 400)
+        CustomUser.objects.create_user(
+            username='editor', password='testpass', role='editor'
+        )
+        self.client.login(username='editor', password='testpass')
+        self.assertEqual(self.client.get(self.url).status_code, 403)
@@ -0,0 +1,140 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from django.urls import reverse
+from core.models import CustomUser, Publisher, Article, Newsletter
+
+
+class AsyncAPITest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.reader = CustomUser.objects.create_user(
+            username='reader',
+            password='testpass',
+            role='reader'
+        )
+        self.journalist = CustomUser.objects.create_user(
+            username='journalist',
+            password='testpass',
+            role='journalist'
+        )
+        self.publisher = Publisher.objects.create(name='Tech News')
+        self.reader.subscribed_journalists.add(self.journalist)
+
+        now = timezone.now()
+        self.articles = []
+        for i in range(3):
+            article = Article.objects.create(
+                title=f'Story {i}',
+                content='Some content',
+                journalist=self.journalist,
+                publisher=self.publisher,
+                approved=True
+            )
+            Article.objects.filter(pk=article.pk).update(
+                created_at=now - timedelta(minutes=i)
+            )
+            self.articles.append(article)
+        self.pending = Article.objects.create(
+            title='Pending',
+            content='Not yet',
+            journalist=self.journalist
+        )
+        self.newsletter = Newsletter.objects.create(
+            title='Weekly',
+            body='Newsletter body',
+            journalist=self.journalist,
+            approved=True
+        )
+
+    async def test_articles(self):
+        await self.async_client.aforce_login(self.reader)
+        response = await self.async_client.get(
+            reverse('async_subscribed_articles_api'), {'page_size': 2}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(
+            [item['title'] for item in data['results']],
+            ['Story 0', 'Story 1']
+        )
+        self.assertIn('cursor=', data['next'])
+        self.assertEqual(set(data['results'][0]), {
+            'id', 'title', 'content', 'created_at', 'approved',
+            'journalist', 'publisher'
+        })
+
+    async def test_next_page_and_conditional_get(self):
+        await self.async_client.aforce_login(self.reader)
+        url = reverse('async_subscribed_articles_api')
+        first = await self.async_client.get(
+            url, {'page_size': 2, 'fields': 'id,title'}
+        )
+        second = await self.async_client.get(first.json()['next'])
+
+        self.assertEqual(
+            second.json()['results'],
+            [{'id': self.articles[2].pk, 'title': 'Story 2'}]
+        )
+        self.assertIsNone(second.json()['next'])
+
+        not_modified = await self.async_client.get(
+            url, {'page_size': 2, 'fields': 'id,title'},
+            headers={'if-none-match': first['ETag']}
+        )
+        self.assertEqual(not_modified.status_code, 304)
+
+    async def test_errors(self):
+        url = reverse('async_subscribed_articles_api')
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 403)
+
+        await self.async_client.aforce_login(self.reader)
+        response = await self.async_client.get(url, {'fields': 'secret'})
+        self.assertEqual(response.status_code, 400)
+        response = await self.async_client.get(url, {'cursor': 'bad'})
+        self.assertEqual(response.status_code, 400)
+
+        await self.async_client.aforce_login(self.journalist)
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 403)
+
+    async def test_merged_feed(self):
+        await self.async_client.aforce_login(self.reader)
+        response = await self.async_client.get(
+            reverse('async_subscribed_feed_api')
+        )
+
+        results = response.json()['results']
+        self.assertEqual(results[0]['type'], 'newsletter')
+        self.assertEqual(
+            [item['title'] for item in results[1:]],
+            ['Story 0', 'Story 1', 'Story 2']
+        )
+
+    async def test_detail_views(self):
+        await self.async_client.aforce_login(self.reader)
+        response = await self.async_client.get(
+            reverse('async_article_detail_api', args=[self.articles[0].pk])
+        )
+        self.assertEqual(response.json()['title'], 'Story 0')
+
+        response = await self.async_client.get(
+            reverse('async_newsletter_detail_api', args=[self.newsletter.pk])
+        )
+        self.assertEqual(response.json()['body'], 'Newsletter body')
+
+        # Readers never see pending content
+        response = await self.async_client.get(
+            reverse('async_article_detail_api', args=[self.pending.pk])
+        )
+        self.assertEqual(response.status_code, 404)
+
+        await self.async_client.aforce_login(self.journalist)
+        response = await self.async_client.get(
+            reverse('async_article_detail_api', args=[self.pending.pk])
+        )
+        self.assertEqual(response.json()['approved'], False)
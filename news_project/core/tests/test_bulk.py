@@ -0,0 +1,178 @@
+from django.core import mail
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from core.functions import moderation, outbox
+from core.models import (
+    CustomUser, Publisher, Article, Newsletter, OutboxEvent, SocialPost
+)
+
+
+class BulkModerationTest(TestCase):
+    def setUp(self):
+        self.journalist = CustomUser.objects.create_user(
+            username='journalist',
+            password='testpass',
+            role='journalist'
+        )
+        self.other = CustomUser.objects.create_user(
+            username='other',
+            password='testpass',
+            role='journalist'
+        )
+        self.editor = CustomUser.objects.create_user(
+            username='editor',
+            password='testpass',
+            role='editor'
+        )
+        self.publisher = Publisher.objects.create(name='Tech News')
+        self.fan = CustomUser.objects.create_user(
+            username='fan',
+            email='fan@example.com',
+            password='testpass',
+            role='reader'
+        )
+        self.fan.subscribed_journalists.add(self.journalist)
+        self.fan.subscribed_publishers.add(self.publisher)
+        self.casual = CustomUser.objects.create_user(
+            username='casual',
+            email='casual@example.com',
+            password='testpass',
+            role='reader'
+        )
+        self.casual.subscribed_journalists.add(self.other)
+
+        self.articles = [
+            Article.objects.create(
+                title=f'Story {i}',
+                content='Some content',
+                journalist=self.journalist
+            )
+            for i in range(3)
+        ]
+        self.newsletter = Newsletter.objects.create(
+            title='Weekly',
+            body='Newsletter body',
+            journalist=self.other,
+            publisher=self.publisher
+        )
+
+    def approve_all(self):
+        return moderation.approve_items(
+            [article.pk for article in self.articles], [self.newsletter.pk]
+        )
+
+    def test_approval_updates_each_model_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.approve_all()
+
+        updates = [
+            query['sql'] for query in queries.captured_queries
+            if query['sql'].startswith('UPDATE')
+        ]
+        self.assertEqual(len(updates), 2)
+        self.assertEqual(
+            Article.objects.filter(
+                approved=True, approved_at__isnull=False
+            ).count(),
+            3
+        )
+        self.assertTrue(
+            Newsletter.objects.get(pk=self.newsletter.pk).approved
+        )
+
+    def test_approval_records_one_outbox_event(self):
+        approved = self.approve_all()
+
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.kind, OutboxEvent.KIND_BULK)
+        self.assertEqual(event.payload, approved)
+        self.assertEqual(
+            sorted(event.payload['article']),
+            [article.pk for article in self.articles]
+        )
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_already_approved_items_are_skipped(self):
+        self.articles[0].approved = True
+        self.articles[0].save()
+        OutboxEvent.objects.all().delete()
+
+        approved = self.approve_all()
+
+        self.assertNotIn(self.articles[0].pk, approved['article'])
+        self.assertEqual(moderation.approve_items([self.articles[0].pk]), {})
+        self.assertEqual(OutboxEvent.objects.count(), 1)
+
+    def test_delivery_sends_one_email_per_reader(self):
+        self.approve_all()
+
+        self.assertEqual(outbox.drain(workers=1), 1)
+
+        self.assertEqual(OutboxEvent.objects.get().status,
+                         OutboxEvent.STATUS_DONE)
+        emails = {message.to[0]: message for message in mail.outbox}
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(
+            emails['fan@example.com'].subject,
+            '4 new items from your subscriptions'
+        )
+        self.assertIn('Story 2', emails['fan@example.com'].body)
+        self.assertIn('Weekly', emails['fan@example.com'].body)
+        # A reader following a single item gets the usual message
+        self.assertEqual(
+            emails['casual@example.com'].subject,
+            '📰 Newsletter from other: Weekly'
+        )
+        self.assertEqual(SocialPost.objects.count(), 3)
+
+    def test_retried_delivery_does_not_resend(self):
+        self.approve_all()
+        outbox.drain(workers=1)
+        event = OutboxEvent.objects.get()
+        event.status = OutboxEvent.STATUS_PENDING
+        event.save()
+
+        outbox.drain(workers=1)
+
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(SocialPost.objects.count(), 3)
+
+    def test_rejection_deletes_pending_items_only(self):
+        self.articles[0].approved = True
+        self.articles[0].save()
+
+        rejected = moderation.reject_items(
+            [article.pk for article in self.articles]
+        )
+
+        self.assertEqual(rejected, {'article': 2})
+        self.assertEqual(
+            list(Article.objects.values_list('pk', flat=True)),
+            [self.articles[0].pk]
+        )
+
+    def test_dashboard_action(self):
+        self.client.login(username='editor', password='testpass')
+        response = self.client.post(reverse('bulk_moderate'), {
+            'action': 'approve',
+            'articles': [self.articles[0].pk, self.articles[1].pk],
+        })
+
+        self.assertRedirects(
+            response, '/dashboard/', fetch_redirect_response=False
+        )
+        self.assertEqual(Article.objects.filter(approved=True).count(), 2)
+        self.assertEqual(
+            OutboxEvent.objects.get().kind, OutboxEvent.KIND_BULK
+        )
+
+    def test_dashboard_action_requires_editor(self):
+        self.client.login(username='journalist', password='testpass')
+        self.client.post(reverse('bulk_moderate'), {
+            'action': 'approve',
+            'articles': [self.articles[0].pk],
+        })
+
+        self.assertFalse(Article.objects.filter(approved=True).exists())
@@ -0,0 +1,181 @@
+from datetime import timedelta
+from urllib.parse import parse_qs, urlparse
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from django.urls import reverse
+from rest_framework.test import APIClient
+from core.functions import changes
+from core.models import (
+    CustomUser, Publisher, Article, Newsletter, Tombstone
+)
+
+
+@override_settings(SYNC_LAG_SECONDS=0)
+class ChangeFeedTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.reader = CustomUser.objects.create_user(
+            username='reader',
+            password='testpass',
+            role='reader'
+        )
+        self.journalist = CustomUser.objects.create_user(
+            username='journalist',
+            password='testpass',
+            role='journalist'
+        )
+        self.other = CustomUser.objects.create_user(
+            username='other',
+            password='testpass',
+            role='journalist'
+        )
+        self.publisher = Publisher.objects.create(name='Tech News')
+        self.reader.subscribed_journalists.add(self.journalist)
+        self.reader.subscribed_publishers.add(self.publisher)
+
+        self.articles = [
+            Article.objects.create(
+                title=f'Story {i}',
+                content='Some content',
+                journalist=self.journalist,
+                approved=True
+            )
+            for i in range(3)
+        ]
+        self.newsletter = Newsletter.objects.create(
+            title='Weekly',
+            body='Newsletter body',
+            journalist=self.journalist,
+            approved=True
+        )
+        # Subscriptions were set up before the first sync
+        CustomUser.objects.filter(pk=self.reader.pk).update(
+            subscriptions_changed_at=timezone.now() - timedelta(hours=1)
+        )
+        self.client.login(username='reader', password='testpass')
+
+    def sync(self, since=None, **params):
+        if since:
+            params['since'] = since
+        return self.client.get(reverse('subscribed_changes_api'), params)
+
+    def full_sync(self, since=None):
+        """Follow ``next`` until caught up; return results and cursor."""
+        results = []
+        while True:
+            data = self.sync(since, page_size=2).json()
+            results += data['results']
+            since = data['since']
+            if not data['more']:
+                return results, since
+            self.assertEqual(
+                parse_qs(urlparse(data['next']).query)['since'], [since]
+            )
+
+    def test_initial_sync_returns_whole_feed(self):
+        results, _ = self.full_sync()
+
+        self.assertEqual(
+            [(item['type'], item['id']) for item in results],
+            [('article', article.pk) for article in self.articles] +
+            [('newsletter', self.newsletter.pk)]
+        )
+        self.assertFalse(any(item['deleted'] for item in results))
+        self.assertIn('updated_at', results[0])
+
+    def test_incremental_sync_returns_only_changes(self):
+        _, since = self.full_sync()
+        self.assertEqual(self.sync(since).json()['results'], [])
+
+        self.articles[0].title = 'Edited'
+        self.articles[0].save()
+        deleted_pk = self.articles[1].pk
+        self.articles[1].delete()
+        Article.objects.create(
+            title='Unfollowed', content='x', journalist=self.other,
+            approved=True
+        )
+        self.newsletter.approved = False
+        self.newsletter.save()
+
+        results, since = self.full_sync(since)
+
+        self.assertEqual(results, [
+            {
+                **results[0], 'type': 'article', 'id': self.articles[0].pk,
+                'title': 'Edited', 'deleted': False
+            },
+            {'type': 'article', 'id': deleted_pk, 'deleted': True},
+            {'type': 'newsletter', 'id': self.newsletter.pk,
+             'deleted': True},
+        ])
+        self.assertEqual(self.sync(since).json()['results'], [])
+
+    def test_moving_away_from_followed_source_is_a_deletion(self):
+        article = Article.objects.create(
+            title='Published', content='x', journalist=self.other,
+            publisher=self.publisher, approved=True
+        )
+        _, since = self.full_sync()
+
+        article.publisher = None
+        article.save()
+        # Still visible through the followed journalist: no tombstone
+        self.articles[0].publisher = self.publisher
+        self.articles[0].save()
+        self.articles[0].publisher = None
+        self.articles[0].save()
+
+        results, _ = self.full_sync(since)
+
+        self.assertEqual(
+            [(item['id'], item['deleted']) for item in results],
+            [(article.pk, True), (self.articles[0].pk, False)]
+        )
+
+    def test_drafts_leave_no_tombstones(self):
+        draft = Article.objects.create(
+            title='Draft', content='x', journalist=self.journalist
+        )
+        draft.title = 'Still a draft'
+        draft.save()
+        draft.delete()
+
+        self.assertFalse(Tombstone.objects.exists())
+
+    def test_expired_cursor_is_gone(self):
+        _, since = self.full_sync()
+
+        with override_settings(TOMBSTONE_RETENTION_DAYS=0):
+            response = self.sync(since)
+        self.assertEqual(response.status_code, 410)
+
+    def test_subscription_change_requires_full_sync(self):
+        _, since = self.full_sync()
+
+        self.reader.subscribed_journalists.add(self.other)
+
+        self.assertEqual(self.sync(since).status_code, 410)
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.sync('bogus').status_code, 400)
+
+    def test_prune(self):
+        old, recent = [article.pk for article in self.articles[:2]]
+        self.articles[0].delete()
+        self.articles[1].delete()
+        Tombstone.objects.filter(object_id=old).update(
+            deleted_at=timezone.now() - timedelta(days=31)
+        )
+
+        call_command('prune_tombstones', stdout=open('/dev/null', 'w'))
+
+        self.assertEqual(
+            list(Tombstone.objects.values_list('object_id', flat=True)),
+            [recent]
+        )
+        self.assertEqual(changes.prune(timezone.now()), 1)
@@ -0,0 +1,85 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from core.functions import feed_cache
+from core.models import CustomUser, Publisher, Article, Newsletter
+from core.tests.utils import CaptureCacheCalls
+
+
+class DashboardQueryBudgetTest(TestCase):
+    """
+    Each dashboard renders in the number of queries and cache round
+    trips documented on ``dashboard_view``, whatever the number of items
+    listed. The cache is the Redis backend used in production.
+    """
+
+    def setUp(self):
+        cache.clear()
+        # Keep the periodic stats flush out of the measured requests
+        feed_cache.flush_stats(force=True)
+        self.reader = CustomUser.objects.create_user(
+            username='reader', password='testpass', role='reader'
+        )
+        self.journalist = CustomUser.objects.create_user(
+            username='journalist', password='testpass', role='journalist'
+        )
+        CustomUser.objects.create_user(
+            username='editor', password='testpass', role='editor'
+        )
+        owner = CustomUser.objects.create_user(
+            username='Tech News', password='testpass', role='publisher'
+        )
+        self.publisher = Publisher.objects.create(
+            name='Tech News', owner=owner
+        )
+        self.reader.subscribed_journalists.add(self.journalist)
+        self.reader.subscribed_publishers.add(self.publisher)
+
+    def add_items(self, count):
+        for i in range(count):
+            for approved in (True, False):
+                Article.objects.create(
+                    title=f'Story {i}', content='Some content',
+                    journalist=self.journalist, publisher=self.publisher,
+                    approved=approved
+                )
+                Newsletter.objects.create(
+                    title=f'Weekly {i}', body='Newsletter body',
+                    journalist=self.journalist, publisher=self.publisher,
+                    approved=approved
+                )
+
+    def count_queries(self, username):
+        """Return the queries and cache round trips of a dashboard."""
+        self.client.login(username=username, password='testpass')
+        with CaptureQueriesContext(connection) as queries, \
+                CaptureCacheCalls() as calls:
+            response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 200)
+        return len(queries), len(calls)
+
+    def assert_budget(self, username, budget):
+        self.add_items(2)
+        self.assertEqual(self.count_queries(username), budget)
+        cache.clear()
+        self.add_items(5)
+        self.assertEqual(self.count_queries(username), budget)
+
+    def test_reader(self):
+        for count in (2, 5):
+            self.add_items(count)
+            # The first visit rebuilds the feed cache and version tokens
+            cache.clear()
+            self.assertEqual(self.count_queries('reader'), (14, 19))
+            self.assertEqual(self.count_queries('reader'), (6, 10))
+
+    def test_journalist(self):
+        self.assert_budget('journalist', (4, 0))
+
+    def test_editor(self):
+        self.assert_budget('editor', (4, 0))
+
+    def test_publisher(self):
+        self.assert_budget('Tech News', (3, 0))
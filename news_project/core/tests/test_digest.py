@@ -0,0 +1,99 @@
+from unittest import mock
+
+from django.core import mail
+from django.test import TestCase, override_settings
+from core.functions import outbox
+from core.functions.digest import send_digests, send_messages_in_chunks
+from core.models import (
+    CustomUser, Publisher, Article, Newsletter, PendingDigestItem
+)
+
+
+class DigestDeliveryTest(TestCase):
+    def setUp(self):
+        self.journalist = CustomUser.objects.create_user(
+            username='journalist',
+            password='testpass',
+            role='journalist'
+        )
+        self.publisher = Publisher.objects.create(name='Tech News')
+        self.instant = CustomUser.objects.create_user(
+            username='instant',
+            email='instant@example.com',
+            password='testpass',
+            role='reader'
+        )
+        self.daily = CustomUser.objects.create_user(
+            username='daily',
+            email='daily@example.com',
+            password='testpass',
+            role='reader',
+            digest_frequency=CustomUser.DIGEST_DAILY
+        )
+        for reader in (self.instant, self.daily):
+            reader.subscribed_journalists.add(self.journalist)
+        self.daily.subscribed_publishers.add(self.publisher)
+
+    def test_digest_readers_get_one_message_per_window(self):
+        Article.objects.create(
+            title='First',
+            content='Article body',
+            journalist=self.journalist,
+            publisher=self.publisher,
+            approved=True
+        )
+        Newsletter.objects.create(
+            title='Second',
+            body='Newsletter body',
+            journalist=self.journalist,
+            approved=True
+        )
+        outbox.drain(workers=1)
+
+        self.assertEqual(
+            [m.to for m in mail.outbox],
+            [['instant@example.com'], ['instant@example.com']]
+        )
+        self.assertEqual(
+            PendingDigestItem.objects.filter(reader=self.daily).count(), 2
+        )
+
+        mail.outbox = []
+        self.assertEqual(send_digests(CustomUser.DIGEST_HOURLY), 0)
+        self.assertEqual(send_digests(CustomUser.DIGEST_DAILY), 1)
+
+        self.assertEqual(len(mail.outbox), 1)
+        digest = mail.outbox[0]
+        self.assertEqual(digest.to, ['daily@example.com'])
+        self.assertIn('First', digest.body)
+        self.assertIn('Second', digest.body)
+        self.assertFalse(PendingDigestItem.objects.exists())
+
+    def test_crash_after_sending_does_not_send_again(self):
+        Article.objects.create(
+            title='First',
+            content='Article body',
+            journalist=self.journalist,
+            approved=True
+        )
+        outbox.drain(workers=1)
+        mail.outbox = []
+
+        def send_then_crash(*args, **kwargs):
+            send_messages_in_chunks(*args, **kwargs)
+            raise RuntimeError("worker killed")
+
+        with mock.patch(
+            'core.functions.digest.send_messages_in_chunks', send_then_crash
+        ):
+            with self.assertRaises(RuntimeError):
+                send_digests(CustomUser.DIGEST_DAILY)
+        self.assertEqual(len(mail.outbox), 1)
+
+        self.assertEqual(send_digests(CustomUser.DIGEST_DAILY), 0)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertTrue(PendingDigestItem.objects.exists())
+
+        with override_settings(DIGEST_CLAIM_SECONDS=-1):
+            send_digests(CustomUser.DIGEST_DAILY)
+        self.assertFalse(PendingDigestItem.objects.exists())
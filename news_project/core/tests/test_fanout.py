@@ -0,0 +1,127 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from core.functions import fanout
+from core.models import CustomUser, Newsletter, OutboxEvent, DeliveryShard
+
+
+@override_settings(FANOUT_SHARD_SIZE=2, EMAIL_BATCH_SIZE=1)
+class ShardedFanOutTest(TestCase):
+    def setUp(self):
+        self.journalist = CustomUser.objects.create_user(
+            username='journalist',
+            password='testpass',
+            role='journalist'
+        )
+        for i in range(5):
+            reader = CustomUser.objects.create_user(
+                username=f'reader{i}',
+                email=f'reader{i}@example.com',
+                password='testpass',
+                role='reader'
+            )
+            reader.subscribed_journalists.add(self.journalist)
+        self.newsletter = Newsletter.objects.create(
+            title='Weekly',
+            body='Body',
+            journalist=self.journalist
+        )
+        self.event = OutboxEvent.objects.create(
+            kind=OutboxEvent.KIND_NEWSLETTER,
+            object_id=self.newsletter.pk
+        )
+
+    def test_audience_is_split_into_shards(self):
+        fanout.fan_out(self.event, self.newsletter, 'Subject', 'Body', 1)
+
+        shards = self.event.shards.order_by('first_reader_id')
+        self.assertEqual([s.sent_count for s in shards], [2, 2, 1])
+        self.assertTrue(
+            all(s.status == DeliveryShard.STATUS_DONE for s in shards)
+        )
+        self.assertEqual(len(mail.outbox), 5)
+
+    def test_failed_shard_resumes_without_resending(self):
+        send = fanout.send_messages_in_chunks
+        calls = []
+
+        def flaky(messages, **kwargs):
+            calls.append(messages)
+            if len(calls) == 4:
+                raise ConnectionError('relay hung up')
+            return send(messages, **kwargs)
+
+        with mock.patch.object(fanout, 'send_messages_in_chunks', flaky):
+            with self.assertRaises(fanout.ShardDeliveryError):
+                fanout.fan_out(
+                    self.event, self.newsletter, 'Subject', 'Body', 1
+                )
+
+        failed = self.event.shards.get(status=DeliveryShard.STATUS_FAILED)
+        self.assertEqual(failed.sent_count, 1)
+        self.assertEqual(failed.last_error, 'relay hung up')
+        self.assertEqual(len(mail.outbox), 4)
+
+        fanout.fan_out(self.event, self.newsletter, 'Subject', 'Body', 1)
+
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(
+            sorted(m.to[0] for m in mail.outbox),
+            [f'reader{i}@example.com' for i in range(5)]
+        )
+        self.assertFalse(
+            self.event.shards.exclude(
+                status=DeliveryShard.STATUS_DONE
+            ).exists()
+        )
+
+    def audience(self):
+        return fanout.ItemAudience(self.newsletter, 'Subject', 'Body')
+
+    def test_shard_held_by_another_worker_is_not_sent(self):
+        first = fanout.plan_shards(self.event, self.audience())[0]
+        # Still being sent by a worker whose event lease had expired
+        DeliveryShard.objects.filter(pk=first.pk).update(
+            status=DeliveryShard.STATUS_SENDING, locked_at=timezone.now()
+        )
+
+        with self.assertRaises(fanout.ShardsBusy):
+            fanout.fan_out(self.event, self.newsletter, 'Subject', 'Body', 1)
+        self.assertEqual(len(mail.outbox), 3)
+        first.refresh_from_db()
+        self.assertEqual(first.status, DeliveryShard.STATUS_SENDING)
+        self.assertEqual(first.sent_count, 0)
+
+    def test_expired_shard_lease_is_taken_over(self):
+        first = fanout.plan_shards(self.event, self.audience())[0]
+        DeliveryShard.objects.filter(pk=first.pk).update(
+            status=DeliveryShard.STATUS_SENDING,
+            locked_at=timezone.now() - timedelta(hours=1),
+            progress_reader_id=first.first_reader_id, sent_count=1
+        )
+
+        fanout.fan_out(self.event, self.newsletter, 'Subject', 'Body', 1)
+        # The reader the crashed worker reached is not emailed again
+        self.assertEqual(len(mail.outbox), 4)
+
+    def test_worker_stops_once_its_shard_is_taken_over(self):
+        shard = fanout.plan_shards(self.event, self.audience())[0]
+        send = fanout.send_messages_in_chunks
+
+        def send_then_lose_claim(messages, **kwargs):
+            send(messages, **kwargs)
+            DeliveryShard.objects.filter(pk=shard.pk).update(
+                locked_at=timezone.now() + timedelta(seconds=1)
+            )
+
+        with mock.patch.object(
+            fanout, 'send_messages_in_chunks', send_then_lose_claim
+        ):
+            self.assertIsNone(fanout.deliver_shard(shard, self.audience()))
+        self.assertEqual(len(mail.outbox), 1)
+        shard.refresh_from_db()
+        self.assertEqual(shard.status, DeliveryShard.STATUS_SENDING)
+        self.assertEqual(shard.sent_count, 0)
@@ -0,0 +1,157 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from core.functions import feed_cache
+from core.models import Article, CustomUser, Newsletter, Publisher
+from core.tests.utils import CaptureCacheCalls
+
+
+class FeedCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        feed_cache.reset_stats()
+        self.reader = CustomUser.objects.create_user(
+            username='reader', password='testpass', role='reader'
+        )
+        self.journalist = CustomUser.objects.create_user(
+            username='journalist', password='testpass', role='journalist'
+        )
+        self.other = CustomUser.objects.create_user(
+            username='other', password='testpass', role='journalist'
+        )
+        self.publisher = Publisher.objects.create(name='Tech News')
+        self.reader.subscribed_journalists.add(self.journalist)
+        self.article = Article.objects.create(
+            title='First', content='Body',
+            journalist=self.journalist, approved=True
+        )
+
+    def feed_ids(self, kind='article'):
+        entry = feed_cache.get_feed(self.reader, kind)
+        return [pk for _, pk in entry['items']]
+
+    def test_second_read_is_a_hit_without_queries(self):
+        self.feed_ids()
+        with self.assertNumQueries(0), CaptureCacheCalls() as calls:
+            self.assertEqual(self.feed_ids(), [self.article.pk])
+        self.assertEqual(calls.writes, [])
+        stats = feed_cache.stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+    def test_counts_are_flushed_out_of_band(self):
+        self.feed_ids()
+        self.feed_ids()
+        with self.settings(FEED_CACHE_STATS_INTERVAL=0):
+            self.client.get(reverse('login'))
+        self.assertEqual(
+            cache.get_many(list(feed_cache.STATS_KEYS.values())),
+            {'feed:stats:hits': 1, 'feed:stats:misses': 1}
+        )
+        self.assertEqual(feed_cache.stats()['hits'], 1)
+
+    def test_approval_invalidates_followers(self):
+        draft = Article.objects.create(
+            title='Draft', content='Body', journalist=self.journalist
+        )
+        self.feed_ids()
+        draft.approved = True
+        draft.save()
+        self.assertEqual(self.feed_ids(), [draft.pk, self.article.pk])
+
+    def test_edit_and_delete_invalidate(self):
+        entry = feed_cache.get_feed(self.reader, 'article')
+        self.article.title = 'Edited'
+        self.article.save()
+        self.assertIsNot(
+            feed_cache.get_feed(self.reader, 'article'), entry
+        )
+        self.assertEqual(feed_cache.stats()['misses'], 2)
+
+        self.article.delete()
+        self.assertEqual(self.feed_ids(), [])
+
+    def test_feed_rebuilt_before_commit_is_not_reused(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.article.title = 'Edited'
+            self.article.save()
+            # A concurrent request caches the feed before the commit
+            entry = feed_cache.get_feed(self.reader, 'article')
+        self.assertIsNot(
+            feed_cache.get_feed(self.reader, 'article'), entry
+        )
+        self.assertEqual(feed_cache.stats()['misses'], 2)
+
+    def test_unrelated_changes_keep_entry(self):
+        self.feed_ids()
+        Article.objects.create(
+            title='Elsewhere', content='Body',
+            journalist=self.other, approved=True
+        )
+        Article.objects.create(
+            title='Draft', content='Body', journalist=self.journalist
+        )
+        Newsletter.objects.create(
+            title='Letter', body='Body',
+            journalist=self.journalist, approved=True
+        )
+        self.feed_ids()
+        self.assertEqual(feed_cache.stats()['misses'], 1)
+
+    def test_moving_an_article_invalidates_the_old_source(self):
+        self.feed_ids()
+        article = Article.objects.get(pk=self.article.pk)
+        article.journalist = self.other
+        article.save()
+        self.assertEqual(self.feed_ids(), [])
+
+    def test_subscription_changes_invalidate(self):
+        self.feed_ids()
+        moved = Article.objects.create(
+            title='Publisher item', content='Body', journalist=self.other,
+            publisher=self.publisher, approved=True
+        )
+        self.reader.subscribed_publishers.add(self.publisher)
+        self.assertEqual(self.feed_ids(), [moved.pk, self.article.pk])
+
+        self.publisher.subscribed_readers.remove(self.reader)
+        self.assertEqual(self.feed_ids(), [self.article.pk])
+
+    def test_manage_subscriptions_invalidates(self):
+        self.feed_ids()
+        self.client.login(username='reader', password='testpass')
+        self.client.post(reverse('manage_subscriptions'), {
+            'journalists': [self.other.pk],
+            'digest_frequency': CustomUser.DIGEST_IMMEDIATE,
+        })
+        self.reader.refresh_from_db()
+        self.assertEqual(self.feed_ids(), [])
+
+    def test_pages_beyond_cached_items_fall_back_to_query(self):
+        for i in range(3):
+            Article.objects.create(
+                title=f'More {i}', content='Body',
+                journalist=self.journalist, approved=True
+            )
+        with self.settings(FEED_CACHE_SIZE=2):
+            cache.clear()
+            first, cursor = feed_cache.page(
+                self.reader, 'article', page_size=2
+            )
+            rest, end = feed_cache.page(
+                self.reader, 'article', cursor=cursor, page_size=5
+            )
+        titles = [a.title for a in first + rest]
+        self.assertEqual(titles, ['More 2', 'More 1', 'More 0', 'First'])
+        self.assertIsNone(end)
+
+    def test_stats_command(self):
+        self.feed_ids()
+        self.feed_ids()
+        out = StringIO()
+        call_command('feed_cache_stats', '--reset', stdout=out)
+        self.assertIn('hits=1 misses=1 hit_ratio=0.5', out.getvalue())
+        self.assertEqual(feed_cache.stats()['hits'], 0)
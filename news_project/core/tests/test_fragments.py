@@ -0,0 +1,156 @@
+from django.core.cache import cache
+from django.db import connection
+from django.template import Context, Template
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from core.checks import check_shared_caches
+from core.functions import moderation
+from core.models import CustomUser, Publisher, Article, Newsletter
+
+
+class FragmentCacheTest(TestCase):
+    """
+    Fragments are shared across renders until the content they show
+    changes.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.journalist = CustomUser.objects.create_user(
+            username='journalist', password='testpass', role='journalist'
+        )
+        self.publisher = Publisher.objects.create(name='Tech News')
+        self.article = Article.objects.create(
+            title='Story', content='Original content',
+            journalist=self.journalist, publisher=self.publisher,
+            approved=True
+        )
+        self.template = Template(
+            "{% load fragments %}"
+            "{% fragment 'card' article %}{{ marker }}{% endfragment %}"
+        )
+
+    def render(self, marker, article=None):
+        return self.template.render(Context({
+            'article': article or self.article, 'marker': marker
+        }))
+
+    def test_reused_until_item_changes(self):
+        self.assertEqual(self.render('first'), 'first')
+        self.assertEqual(self.render('second'), 'first')
+
+        self.article.title = 'Edited'
+        self.article.save()
+        self.assertEqual(self.render('third'), 'third')
+
+        Article.objects.get(pk=self.article.pk).delete()
+        self.assertEqual(self.render('fourth'), 'fourth')
+
+    def test_source_rename_invalidates(self):
+        self.render('first')
+        self.publisher.name = 'Renamed'
+        self.publisher.save()
+        self.assertEqual(self.render('second'), 'second')
+
+        self.journalist.username = 'renamed'
+        self.journalist.save()
+        self.assertEqual(self.render('third'), 'third')
+
+    def test_login_keeps_fragments(self):
+        self.render('first')
+        self.client.login(username='journalist', password='testpass')
+        self.assertEqual(self.render('second'), 'first')
+
+    def test_bulk_approval_invalidates(self):
+        draft = Article.objects.create(
+            title='Draft', content='Text', journalist=self.journalist
+        )
+        self.render('first', draft)
+        moderation.approve_items(article_ids=[draft.pk])
+        self.assertEqual(self.render('second', draft), 'second')
+
+    def test_list_fragment_follows_membership(self):
+        template = Template(
+            "{% load fragments %}"
+            "{% fragment 'list' items %}{{ marker }}{% endfragment %}"
+        )
+
+        def render(marker):
+            return template.render(Context({
+                'items': Article.objects.order_by('-created_at', '-id'),
+                'marker': marker,
+            }))
+
+        self.assertEqual(render('first'), 'first')
+        self.assertEqual(render('second'), 'first')
+        Article.objects.create(
+            title='New', content='Text', journalist=self.journalist
+        )
+        self.assertEqual(render('third'), 'third')
+
+    def test_detail_never_stale(self):
+        CustomUser.objects.create_user(
+            username='reader', password='testpass', role='reader'
+        )
+        self.client.login(username='reader', password='testpass')
+        url = reverse('article_detail', args=[self.article.pk])
+        self.assertContains(self.client.get(url), 'Original content')
+
+        self.article.content = 'Corrected content'
+        self.article.save()
+        response = self.client.get(url)
+        self.assertContains(response, 'Corrected content')
+        self.assertNotContains(response, 'Original content')
+
+    def test_newsletter_detail_shows_journalist(self):
+        newsletter = Newsletter.objects.create(
+            title='Weekly', body='Body', journalist=self.journalist,
+            approved=True
+        )
+        self.client.login(username='journalist', password='testpass')
+        response = self.client.get(
+            reverse('newsletter_detail', args=[newsletter.pk])
+        )
+        self.assertContains(response, 'By journalist')
+
+    def test_approved_section_served_from_cache(self):
+        CustomUser.objects.create_user(
+            username='editor', password='testpass', role='editor'
+        )
+        self.client.login(username='editor', password='testpass')
+        url = reverse('moderation_section', args=['approved-articles'])
+
+        with CaptureQueriesContext(connection) as miss:
+            self.assertContains(self.client.get(url), 'Story')
+        with CaptureQueriesContext(connection) as hit:
+            self.assertContains(self.client.get(url), 'Story')
+        # Only the session and user lookups remain
+        self.assertEqual(len(hit), 2)
+        self.assertLess(len(hit), len(miss))
+
+        Article.objects.create(
+            title='Fresh', content='Text', journalist=self.journalist,
+            approved=True
+        )
+        self.assertContains(self.client.get(url), 'Fresh')
+
+
+class SharedCacheCheckTest(TestCase):
+    def test_local_memory_cache_is_refused(self):
+        local = {'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }}
+        with self.settings(CACHES=local):
+            errors = check_shared_caches(None)
+        self.assertEqual(
+            [error.id for error in errors], ['core.E001', 'core.E001']
+        )
+
+    def test_redis_cache_is_accepted(self):
+        shared = {'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': 'redis://redis:6379/0',
+        }}
+        with self.settings(CACHES=shared):
+            self.assertEqual(check_shared_caches(None), [])
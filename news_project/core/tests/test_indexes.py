@@ -0,0 +1,138 @@
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+from core.functions import feed, moderation
+from core.models import (
+    CustomUser, Publisher, Article, Newsletter, OutboxEvent
+)
+
+
+class IndexUsageTest(TestCase):
+    """
+    The hot queries are served by the composite indexes of migration
+    ``0014``. Plans are read with EXPLAIN, so the test holds on SQLite
+    locally and on MySQL in production.
+
+    Django compiles ``approved=True`` to ``approved = 1`` on MySQL, which
+    can seek the indexes that start with ``approved``. On SQLite it
+    compiles to a bare ``WHERE approved`` that the planner cannot seek,
+    so the tests for those indexes only run against MySQL.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.journalist = CustomUser.objects.create_user(
+            username='journalist', password='testpass', role='journalist'
+        )
+        cls.reader = CustomUser.objects.create_user(
+            username='reader', password='testpass', role='reader'
+        )
+        cls.publisher = Publisher.objects.create(name='Tech News')
+        cls.reader.subscribed_journalists.add(cls.journalist)
+        cls.reader.subscribed_publishers.add(cls.publisher)
+
+        # Enough unrelated content for the planner to prefer indexes
+        others = [
+            CustomUser.objects.create_user(
+                username=f'other{i}', password='testpass', role='journalist'
+            )
+            for i in range(20)
+        ]
+        publishers = [
+            Publisher.objects.create(name=f'Publisher {i}') for i in range(10)
+        ]
+        for model, text in ((Article, 'content'), (Newsletter, 'body')):
+            model.objects.bulk_create([
+                model(
+                    title='Story', journalist=others[i % 20],
+                    publisher=publishers[i % 10], approved=i % 4 != 0,
+                    **{text: 'Text'}
+                )
+                for i in range(2000)
+            ])
+            model.objects.bulk_create([
+                model(
+                    title='Story', journalist=cls.journalist,
+                    approved=True, **{text: 'Text'}
+                )
+                for i in range(20)
+            ])
+
+        with connection.cursor() as cursor:
+            if connection.vendor == 'mysql':
+                cursor.execute('ANALYZE TABLE core_article, core_newsletter')
+            else:
+                cursor.execute('ANALYZE')
+
+    def skip_unless_boolean_equality(self):
+        if connection.vendor != 'mysql':
+            self.skipTest("approved=True is not compiled as an equality")
+
+    def assert_uses_index(self, queryset, *names):
+        plan = queryset.explain()
+        self.assertTrue(
+            any(name in plan for name in names),
+            f"None of {names} in plan:\n{plan}"
+        )
+
+    def test_reader_feed(self):
+        self.skip_unless_boolean_equality()
+        for kind, model in moderation.MODELS:
+            subscribed = (
+                feed.subscribed_articles if model is Article
+                else feed.subscribed_newsletters
+            )
+            self.assert_uses_index(
+                subscribed(self.reader).order_by('-created_at', '-id')[:21],
+                f'{kind}_journalist_feed_idx', f'{kind}_publisher_feed_idx',
+                f'{kind}_moderation_idx'
+            )
+
+    def test_change_feed(self):
+        for kind, model in moderation.MODELS:
+            subscribed = (
+                feed.subscribed_articles if model is Article
+                else feed.subscribed_newsletters
+            )
+            self.assert_uses_index(
+                subscribed(self.reader).filter(
+                    updated_at__lt=timezone.now()
+                ).order_by('updated_at', 'id'),
+                f'{kind}_journalist_sync_idx', f'{kind}_publisher_sync_idx'
+            )
+
+    def test_author_dashboards(self):
+        for kind, model in moderation.MODELS:
+            self.assert_uses_index(
+                model.objects.filter(journalist=self.journalist).order_by(
+                    '-approved', '-created_at', '-id'
+                ),
+                f'{kind}_journalist_feed_idx'
+            )
+            self.assert_uses_index(
+                model.objects.filter(publisher=self.publisher).order_by(
+                    '-approved', '-created_at', '-id'
+                ),
+                f'{kind}_publisher_feed_idx'
+            )
+
+    def test_moderation_queue(self):
+        self.skip_unless_boolean_equality()
+        for kind, model in moderation.MODELS:
+            for approved in (False, True):
+                self.assert_uses_index(
+                    model.objects.filter(approved=approved).order_by(
+                        'created_at', 'id'
+                    )[:26],
+                    f'{kind}_moderation_idx'
+                )
+
+    def test_live_poll(self):
+        self.assert_uses_index(
+            OutboxEvent.objects.filter(id__gt=1000).order_by('id'),
+            'PRIMARY'
+        )
+        self.assert_uses_index(
+            OutboxEvent.objects.filter(pk__in=[10, 20]).order_by('id'),
+            'PRIMARY'
+        )
@@ -0,0 +1,199 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from core.functions import live, moderation
+from core.models import CustomUser, Publisher, Article, OutboxEvent
+
+
+class BrokerTest(TestCase):
+    async def test_dispatch_reaches_followers_only(self):
+        broker = live.Broker(live.LocMemBackend())
+        fan = broker.subscribe([1], [7])
+        other = broker.subscribe([2], [])
+
+        broker.dispatch({'type': 'article', 'id': 1, 'journalist': 3,
+                         'publisher': 7})
+        broker.dispatch({'type': 'article', 'id': 2, 'journalist': 1,
+                         'publisher': 7})
+
+        self.assertEqual(
+            [fan.queue.get_nowait()['id'] for _ in range(2)], [1, 2]
+        )
+        self.assertTrue(other.queue.empty())
+
+        broker.unsubscribe(fan)
+        broker.unsubscribe(other)
+        self.assertEqual(dict(broker.subscribers), {})
+        self.assertIsNone(broker.task)
+
+    @override_settings(LIVE_QUEUE_SIZE=1)
+    async def test_slow_client_overflows(self):
+        broker = live.Broker(live.LocMemBackend())
+        subscription = broker.subscribe([1], [])
+
+        for pk in range(2):
+            broker.dispatch({'type': 'article', 'id': pk, 'journalist': 1,
+                             'publisher': None})
+
+        self.assertTrue(subscription.overflowed)
+        broker.unsubscribe(subscription)
+
+
+class PollingBackendTest(TestCase):
+    def setUp(self):
+        self.journalist = CustomUser.objects.create_user(
+            username='journalist', password='testpass', role='journalist'
+        )
+
+    def test_poll_returns_new_approvals_once(self):
+        Article.objects.create(
+            title='Earlier', content='x', journalist=self.journalist,
+            approved=True
+        )
+        backend = live.PollingBackend()
+        position = backend.start()
+        article = Article.objects.create(
+            title='Story', content='Some content', journalist=self.journalist,
+            approved=True
+        )
+        Article.objects.create(
+            title='Draft', content='x', journalist=self.journalist
+        )
+
+        events, position = backend.poll(position)
+        again, _ = backend.poll(position)
+
+        self.assertEqual(
+            [(event['type'], event['id']) for event in events],
+            [('article', article.pk)]
+        )
+        self.assertEqual(events[0]['excerpt'], 'Some content')
+        self.assertEqual(again, [])
+
+    def test_late_commit_is_not_skipped(self):
+        backend = live.PollingBackend()
+        position = backend.start()
+        slow = Article.objects.create(
+            title='Slow', content='x', journalist=self.journalist,
+            approved=True
+        )
+        fast = Article.objects.create(
+            title='Fast', content='x', journalist=self.journalist,
+            approved=True
+        )
+        # The slow approval's transaction has not committed yet
+        slow_event = OutboxEvent.objects.get(object_id=slow.pk).pk
+        OutboxEvent.objects.filter(pk=slow_event).delete()
+
+        events, position = backend.poll(position)
+        self.assertEqual([event['id'] for event in events], [fast.pk])
+        self.assertIn(slow_event, position['gaps'])
+
+        # Committed minutes later, well after the approval time
+        OutboxEvent.objects.create(
+            pk=slow_event, kind=OutboxEvent.KIND_ARTICLE,
+            object_id=slow.pk
+        )
+        events, position = backend.poll(position)
+        self.assertEqual([event['id'] for event in events], [slow.pk])
+        self.assertEqual(position['gaps'], {})
+
+    @override_settings(LIVE_GAP_SECONDS=0)
+    def test_gaps_are_given_up(self):
+        rolled_back, _ = [
+            OutboxEvent.objects.create(
+                kind=OutboxEvent.KIND_TIMELINE, payload={}
+            )
+            for _ in range(2)
+        ]
+        missing = rolled_back.pk
+        position = {'after': missing - 1, 'gaps': {}}
+        rolled_back.delete()
+
+        _, position = live.PollingBackend().poll(position)
+        self.assertEqual(list(position['gaps']), [missing])
+        _, position = live.PollingBackend().poll(position)
+        self.assertEqual(position['gaps'], {})
+
+    def test_bulk_approvals_are_announced(self):
+        backend = live.PollingBackend()
+        position = backend.start()
+        article = Article.objects.create(
+            title='Story', content='x', journalist=self.journalist
+        )
+        moderation.approve_items([article.pk])
+
+        events, _ = backend.poll(position)
+        self.assertEqual([event['id'] for event in events], [article.pk])
+
+
+@override_settings(LIVE_BACKEND='core.functions.live.LocMemBackend')
+class LiveEventsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.reader = CustomUser.objects.create_user(
+            username='reader', password='testpass', role='reader'
+        )
+        self.journalist = CustomUser.objects.create_user(
+            username='journalist', password='testpass', role='journalist'
+        )
+        self.other = CustomUser.objects.create_user(
+            username='other', password='testpass', role='journalist'
+        )
+        self.publisher = Publisher.objects.create(name='Tech News')
+        self.reader.subscribed_journalists.add(self.journalist)
+
+    async def test_stream_pushes_followed_items(self):
+        ignored = await Article.objects.acreate(
+            title='Unfollowed', content='x', journalist=self.other,
+            approved=True
+        )
+        article = await Article.objects.acreate(
+            title='Story', content='Some content',
+            journalist=self.journalist, approved=True
+        )
+        await self.async_client.aforce_login(self.reader)
+        response = await self.async_client.get(reverse('live_events_api'))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        stream = aiter(response.streaming_content)
+        self.assertTrue((await anext(stream)).startswith(b'retry:'))
+        # Let the broker start listening
+        await asyncio.sleep(0)
+
+        await sync_to_async(live.publish)('article', ignored)
+        await sync_to_async(live.publish)('article', article)
+        chunk = (await asyncio.wait_for(anext(stream), 5)).decode()
+
+        event, event_id, data = chunk.strip().split('\n')
+        self.assertEqual(event, 'event: article')
+        self.assertEqual(event_id, f'id: article:{article.pk}')
+        self.assertEqual(json.loads(data[len('data: '):])['title'], 'Story')
+        await stream.aclose()
+
+    async def test_subscribes_only_while_streaming(self):
+        broker = live.get_broker()
+        await self.async_client.aforce_login(self.reader)
+        response = await self.async_client.get(reverse('live_events_api'))
+        # Dropped before the first chunk: nothing to unsubscribe
+        self.assertEqual(broker.count, 0)
+
+        stream = aiter(response.streaming_content)
+        await anext(stream)
+        self.assertEqual(broker.count, 1)
+        # The server cancels the waiting stream when the client leaves
+        waiting = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await waiting
+        self.assertEqual(broker.count, 0)
+
+    async def test_readers_only(self):
+        await self.async_client.aforce_login(self.journalist)
+        response = await self.async_client.get(reverse('live_events_api'))
+        self.assertEqual(response.status_code, 403)
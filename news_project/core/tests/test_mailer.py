@@ -0,0 +1,25 @@
+from unittest import mock
+
+from django.core import mail
+from django.test import TestCase
+from core.functions.mailer import send_individual_messages
+
+
+class SendIndividualMessagesTest(TestCase):
+    def test_one_message_per_recipient_over_one_connection(self):
+        recipients = [f'reader{i}@example.com' for i in range(5)]
+
+        with mock.patch(
+            'django.core.mail.backends.locmem.EmailBackend.open'
+        ) as open_connection:
+            stats = send_individual_messages(
+                'Subject', 'Body', iter(recipients), chunk_size=2
+            )
+
+        open_connection.assert_called_once()
+        self.assertEqual([s.sent for s in stats], [2, 2, 1])
+        self.assertEqual(
+            [message.to for message in mail.outbox],
+            [[address] for address in recipients]
+        )
+        self.assertTrue(all(not message.bcc for message in mail.outbox))
@@ -0,0 +1,126 @@
+from datetime import timedelta
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from core.models import CustomUser, Publisher, Article, Newsletter
+
+
+@override_settings(MODERATION_PAGE_SIZE=2)
+class ModerationQueueTest(TestCase):
+    def setUp(self):
+        self.journalist = CustomUser.objects.create_user(
+            username='journalist',
+            password='testpass',
+            role='journalist'
+        )
+        self.editor = CustomUser.objects.create_user(
+            username='editor',
+            password='testpass',
+            role='editor'
+        )
+        self.publisher = Publisher.objects.create(name='Tech News')
+        self.client.login(username='editor', password='testpass')
+
+    def create_article(self, title, approved=False, age=0):
+        article = Article.objects.create(
+            title=title, content='Some content', journalist=self.journalist,
+            publisher=self.publisher, approved=approved
+        )
+        # created_at is set on insert, so backdate it afterwards
+        Article.objects.filter(pk=article.pk).update(
+            created_at=timezone.now() - timedelta(hours=age)
+        )
+        return article
+
+    def titles(self, response):
+        return [item.title for item in response.context['page']['items']]
+
+    def test_dashboard_lists_oldest_pending_first(self):
+        self.create_article('Newest', age=1)
+        self.create_article('Oldest', age=3)
+        self.create_article('Middle', age=2)
+        self.create_article('Archived', approved=True, age=4)
+
+        response = self.client.get(reverse('dashboard'))
+        page = response.context['pending_articles']
+        self.assertEqual(
+            [item.title for item in page['items']], ['Oldest', 'Middle']
+        )
+        self.assertContains(response, page['next_url'])
+        self.assertNotContains(response, 'Newest')
+        # Approved history is only linked, never rendered
+        self.assertNotContains(response, 'Archived')
+        self.assertContains(
+            response,
+            reverse('moderation_section', args=['approved-articles'])
+        )
+
+    def test_pending_pages_follow_cursor(self):
+        for age in range(5, 0, -1):
+            self.create_article(f'Story {age}', age=age)
+
+        url = reverse('moderation_section', args=['pending-articles'])
+        response = self.client.get(url)
+        self.assertEqual(self.titles(response), ['Story 5', 'Story 4'])
+        response = self.client.get(response.context['page']['next_url'])
+        self.assertEqual(self.titles(response), ['Story 3', 'Story 2'])
+        response = self.client.get(response.context['page']['next_url'])
+        self.assertEqual(self.titles(response), ['Story 1'])
+        self.assertIsNone(response.context['page']['next_url'])
+        self.assertNotContains(response, 'Load more')
+
+    def test_approved_section_newest_first(self):
+        self.create_article('Old', approved=True, age=2)
+        self.create_article('New', approved=True, age=1)
+        self.create_article('Pending', age=3)
+        Newsletter.objects.create(
+            title='Weekly', body='Newsletter body',
+            journalist=self.journalist, approved=True
+        )
+
+        response = self.client.get(
+            reverse('moderation_section', args=['approved-articles'])
+        )
+        self.assertEqual(self.titles(response), ['New', 'Old'])
+        # Approved items cannot be ticked for bulk moderation
+        self.assertNotContains(response, 'form="bulk-moderation"')
+
+        response = self.client.get(
+            reverse('moderation_section', args=['approved-newsletters'])
+        )
+        self.assertEqual(self.titles(response), ['Weekly'])
+
+    def test_invalid_section_and_cursor(self):
+        response = self.client.get(
+            reverse('moderation_section', args=['everything'])
+        )
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(
+            reverse('moderation_section', args=['pending-articles']),
+            {'cursor': 'garbage'}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_editors_only(self):
+        self.client.login(username='journalist', password='testpass')
+        response = self.client.get(
+            reverse('moderation_section', args=['pending-articles'])
+        )
+        self.assertEqual(response.status_code, 302)
+
+    def test_queries_do_not_grow_with_archive(self):
+        url = reverse('moderation_section', args=['approved-articles'])
+        for age in range(3):
+            self.create_article(f'Story {age}', approved=True, age=age)
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(url)
+
+        for age in range(3, 30):
+            self.create_article(f'Story {age}', approved=True, age=age)
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.get(url)
+        self.assertEqual(len(response.context['page']['items']), 2)
+        self.assertEqual(len(large), len(small))
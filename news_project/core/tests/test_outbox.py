@@ -0,0 +1,176 @@
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from core.functions import fanout, outbox
+from core.models import (
+    CustomUser, Publisher, Article, OutboxEvent, SocialPost
+)
+
+
+class OutboxTest(TestCase):
+    def setUp(self):
+        self.reader = CustomUser.objects.create_user(
+            username='reader',
+            email='reader@example.com',
+            password='testpass',
+            role='reader'
+        )
+        self.journalist = CustomUser.objects.create_user(
+            username='journalist',
+            password='testpass',
+            role='journalist'
+        )
+        self.editor = CustomUser.objects.create_user(
+            username='editor',
+            password='testpass',
+            role='editor'
+        )
+        self.publisher = Publisher.objects.create(name='Tech News')
+        self.article = Article.objects.create(
+            title='Pending story',
+            content='Some content',
+            journalist=self.journalist,
+            publisher=self.publisher
+        )
+        self.reader.subscribed_journalists.add(self.journalist)
+
+    def test_approval_only_records_outbox_event(self):
+        self.client.login(username='editor', password='testpass')
+        self.client.post(reverse('approve_article', args=[self.article.pk]))
+
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.kind, OutboxEvent.KIND_ARTICLE)
+        self.assertEqual(event.object_id, self.article.pk)
+        self.assertEqual(event.status, OutboxEvent.STATUS_PENDING)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertFalse(SocialPost.objects.exists())
+
+    def test_drain_delivers_and_marks_done(self):
+        self.article.approved = True
+        self.article.save()
+
+        self.assertEqual(outbox.drain(workers=1), 1)
+
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.status, OutboxEvent.STATUS_DONE)
+        self.assertEqual(event.attempts, 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['reader@example.com'])
+        self.assertEqual(
+            event.social_posts.get().status, SocialPost.STATUS_PENDING
+        )
+        self.assertEqual(outbox.drain(workers=1), 0)
+
+    def test_failed_delivery_is_rescheduled(self):
+        self.article.approved = True
+        self.article.save()
+
+        with mock.patch.dict(
+            outbox.HANDLERS,
+            {OutboxEvent.KIND_ARTICLE: (Article, mock.Mock(
+                side_effect=RuntimeError('smtp down')
+            ))}
+        ):
+            outbox.drain(workers=1)
+
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.status, OutboxEvent.STATUS_PENDING)
+        self.assertEqual(event.last_error, 'smtp down')
+        self.assertIsNone(event.locked_at)
+        # Backoff keeps the event out of the next batch
+        self.assertEqual(outbox.drain(workers=1), 0)
+
+    def test_edit_of_approved_article_does_not_fan_out_again(self):
+        self.article.approved = True
+        self.article.save()
+        self.assertTrue(self.article.just_approved)
+        self.assertIsNotNone(self.article.approved_at)
+
+        self.client.login(username='journalist', password='testpass')
+        self.client.post(
+            reverse('edit_article', args=[self.article.pk]),
+            {'title': 'Fixed typo', 'content': 'Some content'}
+        )
+
+        self.assertEqual(OutboxEvent.objects.count(), 1)
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.title, 'Fixed typo')
+
+    def test_stale_instance_does_not_approve_twice(self):
+        stale = Article.objects.get(pk=self.article.pk)
+        self.article.approved = True
+        self.article.save()
+
+        stale.approved = True
+        stale.save()
+
+        self.assertFalse(stale.just_approved)
+        self.assertEqual(stale.approved_at, self.article.approved_at)
+        self.assertEqual(OutboxEvent.objects.count(), 1)
+
+
+class OutboxLeaseTest(TestCase):
+    def setUp(self):
+        journalist = CustomUser.objects.create_user(
+            username='journalist', password='testpass', role='journalist'
+        )
+        Article.objects.create(
+            title='Story', content='Some content', journalist=journalist,
+            approved=True
+        )
+        self.event, = outbox.claim_batch(10)
+
+    def take_over(self):
+        # Another worker claims the event after the lease expired
+        OutboxEvent.objects.filter(pk=self.event.pk).update(
+            locked_at=timezone.now() + timedelta(seconds=1)
+        )
+
+    def test_renewal_moves_lease_forward(self):
+        claimed_at = self.event.locked_at
+        outbox.renew_lease(self.event)
+        self.assertGreater(self.event.locked_at, claimed_at)
+        self.assertEqual(
+            OutboxEvent.objects.get().locked_at, self.event.locked_at
+        )
+
+        self.take_over()
+        with self.assertRaises(outbox.LeaseLost):
+            outbox.renew_lease(self.event)
+
+    @override_settings(OUTBOX_HEARTBEAT_SECONDS=0.01)
+    def test_lease_is_renewed_during_long_deliveries(self):
+        handler = mock.Mock(side_effect=lambda *args: time.sleep(0.1))
+        with mock.patch.dict(
+            outbox.HANDLERS, {OutboxEvent.KIND_ARTICLE: (Article, handler)}
+        ), mock.patch.object(outbox, 'renew_lease') as renew:
+            outbox.process_event(self.event)
+        self.assertGreater(renew.call_count, 1)
+
+    def test_outcome_is_not_recorded_after_takeover(self):
+        self.take_over()
+        taken_at = OutboxEvent.objects.get().locked_at
+
+        self.assertFalse(outbox.process_event(self.event))
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.status, OutboxEvent.STATUS_PROCESSING)
+        self.assertEqual(event.locked_at, taken_at)
+
+    def test_busy_shards_reschedule_without_using_an_attempt(self):
+        handler = mock.Mock(side_effect=fanout.ShardsBusy('held'))
+        with mock.patch.dict(
+            outbox.HANDLERS, {OutboxEvent.KIND_ARTICLE: (Article, handler)}
+        ):
+            outbox.process_event(self.event)
+
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.status, OutboxEvent.STATUS_PENDING)
+        self.assertEqual(event.attempts, 0)
+        self.assertGreater(
+            event.available_at, timezone.now() + timedelta(minutes=4)
+        )
@@ -0,0 +1,87 @@
+from importlib import import_module
+
+from django.apps import apps
+from django.test import TestCase
+from django.urls import reverse
+from core.models import CustomUser, Publisher, Article
+
+
+class PublisherOwnerTest(TestCase):
+    def setUp(self):
+        self.journalist = CustomUser.objects.create_user(
+            username='journalist', password='testpass', role='journalist'
+        )
+
+    def test_register_creates_owned_publisher(self):
+        response = self.client.post(reverse('register'), {
+            'username': 'technews',
+            'password1': 'Str0ng-passw0rd!',
+            'password2': 'Str0ng-passw0rd!',
+            'role': 'publisher',
+        })
+        self.assertRedirects(response, reverse('dashboard'))
+        owner = CustomUser.objects.get(username='technews')
+        self.assertEqual(owner.owned_publisher.name, 'technews')
+
+    def test_register_claims_existing_publisher(self):
+        owned = Publisher.objects.create(
+            name='technews', owner=self.journalist
+        )
+        oldest = Publisher.objects.create(name='technews')
+        Publisher.objects.create(name='technews')
+        self.client.post(reverse('register'), {
+            'username': 'technews',
+            'password1': 'Str0ng-passw0rd!',
+            'password2': 'Str0ng-passw0rd!',
+            'role': 'publisher',
+        })
+        owner = CustomUser.objects.get(username='technews')
+        self.assertEqual(owner.owned_publisher, oldest)
+        self.assertEqual(Publisher.objects.filter(name='technews').count(), 3)
+        owned.refresh_from_db()
+        self.assertEqual(owned.owner, self.journalist)
+
+    def test_dashboard_lists_own_publisher_only(self):
+        # Two publishers sharing a name no longer clash
+        mine = CustomUser.objects.create_user(
+            username='Daily', password='testpass', role='publisher'
+        )
+        other = Publisher.objects.create(name='Daily')
+        own = Publisher.objects.create(name='Daily', owner=mine)
+        Article.objects.create(
+            title='Mine', content='Text', journalist=self.journalist,
+            publisher=own, approved=True
+        )
+        Article.objects.create(
+            title='Theirs', content='Text', journalist=self.journalist,
+            publisher=other, approved=True
+        )
+
+        self.client.login(username='Daily', password='testpass')
+        response = self.client.get(reverse('dashboard'))
+        self.assertContains(response, 'Mine')
+        self.assertNotContains(response, 'Theirs')
+
+    def test_dashboard_without_publisher(self):
+        CustomUser.objects.create_user(
+            username='Orphan', password='testpass', role='publisher'
+        )
+        self.client.login(username='Orphan', password='testpass')
+        response = self.client.get(reverse('dashboard'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_backfill_links_oldest_matching_publisher(self):
+        migration = import_module('core.migrations.0015_publisher_owner')
+        user = CustomUser.objects.create_user(
+            username='Tech News', password='testpass', role='publisher'
+        )
+        oldest = Publisher.objects.create(name='Tech News')
+        Publisher.objects.create(name='Tech News')
+        unrelated = Publisher.objects.create(name='Other')
+
+        migration.backfill_owners(apps, None)
+        oldest.refresh_from_db()
+        unrelated.refresh_from_db()
+        self.assertEqual(oldest.owner, user)
+        self.assertIsNone(unrelated.owner)
+        self.assertEqual(Publisher.objects.filter(owner=user).count(), 1)
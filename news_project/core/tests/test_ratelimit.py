@@ -0,0 +1,67 @@
+from django.test import SimpleTestCase, TestCase
+from core.functions.ratelimit import SharedTokenBucket, TokenBucket
+
+
+class FakeClock():
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TokenBucketTest(SimpleTestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.bucket = TokenBucket(
+            rate=2, burst=4, clock=self.clock, sleep=self.clock.sleep
+        )
+
+    def test_burst_is_free_then_waits_for_refill(self):
+        self.assertEqual(self.bucket.acquire(4), 0)
+        self.assertEqual(self.bucket.try_acquire(), 0.5)
+
+        self.assertEqual(self.bucket.acquire(), 0.5)
+        self.assertEqual(self.clock.now, 0.5)
+        self.assertEqual(self.bucket.stats()['throttled'], 1)
+        self.assertEqual(self.bucket.stats()['acquired'], 5)
+
+    def test_large_requests_are_split_into_bursts(self):
+        waited = self.bucket.acquire(10)
+
+        self.assertEqual(waited, 3)
+        self.assertEqual(self.bucket.stats()['acquired'], 10)
+
+
+class SharedTokenBucketTest(TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def bucket(self):
+        return SharedTokenBucket(
+            'email', rate=2, burst=4, clock=self.clock,
+            sleep=self.clock.sleep
+        )
+
+    def test_processes_share_tokens(self):
+        # Two buckets stand in for two worker processes
+        first, second = self.bucket(), self.bucket()
+        self.assertEqual(first.acquire(3), 0)
+        self.assertEqual(second.try_acquire(2), 0.5)
+
+        self.assertEqual(second.acquire(2), 0.5)
+        self.assertEqual(first.try_acquire(), 0.5)
+        self.assertEqual(first.stats()['acquired'], 3)
+        self.assertEqual(second.stats()['acquired'], 2)
+
+    def test_available_tokens_are_read_without_taking_any(self):
+        bucket = self.bucket()
+        self.assertEqual(bucket.available(), 4)
+        bucket.acquire(3)
+        self.assertEqual(self.bucket().available(), 1)
+        self.clock.now += 1
+        self.assertEqual(bucket.available(), 3)
+        self.assertEqual(bucket.stats()['acquired'], 3)
@@ -0,0 +1,52 @@
+from django.test import TestCase
+from core.functions.recipients import iter_recipient_chunks
+from core.models import CustomUser, Publisher, Newsletter
+
+
+class RecipientResolverTest(TestCase):
+    def setUp(self):
+        self.journalist = CustomUser.objects.create_user(
+            username='journalist',
+            password='testpass',
+            role='journalist'
+        )
+        self.publisher = Publisher.objects.create(name='Tech News')
+        self.readers = []
+        for i in range(5):
+            reader = CustomUser.objects.create_user(
+                username=f'reader{i}',
+                email=f'reader{i}@example.com' if i != 3 else '',
+                password='testpass',
+                role='reader'
+            )
+            self.readers.append(reader)
+        # reader0 follows both and must only be resolved once
+        for reader in self.readers[:2] + [self.readers[3]]:
+            reader.subscribed_journalists.add(self.journalist)
+        for reader in [self.readers[0], self.readers[2], self.readers[4]]:
+            reader.subscribed_publishers.add(self.publisher)
+        self.newsletter = Newsletter.objects.create(
+            title='Weekly',
+            body='Body',
+            journalist=self.journalist,
+            publisher=self.publisher
+        )
+
+    def test_single_union_query_per_chunk(self):
+        with self.assertNumQueries(2):
+            chunks = list(iter_recipient_chunks(self.newsletter, 3))
+
+        expected = [
+            (reader.pk, reader.email)
+            for i, reader in enumerate(self.readers) if i != 3
+        ]
+        self.assertEqual([len(chunk) for chunk in chunks], [3, 1])
+        self.assertEqual([row for chunk in chunks for row in chunk], expected)
+
+    def test_without_publisher(self):
+        self.newsletter.publisher = None
+        chunks = list(iter_recipient_chunks(self.newsletter))
+        self.assertEqual(
+            chunks,
+            [[(r.pk, r.email) for r in self.readers[:2]]]
+        )
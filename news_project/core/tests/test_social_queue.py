@@ -0,0 +1,251 @@
+import json
+from io import StringIO
+import threading
+import time
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from core.functions import outbox, social_queue
+from core.functions.ratelimit import reset_limiters
+from core.functions.social import LocMemBackend
+from core.functions.tweet import Tweet
+from core.functions.x_stub import make_server
+from core.models import Article, CustomUser, SocialPost
+
+
+class StandInXHandler(BaseHTTPRequestHandler):
+    """Answers POST /2/tweets with the next scripted response."""
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self.server.received.append(json.loads(self.rfile.read(length)))
+        status, headers = self.server.responses.pop(0)
+        if status == 'hang':
+            time.sleep(1)
+            status = 201
+        body = json.dumps({'data': {'id': '42'}}).encode()
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class SocialQueueTest(TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StandInXHandler)
+        self.server.responses = []
+        self.server.received = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        settings = override_settings(
+            TWITTER_API_URL=f'http://127.0.0.1:{self.server.server_port}',
+            TWITTER_ACCESS_TOKEN='token',
+            TWITTER_ACCESS_SECRET='secret',
+            TWITTER_TIMEOUT=0.2,
+            RATE_LIMITS={},
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        Tweet._instance = None
+        self.addCleanup(setattr, Tweet, '_instance', None)
+        reset_limiters()
+        self.addCleanup(reset_limiters)
+
+    def make_due(self, post):
+        SocialPost.objects.filter(pk=post.pk).update(
+            available_at=timezone.now()
+        )
+
+    def test_retries_rate_limits_and_server_errors_until_sent(self):
+        reset_at = int(time.time()) + 600
+        self.server.responses = [
+            (429, {'x-rate-limit-reset': str(reset_at)}),
+            (503, {}),
+            ('hang', {}),
+            (201, {}),
+        ]
+        post = social_queue.enqueue('Breaking news')
+
+        self.assertEqual(social_queue.drain(), 1)
+        post.refresh_from_db()
+        self.assertEqual(post.status, SocialPost.STATUS_PENDING)
+        self.assertEqual(int(post.available_at.timestamp()), reset_at)
+        self.assertEqual(post.attempts, 0)
+        self.assertEqual(social_queue.drain(), 0)
+
+        self.make_due(post)
+        social_queue.drain()
+        post.refresh_from_db()
+        self.assertEqual(post.attempts, 1)
+        self.assertGreater(
+            post.available_at, timezone.now() + timedelta(seconds=20)
+        )
+
+        # The stand-in server hangs past TWITTER_TIMEOUT
+        self.make_due(post)
+        social_queue.drain()
+        post.refresh_from_db()
+        self.assertEqual(post.attempts, 2)
+        self.assertIn('request failed', post.last_error)
+
+        self.make_due(post)
+        social_queue.drain()
+        post.refresh_from_db()
+        self.assertEqual(post.status, SocialPost.STATUS_SENT)
+        self.assertEqual(post.external_id, '42')
+        self.assertEqual(self.server.received[-1], {'text': 'Breaking news'})
+
+    def test_rejected_post_is_dead_lettered(self):
+        self.server.responses = [(403, {})]
+        post = social_queue.enqueue('Duplicate content')
+
+        social_queue.drain()
+
+        post.refresh_from_db()
+        self.assertEqual(post.status, SocialPost.STATUS_DEAD)
+        self.assertIn('403', post.last_error)
+
+    @override_settings(SOCIAL_MAX_ATTEMPTS=2)
+    def test_repeated_failures_are_dead_lettered(self):
+        self.server.responses = [(500, {}), (500, {})]
+        post = social_queue.enqueue('Unlucky')
+
+        social_queue.drain()
+        self.make_due(post)
+        social_queue.drain()
+
+        post.refresh_from_db()
+        self.assertEqual(post.status, SocialPost.STATUS_DEAD)
+        self.assertEqual(post.attempts, 2)
+
+
+@override_settings(SOCIAL_BACKEND='core.functions.social.LocMemBackend')
+class SocialBackendTest(TestCase):
+    def setUp(self):
+        LocMemBackend.outbox = []
+
+    def test_approval_is_posted_through_configured_backend(self):
+        journalist = CustomUser.objects.create_user(
+            username='journalist',
+            password='testpass',
+            role='journalist'
+        )
+        Article.objects.create(
+            title='Launch',
+            content='Body',
+            journalist=journalist,
+            approved=True
+        )
+
+        outbox.drain(workers=1)
+        social_queue.drain()
+
+        self.assertEqual(len(LocMemBackend.outbox), 1)
+        self.assertIn('Launch', LocMemBackend.outbox[0])
+        self.assertEqual(
+            SocialPost.objects.get().status, SocialPost.STATUS_SENT
+        )
+
+    def test_stub_server_backend(self):
+        server = make_server()
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        with override_settings(
+            SOCIAL_BACKEND='core.functions.social.HTTPStubBackend',
+            SOCIAL_STUB_URL=f'http://127.0.0.1:{server.server_port}'
+        ):
+            social_queue.enqueue('Via stub')
+            social_queue.drain()
+
+        self.assertEqual(server.posts, ['Via stub'])
+
+
+@override_settings(SOCIAL_BACKEND='core.functions.social.LocMemBackend')
+class SocialClaimTest(TestCase):
+    def setUp(self):
+        LocMemBackend.outbox = []
+        reset_limiters()
+        self.addCleanup(reset_limiters)
+        for i in range(5):
+            social_queue.enqueue(f'Post {i}')
+
+    @override_settings(RATE_LIMITS={'social': {'rate': 0.01, 'burst': 3}})
+    def test_batch_is_limited_to_available_tokens(self):
+        self.assertEqual(social_queue.drain(), 3)
+        self.assertEqual(
+            SocialPost.objects.filter(
+                status=SocialPost.STATUS_PENDING
+            ).count(),
+            2
+        )
+
+    @override_settings(RATE_LIMITS={})
+    def test_post_claimed_by_another_worker_is_left_to_it(self):
+        first, second = social_queue.claim_batch(2)
+        # Both leases expire and another worker claims the first post
+        taken_at = timezone.now() + timedelta(seconds=1)
+        SocialPost.objects.filter(pk=first.pk).update(locked_at=taken_at)
+
+        self.assertIsNone(social_queue.process_post(first))
+        self.assertEqual(LocMemBackend.outbox, [])
+        first.refresh_from_db()
+        self.assertEqual(first.status, SocialPost.STATUS_SENDING)
+        self.assertEqual(first.locked_at, taken_at)
+
+        self.assertEqual(
+            social_queue.process_post(second), SocialPost.STATUS_SENT
+        )
+        self.assertEqual(LocMemBackend.outbox, ['Post 1'])
+
+    @override_settings(RATE_LIMITS={})
+    def test_outcome_is_not_recorded_after_takeover(self):
+        post, = social_queue.claim_batch(1)
+
+        class TakenOverBackend(LocMemBackend):
+            def post(self, text):
+                SocialPost.objects.filter(pk=post.pk).update(
+                    locked_at=timezone.now() + timedelta(seconds=1)
+                )
+                return super().post(text)
+
+        self.assertIsNone(social_queue.process_post(post, TakenOverBackend()))
+        post.refresh_from_db()
+        self.assertEqual(post.status, SocialPost.STATUS_SENDING)
+
+    @override_settings(RATE_LIMITS={})
+    def test_worker_never_claims_benchmark_posts(self):
+        benchmark = SocialPost.objects.create(text='Bench', benchmark=True)
+        self.assertEqual(social_queue.drain(), 5)
+        self.assertNotIn('Bench', LocMemBackend.outbox)
+        self.assertEqual(
+            [post.pk for post in social_queue.claim_batch(10, True)],
+            [benchmark.pk]
+        )
+
+    @override_settings(RATE_LIMITS={})
+    def test_benchmark_leaves_queue_untouched(self):
+        out = StringIO()
+        call_command(
+            'bench_social', posts=3, workers=1, backend='locmem', stdout=out
+        )
+        self.assertIn('Sent 3/3 posts', out.getvalue())
+        self.assertEqual(len(LocMemBackend.outbox), 3)
+        self.assertEqual(
+            SocialPost.objects.filter(status=SocialPost.STATUS_PENDING)
+            .count(),
+            5
+        )
+        self.assertFalse(SocialPost.objects.filter(benchmark=True).exists())
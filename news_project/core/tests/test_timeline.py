@@ -0,0 +1,213 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.functions import feed, outbox, timeline
+from core.models import (
+    Article, CustomUser, Newsletter, OutboxEvent, Publisher, TimelineEntry
+)
+
+
+def inserts(queries):
+    """Return the captured queries that wrote timeline rows."""
+    return [
+        query for query in queries
+        if query['sql'].startswith('INSERT')
+        and 'core_timelineentry' in query['sql']
+    ]
+
+
+@override_settings(FEED_TIMELINE_ENABLED=True)
+class TimelineTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.reader = CustomUser.objects.create_user(
+            username='reader', password='testpass', role='reader',
+            email='reader@example.com'
+        )
+        self.journalist = CustomUser.objects.create_user(
+            username='journalist', password='testpass', role='journalist'
+        )
+        self.other = CustomUser.objects.create_user(
+            username='other', password='testpass', role='journalist'
+        )
+        self.publisher = Publisher.objects.create(name='Tech News')
+        self.reader.subscribed_journalists.add(self.journalist)
+
+    def approve(self, journalist=None, publisher=None, model=Article):
+        fields = {'body': 'Body'} if model is Newsletter else {
+            'content': 'Body'
+        }
+        item = model.objects.create(
+            title='Item', journalist=journalist or self.journalist,
+            publisher=publisher, approved=True, **fields
+        )
+        outbox.drain(workers=1)
+        return item
+
+    def timeline(self, kind='article'):
+        return list(
+            feed.timeline_entries(self.reader, kind)
+            .order_by('-created_at', '-object_id')
+            .values_list('object_id', flat=True)
+        )
+
+    def test_delivery_writes_a_row_per_follower(self):
+        article = self.approve()
+        newsletter = self.approve(model=Newsletter)
+        self.assertEqual(self.timeline(), [article.pk])
+        self.assertEqual(self.timeline('newsletter'), [newsletter.pk])
+        self.assertEqual(TimelineEntry.objects.count(), 2)
+
+    def test_feed_reads_from_timeline(self):
+        article = self.approve()
+        # Approved but never delivered: not in the timeline yet
+        Article.objects.filter(pk=article.pk).update(approved=True)
+        self.assertEqual(
+            list(feed.subscribed_articles(self.reader)), [article]
+        )
+        TimelineEntry.objects.all().delete()
+        self.assertEqual(list(feed.subscribed_articles(self.reader)), [])
+
+    def test_subscribing_backfills_and_unsubscribing_trims(self):
+        by_other = self.approve(self.other, self.publisher)
+        self.assertEqual(self.timeline(), [])
+
+        self.reader.subscribed_publishers.add(self.publisher)
+        self.assertEqual(self.timeline(), [by_other.pk])
+
+        self.reader.subscribed_publishers.remove(self.publisher)
+        self.assertEqual(self.timeline(), [])
+
+    def test_trim_keeps_items_still_followed_through_other_source(self):
+        article = self.approve(self.journalist, self.publisher)
+        self.reader.subscribed_publishers.add(self.publisher)
+        self.reader.subscribed_journalists.remove(self.journalist)
+        self.assertEqual(self.timeline(), [article.pk])
+
+        self.publisher.subscribed_readers.clear()
+        self.assertEqual(self.timeline(), [])
+
+    def test_unapprove_move_and_delete(self):
+        article = self.approve()
+        article = Article.objects.get(pk=article.pk)
+        article.journalist = self.other
+        article.save()
+        self.assertEqual(self.timeline(), [])
+
+        article.journalist = self.journalist
+        article.save()
+        # The new followers' rows are written by the worker
+        self.assertEqual(self.timeline(), [])
+        outbox.drain(workers=1)
+        self.assertEqual(self.timeline(), [article.pk])
+
+        article.approved = False
+        article.save()
+        self.assertEqual(self.timeline(), [])
+
+        article.approved = True
+        article.save()
+        outbox.drain(workers=1)
+        self.assertEqual(self.timeline(), [article.pk])
+        article.delete()
+        self.assertEqual(self.timeline(), [])
+
+    def test_move_writes_timelines_in_the_worker(self):
+        article = self.approve(self.other)
+        fans = [
+            CustomUser.objects.create_user(
+                username=f'fan{i}', password='testpass', role='reader'
+            )
+            for i in range(3)
+        ]
+        self.journalist.followers.add(*fans)
+        article = Article.objects.get(pk=article.pk)
+        article.journalist = self.journalist
+
+        with CaptureQueriesContext(connection) as queries:
+            article.save()
+        self.assertEqual(inserts(queries), [])
+        event = OutboxEvent.objects.get(kind=OutboxEvent.KIND_TIMELINE)
+        self.assertEqual(event.payload, {'kind': 'article', 'id': article.pk})
+
+        outbox.drain(workers=1)
+        self.assertEqual(
+            TimelineEntry.objects.filter(object_id=article.pk).count(), 4
+        )
+
+    @override_settings(TIMELINE_BATCH_SIZE=2)
+    def test_backfill_inserts_in_batches(self):
+        for _ in range(5):
+            self.approve(self.other, self.publisher)
+        self.reader.subscribed_publishers.add(self.publisher)
+        TimelineEntry.objects.all().delete()
+
+        with CaptureQueriesContext(connection) as queries:
+            count = timeline.backfill(self.reader.pk, (), [self.publisher.pk])
+        self.assertEqual(count, 5)
+        self.assertEqual(len(inserts(queries)), 3)
+        self.assertEqual(len(self.timeline()), 5)
+
+    def test_deleting_publisher_trims_its_subscribers(self):
+        self.approve(self.other, self.publisher)
+        self.reader.subscribed_publishers.add(self.publisher)
+        self.publisher.delete()
+        self.assertEqual(self.timeline(), [])
+
+    def test_trim_cost_does_not_grow_with_readers(self):
+        self.approve(self.other, self.publisher)
+
+        def unfollow(count):
+            readers = [
+                CustomUser.objects.create_user(
+                    username=f'fan{count}_{i}', password='testpass',
+                    role='reader'
+                )
+                for i in range(count)
+            ]
+            self.publisher.subscribed_readers.add(*readers)
+            with CaptureQueriesContext(connection) as queries:
+                self.publisher.subscribed_readers.clear()
+            return len(queries)
+
+        self.assertEqual(unfollow(2), unfollow(10))
+
+    def test_api_pages_come_from_timeline(self):
+        articles = [self.approve() for _ in range(3)]
+        client = APIClient()
+        client.login(username='reader', password='testpass')
+        with self.settings(FEED_CACHE_SIZE=1):
+            response = client.get(
+                reverse('subscribed_articles_api'), {'page_size': 2}
+            )
+            rest = client.get(response.data['next'])
+        results = response.data['results'] + rest.data['results']
+        ids = [a['id'] for a in results]
+        self.assertEqual(ids, [a.pk for a in reversed(articles)])
+
+    def test_rebuild_command(self):
+        article = self.approve()
+        self.reader.subscribed_publishers.add(self.publisher)
+        by_publisher = Article.objects.create(
+            title='Late', content='Body', journalist=self.other,
+            publisher=self.publisher
+        )
+        Article.objects.filter(pk=by_publisher.pk).update(approved=True)
+        TimelineEntry.objects.create(
+            reader=self.reader, kind='article', object_id=999,
+            created_at=article.created_at, journalist=self.other
+        )
+
+        out = StringIO()
+        call_command('rebuild_timeline', stdout=out)
+        self.assertIn('Rebuilt 1 timelines.', out.getvalue())
+        self.assertEqual(
+            sorted(self.timeline()), sorted([article.pk, by_publisher.pk])
+        )
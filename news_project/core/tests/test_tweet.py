@@ -0,0 +1,35 @@
+from unittest import mock
+
+from django.test import TestCase
+from core.functions.tweet import Tweet, TweetPermanentError
+
+
+class LazyTweetClientTest(TestCase):
+    def setUp(self):
+        Tweet._instance = None
+        self.addCleanup(setattr, Tweet, '_instance', None)
+
+    @mock.patch('builtins.input')
+    @mock.patch('core.functions.tweet.OAuth1Session')
+    def test_request_path_never_prompts_or_verifies(self, session, prompt):
+        with mock.patch.object(Tweet, 'TOKEN_FILE', '/nonexistent.json'):
+            tweet = Tweet()
+            with self.assertRaises(TweetPermanentError):
+                tweet.make_tweet('Hello')
+
+        session.assert_not_called()
+        prompt.assert_not_called()
+        self.assertIsNone(tweet.oauth)
+
+    @mock.patch('core.functions.tweet.OAuth1Session')
+    def test_credentials_are_loaded_once_without_verification(self, session):
+        response = session.return_value.post.return_value
+        response.status_code = 201
+        response.json.return_value = {'data': {'id': '1'}}
+
+        Tweet().make_tweet('First')
+        Tweet().make_tweet('Second')
+
+        session.assert_called_once()
+        session.return_value.get.assert_not_called()
+        self.assertEqual(session.return_value.post.call_count, 2)
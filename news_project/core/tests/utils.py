@@ -0,0 +1,55 @@
+from unittest import mock
+
+from django.core.cache.backends.redis import RedisCacheClient
+
+
+class CaptureCacheCalls():
+    """
+    Record the commands sent to the Redis cache inside a ``with`` block.
+
+    Every method of the cache client is one round trip to Redis:
+    ``get_many`` and ``set_many`` send a single command or pipeline.
+    Use it next to ``CaptureQueriesContext`` so a budget counts both the
+    database queries and the cache round trips of a request.
+    """
+    COMMANDS = (
+        'add', 'clear', 'delete', 'delete_many', 'get', 'get_many',
+        'has_key', 'incr', 'set', 'set_many', 'touch',
+    )
+
+    def __init__(self):
+        self.calls = []
+        self._patches = []
+
+    def __len__(self):
+        return len(self.calls)
+
+    @property
+    def writes(self):
+        """Commands that changed the cache."""
+        return [
+            name for name in self.calls
+            if name not in ('get', 'get_many', 'has_key')
+        ]
+
+    def _wrap(self, name):
+        original = getattr(RedisCacheClient, name)
+
+        def record(client, *args, **kwargs):
+            self.calls.append(name)
+            return original(client, *args, **kwargs)
+        return record
+
+    def __enter__(self):
+        for name in self.COMMANDS:
+            patch = mock.patch.object(
+                RedisCacheClient, name, self._wrap(name)
+            )
+            patch.start()
+            self._patches.append(patch)
+        return self
+
+    def __exit__(self, *exc_info):
+        for patch in reversed(self._patches):
+            patch.stop()
+        self._patches = []
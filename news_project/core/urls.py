@@ -1,6 +1,8 @@
 from django.urls import path
-from .api_views import subscribed_articles
-from . import views
+from .api_views import (
+    subscribed_articles, subscribed_changes, subscribed_feed
+)
+from . import async_views, views
 from .views import logout_view, create_newsletter
 
 
@@ -32,11 +34,57 @@ urlpatterns = [
         name='approve_article'
     ),
 
+    path(
+        'moderate/bulk/',
+        views.bulk_moderate,
+        name='bulk_moderate'
+    ),
+    path(
+        'moderate/<slug:section>/',
+        views.moderation_section,
+        name='moderation_section'
+    ),
+
     path(
         'api/articles/',
         subscribed_articles,
         name='subscribed_articles_api'
     ),
+    path(
+        'api/feed/',
+        subscribed_feed,
+        name='subscribed_feed_api'
+    ),
+    path(
+        'api/changes/',
+        subscribed_changes,
+        name='subscribed_changes_api'
+    ),
+    path(
+        'api/async/articles/',
+        async_views.subscribed_articles,
+        name='async_subscribed_articles_api'
+    ),
+    path(
+        'api/async/feed/',
+        async_views.subscribed_feed,
+        name='async_subscribed_feed_api'
+    ),
+    path(
+        'api/async/events/',
+        async_views.live_events,
+        name='live_events_api'
+    ),
+    path(
+        'api/async/articles/<int:pk>/',
+        async_views.article_detail,
+        name='async_article_detail_api'
+    ),
+    path(
+        'api/async/newsletters/<int:pk>/',
+        async_views.newsletter_detail,
+        name='async_newsletter_detail_api'
+    ),
 
     path('articles/new/', views.create_article, name='create_article'),
 
@@ -1,14 +1,21 @@
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib.auth import logout, login, authenticate
 from django.shortcuts import get_object_or_404, render, redirect
-from django.http import HttpResponseRedirect, HttpResponseNotAllowed
+from django.http import (
+    Http404, HttpResponse, HttpResponseBadRequest, HttpResponseNotAllowed,
+    HttpResponseRedirect
+)
+from django.urls import reverse
+from django.utils.http import urlencode
 from .models import Article, Publisher, Newsletter
+from .functions import feed_cache, fragment_cache, moderation
+from .pagination import InvalidCursor
 from .forms import (
     SubscriptionForm, ArticleForm, UserRegistrationForm, NewsletterForm
 )
 from django.contrib import messages
 from django.http import HttpResponseForbidden
-from django.db.models import Q
+from django.db import transaction
 
 
 def home_view(request):
@@ -53,6 +60,10 @@ def register_view(request):
     """
     Register a new user and log them in.
 
+    Publisher accounts claim the oldest unowned Publisher of the same
+    name, as migration ``0015`` does for existing accounts, or get a new
+    one. Their dashboard lists that publisher's articles.
+
     :param request: HTTP request with registration data.
     :type request: HttpRequest
     :return: Redirect to dashboard or render registration form.
@@ -64,11 +75,18 @@ def register_view(request):
     if request.method == 'POST':
         form = UserRegistrationForm(request.POST)
         if form.is_valid():
-            user = form.save()
-            if form.cleaned_data['role'] == 'publisher':
-                name = form.cleaned_data['username']
-                print(name)
-                Publisher.objects.get_or_create(name=name)
+            with transaction.atomic():
+                user = form.save()
+                if form.cleaned_data['role'] == 'publisher':
+                    name = form.cleaned_data['username']
+                    publisher = Publisher.objects.select_for_update().filter(
+                        name=name, owner__isnull=True
+                    ).order_by('pk').first()
+                    if publisher is None:
+                        Publisher.objects.create(name=name, owner=user)
+                    else:
+                        publisher.owner = user
+                        publisher.save(update_fields=['owner'])
             login(request, user)  # auto-login after register
             messages.success(request, "Registration successful.")
             return redirect('dashboard')
@@ -90,53 +108,75 @@ def logout_view(request):
     return redirect('home')
 
 
+def split_by_approval(queryset):
+    """
+    Load items in one query and split them into approved and pending.
+
+    :param queryset: Articles or newsletters.
+    :type queryset: QuerySet
+    :return: Approved items and pending items, both newest first.
+    :rtype: tuple[list, list]
+    """
+    approved, pending = [], []
+    # Matches the (source, approved, created_at, id) indexes, so the
+    # items are read in index order without a sort
+    for item in queryset.order_by('-approved', '-created_at', '-id'):
+        (approved if item.approved else pending).append(item)
+    return approved, pending
+
+
 @login_required
 def dashboard_view(request):
     """
     Display dashboard for the user's role.
 
+    Every branch renders in a fixed number of queries however many
+    items are listed: authors and publishers are joined with
+    ``select_related`` and each role's items are loaded in one query per
+    model. Budgets as database queries plus Redis cache round trips,
+    including the session and user lookups and enforced by
+    ``core.tests.test_dashboards``:
+
+    - Reader: 6 queries (the listed subscriptions and the two feeds) and
+      10 round trips with a warm feed cache; 14 queries and 19 round
+      trips when the feeds and the version tokens have to be rebuilt.
+      Feed cache statistics are flushed after the response, see
+      :func:`core.functions.feed_cache.flush_stats`.
+    - Journalist: 4 queries, no cache.
+    - Editor: 4 queries (the first page of both pending queues), no
+      cache. Approved history is not loaded until asked for, see
+      :func:`moderation_section`.
+    - Publisher: 3 queries, no cache.
+
     :param request: HTTP request with user data.
     :type request: HttpRequest
     :return: Rendered dashboard page.
     :rtype: HttpResponse
     """
     user = request.user
-    pending_articles = Article.objects.filter(approved=False)
-    approved_articles = Article.objects.filter(approved=True)
-    pending_newsletters = Newsletter.objects.filter(approved=False)
-    approved_newsletters = Newsletter.objects.filter(approved=True)
 
     if user.is_reader():
         # get articles based on users subscriptions
-        subscribed_articles = Article.objects.filter(
-            approved=True).filter(
-                Q(journalist__in=user.subscribed_journalists.all()) |
-                Q(publisher__in=user.subscribed_publishers.all())
-                ).order_by('-created_at')
-        subscribed_newsletter = Newsletter.objects.filter(
-            approved=True).filter(
-                Q(journalist__in=user.subscribed_journalists.all()) |
-                Q(publisher__in=user.subscribed_publishers.all())
-                ).order_by('-created_at')
-        return render(
-                    request,
-                    'core/reader_dashboard.html',
-                    {"articles": subscribed_articles,
-                     "newsletters": subscribed_newsletter}
-                )
+        subscribed_articles = feed_cache.feed_queryset(
+            user, 'article'
+        ).select_related('journalist', 'publisher')
+        subscribed_newsletter = feed_cache.feed_queryset(
+            user, 'newsletter'
+        ).select_related('journalist', 'publisher')
+        return render(request, 'core/reader_dashboard.html', {
+            'articles': subscribed_articles,
+            'newsletters': subscribed_newsletter,
+            'subscribed_publishers': user.subscribed_publishers.only('name'),
+            'subscribed_journalists': user.subscribed_journalists.only(
+                'username'
+            ),
+        })
     elif user.is_journalist():
-        user = request.user
-        approved_articles = Article.objects.filter(
-            journalist=user, approved=True
+        approved_articles, pending_articles = split_by_approval(
+            Article.objects.filter(journalist=user)
         )
-        pending_articles = Article.objects.filter(
-            journalist=user, approved=False
-        )
-        approved_newsletters = Newsletter.objects.filter(
-            journalist=user, approved=True
-        )
-        pending_newsletters = Newsletter.objects.filter(
-            journalist=user, approved=False
+        approved_newsletters, pending_newsletters = split_by_approval(
+            Newsletter.objects.filter(journalist=user)
         )
 
         return render(request, 'core/journalist_dashboard.html', {
@@ -146,21 +186,14 @@ def dashboard_view(request):
             'pending_newsletters': pending_newsletters
         })
     elif user.is_editor():
-        return render(
-            request,
-            'core/editor_dashboard.html',
-            {'approved_articles': approved_articles,
-             'pending_articles': pending_articles,
-             'approved_newsletters': approved_newsletters,
-             'pending_newsletters': pending_newsletters}
-        )
+        return render(request, 'core/editor_dashboard.html', {
+            'pending_articles': section_context('pending-articles'),
+            'pending_newsletters': section_context('pending-newsletters'),
+        })
     elif user.is_publisher():
-        publisher = Publisher.objects.get(name=request.user)
-        approved_articles = Article.objects.filter(
-            publisher=publisher, approved=True
-        )
-        pending_articles = Article.objects.filter(
-            publisher=publisher, approved=False
+        # The publisher is resolved through its owner key in the same query
+        approved_articles, pending_articles = split_by_approval(
+            Article.objects.filter(publisher__owner=user)
         )
         return render(
             request,
@@ -231,6 +264,7 @@ def manage_subscriptions(request):
             # Clear previous and set new subscriptions
             user.subscribed_publishers.set(publishers)
             user.subscribed_journalists.set(journalists)
+            user.digest_frequency = form.cleaned_data['digest_frequency']
 
             user.save()
             messages.success(request, "Subscriptions updated!")
@@ -239,6 +273,7 @@ def manage_subscriptions(request):
         form = SubscriptionForm(initial={
             'publishers': user.subscribed_publishers.all(),
             'journalists': user.subscribed_journalists.all(),
+            'digest_frequency': user.digest_frequency,
         })
 
     return render(request, 'core/manage_subscriptions.html', {'form': form})
@@ -246,10 +281,14 @@ def manage_subscriptions(request):
 
 @login_required
 @user_passes_test(is_editor)
+@transaction.atomic
 def approve_article(request, article_id):
     """
     Approve an article.
 
+    The approval and its outbox event are committed together, so
+    notifications are delivered by ``run_outbox`` after the response.
+
     :param request: HTTP request by an editor.
     :type request: HttpRequest
     :param article_id: Article ID.
@@ -264,6 +303,128 @@ def approve_article(request, article_id):
     return HttpResponseRedirect('/dashboard/')
 
 
+def section_context(section, cursor=None):
+    """
+    Build the template context of one page of a moderation section.
+
+    :param section: One of :data:`core.functions.moderation.SECTIONS`.
+    :type section: str
+    :param cursor: Cursor of the previous page's last item, if any.
+    :type cursor: str
+    :return: The ``page`` rendered by ``core/moderation_section.html``.
+    :rtype: dict
+    :raises KeyError: If the section does not exist.
+    :raises InvalidCursor: If the cursor is malformed.
+    """
+    kind, approved = moderation.SECTIONS[section]
+    items, next_cursor = moderation.section_page(section, cursor)
+    next_url = None
+    if next_cursor:
+        url = reverse('moderation_section', args=[section])
+        next_url = f"{url}?{urlencode({'cursor': next_cursor})}"
+    return {
+        'section': section,
+        'kind': kind,
+        'approved': approved,
+        'items': items,
+        'first_page': not cursor,
+        'next_url': next_url,
+    }
+
+
+@login_required
+@user_passes_test(is_editor)
+def moderation_section(request, section):
+    """
+    Render one page of a moderation section as an HTML fragment.
+
+    The editor dashboard fetches these to page through the pending
+    queues and to show approved history on demand, so its own render
+    time does not grow with the archive. Pages of approved history are
+    served from the fragment cache without touching the database.
+
+    :param request: HTTP GET request by an editor, with an optional
+        ``cursor``.
+    :type request: HttpRequest
+    :param section: Section to list, e.g. ``approved-articles``.
+    :type section: str
+    :return: Rendered fragment.
+    :rtype: HttpResponse
+    :raises Http404: If the section does not exist.
+    """
+    if request.method != "GET":
+        return HttpResponseNotAllowed(['GET'])
+    if section not in moderation.SECTIONS:
+        raise Http404("Unknown section.")
+    kind, approved = moderation.SECTIONS[section]
+    cursor = request.GET.get('cursor')
+
+    # Approved history has no per-user content, so its pages are shared
+    # by all editors until an item of the kind changes
+    key = None
+    if approved:
+        key = fragment_cache.fragment_key(
+            f'moderation-{section}', [fragment_cache.list_ref(kind)],
+            [cursor]
+        )
+        html = fragment_cache.get_fragment(key)
+        if html is not None:
+            return HttpResponse(html)
+
+    try:
+        context = section_context(section, cursor)
+    except InvalidCursor as e:
+        return HttpResponseBadRequest(str(e))
+    response = render(
+        request, 'core/moderation_section.html', {'page': context}
+    )
+    if key:
+        fragment_cache.set_fragment(key, response.content.decode())
+    return response
+
+
+@login_required
+@user_passes_test(is_editor)
+def bulk_moderate(request):
+    """
+    Approve or reject the articles and newsletters ticked on the editor
+    dashboard.
+
+    Approval updates every selected item in one transaction and records
+    a single outbox event for the batch, so readers get one email for
+    everything they follow. Rejecting deletes the selected pending items.
+
+    :param request: HTTP POST request by an editor with ``action``
+        (``approve`` or ``reject``) and the ``articles`` and
+        ``newsletters`` ids.
+    :type request: HttpRequest
+    :return: Redirect to dashboard.
+    :rtype: HttpResponseRedirect
+    :raises HttpResponseNotAllowed: If method not POST.
+    """
+    if request.method != "POST":
+        return HttpResponseNotAllowed(['POST'])
+
+    article_ids = [
+        pk for pk in request.POST.getlist('articles') if pk.isdigit()
+    ]
+    newsletter_ids = [
+        pk for pk in request.POST.getlist('newsletters') if pk.isdigit()
+    ]
+    action = request.POST.get('action')
+
+    if action == 'approve':
+        done = moderation.approve_items(article_ids, newsletter_ids)
+        count = sum(len(ids) for ids in done.values())
+        messages.success(request, f"{count} items approved.")
+    elif action == 'reject':
+        done = moderation.reject_items(article_ids, newsletter_ids)
+        messages.success(request, f"{sum(done.values())} items rejected.")
+    else:
+        messages.error(request, "Choose whether to approve or reject.")
+    return HttpResponseRedirect('/dashboard/')
+
+
 @login_required
 @user_passes_test(is_journalist)
 def create_article(request):
@@ -498,10 +659,14 @@ def delete_newsletter(request, pk):
 
 @login_required
 @user_passes_test(is_editor)
+@transaction.atomic
 def approve_newsletter(request, newsletter_id):
     """
     Approve a newsletter.
 
+    The approval and its outbox event are committed together, so
+    notifications are delivered by ``run_outbox`` after the response.
+
     :param request: HTTP POST request by editor.
     :type request: HttpRequest
     :param newsletter_id: Newsletter ID.
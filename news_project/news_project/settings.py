@@ -156,3 +156,120 @@ EMAIL_HOST_PASSWORD = "Your_Password"   # <-- Replace with actual app password
 # or use the bellow code instead to log emails in console
 '''EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 DEFAULT_FROM_EMAIL = 'no-reply@newsapp.com'''
+
+# Notification outbox drained by ``manage.py run_outbox``
+
+OUTBOX_WORKERS = int(os.environ.get('OUTBOX_WORKERS', 4))
+OUTBOX_BATCH_SIZE = 50
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_LEASE_SECONDS = 300
+# Workers renew the lease of the event they are delivering this often
+OUTBOX_HEARTBEAT_SECONDS = 60
+OUTBOX_POLL_INTERVAL = 2
+
+# Messages handed to the mail backend per chunk during a fan-out
+EMAIL_BATCH_SIZE = 100
+
+# Readers fetched per query when resolving an audience
+RECIPIENT_CHUNK_SIZE = 1000
+
+# Large audiences are split into shards of reader ids delivered in parallel
+FANOUT_SHARD_SIZE = 10000
+FANOUT_WORKERS = int(os.environ.get('FANOUT_WORKERS', 4))
+
+# Characters of each item's text included in digest emails
+DIGEST_EXCERPT_LENGTH = 200
+
+# Digest items marked as sent by a run that died before deleting them
+# are cleared by the next run once they are this old
+DIGEST_CLAIM_SECONDS = 3600
+
+# Send rates (per second) and burst sizes for outbound channels, shared by
+# all processes through the database. Workers wait for tokens instead of
+# dropping messages.
+RATE_LIMITS = {
+    'email': {'rate': 50, 'burst': 100},
+    'social': {'rate': 100 / 3600, 'burst': 10},
+}
+
+# X (Twitter) posting queue drained by ``manage.py run_social_queue``
+
+TWITTER_API_URL = os.environ.get('TWITTER_API_URL', 'https://api.twitter.com')
+TWITTER_TIMEOUT = 10
+SOCIAL_MAX_ATTEMPTS = 6
+SOCIAL_BACKOFF_SECONDS = 30
+SOCIAL_MAX_BACKOFF_SECONDS = 3600
+SOCIAL_LEASE_SECONDS = 120
+SOCIAL_BATCH_SIZE = 20
+SOCIAL_POLL_INTERVAL = 5
+SOCIAL_WORKERS = 1
+
+# Where posts are published: XBackend (real API), LocMemBackend (records
+# in memory) or HTTPStubBackend (local stub started with run_x_stub)
+SOCIAL_BACKEND = os.environ.get(
+    'SOCIAL_BACKEND', 'core.functions.social.XBackend'
+)
+SOCIAL_STUB_URL = os.environ.get('SOCIAL_STUB_URL', 'http://127.0.0.1:8765')
+
+# Cursor pagination of the REST API
+API_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 100
+
+# Cache shared by every process (web, web_asgi and the workers), so
+# version bumps made by one are seen by all. Redis runs as the ``redis``
+# service of docker-compose.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('REDIS_URL', 'redis://redis:6379/0'),
+    }
+}
+
+# Per-reader feed cache (core.functions.feed_cache). Entries keep the
+# newest FEED_CACHE_SIZE item ids of each reader's feed.
+FEED_CACHE_ALIAS = 'default'
+FEED_CACHE_TIMEOUT = 300
+FEED_CACHE_SIZE = 200
+# Hit/miss counts are kept per process and added to the shared counters
+# when a request finishes, at most once per interval (seconds)
+FEED_CACHE_STATS_INTERVAL = 60
+
+# Serve reader feeds from the materialized TimelineEntry table, written
+# for every follower when an item is delivered. Run
+# ``manage.py rebuild_timeline`` before enabling it.
+FEED_TIMELINE_ENABLED = os.environ.get(
+    'FEED_TIMELINE_ENABLED', 'False'
+) == 'True'
+TIMELINE_BATCH_SIZE = 1000
+# Characters of content returned by the API's ``excerpt`` field
+API_EXCERPT_LENGTH = 280
+
+# Change feed (core.functions.changes). Changes younger than
+# SYNC_LAG_SECONDS wait for the next sync so late commits are not
+# skipped; tombstones are kept for TOMBSTONE_RETENTION_DAYS.
+SYNC_LAG_SECONDS = 5
+TOMBSTONE_RETENTION_DAYS = 30
+TOMBSTONE_PRUNE_BATCH_SIZE = 1000
+
+# Live push of approved items (core.functions.live), served as
+# Server-Sent Events from the ASGI app. PollingBackend pages through
+# outbox events by id once per interval per web process, and looks for
+# ids it passed over for LIVE_GAP_SECONDS; LocMemBackend only sees items
+# delivered in the same process.
+LIVE_BACKEND = os.environ.get(
+    'LIVE_BACKEND', 'core.functions.live.PollingBackend'
+)
+LIVE_POLL_INTERVAL = 2
+LIVE_POLL_LIMIT = 500
+LIVE_GAP_SECONDS = 60
+LIVE_HEARTBEAT_SECONDS = 15
+LIVE_QUEUE_SIZE = 100
+LIVE_RETRY_MS = 5000
+
+# Items per page in each section of the editor's moderation queue
+MODERATION_PAGE_SIZE = 25
+
+# Rendered template fragments ({% fragment %}) shared by all users, keyed
+# on version tokens bumped whenever the content they show changes
+FRAGMENT_CACHE_ALIAS = 'default'
+FRAGMENT_CACHE_TIMEOUT = 3600
@@ -0,0 +1,17 @@
+"""
+Settings for the test suite::
+
+    python manage.py test --settings=news_project.test_settings
+
+The tests use the same Redis cache backend as production, on a database
+of their own, because every test case clears the cache.
+"""
+
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import CACHES
+
+CACHES['default']['LOCATION'] = os.environ.get(
+    'REDIS_TEST_URL', 'redis://redis:6379/15'
+)